@@ -1,6 +1,21 @@
-from rest_framework import viewsets, permissions
+import hashlib
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+from rest_framework import viewsets, permissions, serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import transaction
+from django.db.models import Q, Sum
 from django.contrib.auth.models import User
-from .models import Grupo, PerfilUsuario, Documento, Tarea, Notificacion
+from django.utils import timezone
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from .models import (
+    Grupo, PerfilUsuario, Documento, Tarea, Notificacion,
+    ResumenGrupo, ResumenUsuario, ResumenVencimiento,
+)
 from .serializers import (
     UsuarioSerializer,
     GrupoSerializer,
@@ -9,55 +24,646 @@ from .serializers import (
     TareaSerializer,
     NotificacionSerializer,
 )
+from .cache_respuestas import cache_habilitada, clave_de_respuesta, obtener_o_calcular
+from .lectura_rapida import compilar_mapeo
+from .eventos import evento_de_notificacion, evento_de_tarea, publicar_al_confirmar
+from .notificaciones import programar_notificaciones
+from .recordatorios import registrar_cambios_de_vencimiento
+from .resumenes import CAMPO_POR_ESTADO, ajustar_notificaciones, ajustar_tareas
+from .versiones import CLAVE_USUARIOS, clave_grupo, version_actual, versiones_en_lote
+from .pagination import (
+    CursorPaginacion,
+    PaginacionPorFechaCreacion,
+    PaginacionPorFechaEnvio,
+    PaginacionPorFechaSubida,
+    PaginacionPorUsername,
+)
 
 # ModelViewSet agrupa la lógica CRUD porque hereda/componen su comportamiento desde varias clases (mixins) que implementan cada operación.
 # Usa routers (DefaultRouter) para enrutar automáticamente los actions del viewset.
 
+# --- Filtros por query string (?grupo=1&estado=pendiente&...) ---
+# Los valores inválidos devuelven 400 en lugar de ignorarse en silencio.
+
+def _param_int(params, nombre):
+    valor = params.get(nombre)
+    if not valor:
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise ValidationError({nombre: 'Debe ser un número entero.'})
+
+def _param_bool(params, nombre):
+    valor = params.get(nombre)
+    if not valor:
+        return None
+    if valor.lower() in ('true', '1'):
+        return True
+    if valor.lower() in ('false', '0'):
+        return False
+    raise ValidationError({nombre: 'Debe ser true o false.'})
+
+def _param_fecha(params, nombre):
+    valor = params.get(nombre)
+    if not valor:
+        return None
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise ValidationError({nombre: 'Debe ser una fecha AAAA-MM-DD.'})
+
+def _param_decimal(params, nombre):
+    valor = params.get(nombre)
+    if not valor:
+        return None
+    try:
+        return Decimal(valor)
+    except InvalidOperation:
+        raise ValidationError({nombre: 'Debe ser un número.'})
+
+def _param_opciones(params, nombre, opciones):
+    """Uno o varios valores separados por coma, validados contra las choices del campo."""
+    valor = params.get(nombre)
+    if not valor:
+        return None
+    valores = valor.split(',')
+    validos = {opcion for opcion, _ in opciones}
+    if not set(valores) <= validos:
+        raise ValidationError({nombre: f"Valores permitidos: {', '.join(sorted(validos))}"})
+    return valores
+
+def _inicio_del_dia(dia):
+    # Rango sobre el DateTimeField en lugar de __date, así la consulta usa el índice
+    return timezone.make_aware(datetime.combine(dia, time.min))
+
+def _grupo_del_usuario(request):
+    """
+    Grupo (PerfilUsuario.grupo) del usuario autenticado, o None si no hay que acotar:
+    anónimos, staff o usuarios sin perfil. Se consulta una vez por request.
+    """
+    if not hasattr(request, '_grupo_id'):
+        user = request.user
+        if user.is_authenticated and not user.is_staff:
+            request._grupo_id = PerfilUsuario.objects.filter(user=user).values_list('grupo_id', flat=True).first()
+        else:
+            request._grupo_id = None
+    return request._grupo_id
+
+
+class AcotadoAlGrupoMixin:
+    """
+    Acota el queryset al grupo del usuario (lectura y escritura: fuera de su grupo
+    responde 404; crear un objeto en otro grupo o moverlo a otro, 400) y, en los
+    listados, aplica los filtros del query string.
+    """
+    # Camino desde el modelo hasta el id del grupo
+    campo_grupo = 'grupo'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        grupo_id = _grupo_del_usuario(self.request)
+        if grupo_id is not None:
+            queryset = queryset.filter(**{self.campo_grupo: grupo_id})
+        if self.action == 'list':
+            queryset = self.filtrar(queryset, self.request.query_params)
+        return queryset
+
+    def perform_create(self, serializer):
+        self.verificar_grupo(serializer)
+        super().perform_create(serializer)
+
+    def perform_update(self, serializer):
+        self.verificar_grupo(serializer)
+        super().perform_update(serializer)
+
+    def verificar_grupo(self, serializer):
+        """
+        Rechaza con 400 crear un objeto en otro grupo o moverlo a otro grupo (en los
+        lotes lo verifica LoteMixin._fuera_del_grupo).
+        """
+        grupo_id = _grupo_del_usuario(self.request)
+        if grupo_id is None or self.campo_grupo == 'pk':
+            return
+        campo, *camino = self.campo_grupo.split('__')
+        if campo not in serializer.validated_data:
+            # PATCH sin el campo: se queda donde estaba, y get_queryset ya lo acotó
+            return
+        objeto = serializer.validated_data[campo]
+        for paso in camino:
+            objeto = getattr(objeto, paso) if objeto is not None else None
+        if objeto is None or objeto.pk != grupo_id:
+            raise ValidationError({campo: ['Fuera del grupo del usuario.']})
+
+    def filtrar(self, queryset, params):
+        return queryset
+
+
+def _columnas_del_serializer(serializer):
+    """
+    Columnas (para .only()) y relaciones (para .select_related()) que necesita la
+    representación final del serializer. None si algún campo no sale directo de una
+    columna y no se puede acotar sin riesgo de consultas extra por fila.
+    """
+    model = serializer.Meta.model
+    columnas = {model._meta.pk.name}
+    relaciones = set()
+    for campo in serializer.fields.values():
+        fuente = campo.source
+        if isinstance(campo, serializers.BaseSerializer):
+            # Relación expandida: JOIN y solo las columnas del serializer anidado
+            relaciones.add(fuente)
+            columnas.add(fuente)
+            columnas.update(f"{fuente}__{hijo.source}" for hijo in campo.fields.values())
+        elif isinstance(campo, serializers.SlugRelatedField):
+            relaciones.add(fuente)
+            columnas.add(fuente)
+            columnas.add(f"{fuente}__{campo.slug_field}")
+        else:
+            try:
+                model._meta.get_field(fuente)
+            except FieldDoesNotExist:
+                return None
+            # Las FK como id (PrimaryKeyRelatedField) solo leen la columna <fk>_id
+            columnas.add(fuente)
+    return columnas, relaciones
+
+
+class CamposAcotadosMixin:
+    """
+    En las lecturas trae de la base solo las columnas y JOINs que usa la
+    representación pedida con ?fields= / ?expand= (ver CamposDinamicosMixin).
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != 'GET':
+            return queryset
+
+        acotado = _columnas_del_serializer(self.get_serializer())
+        if acotado is None:
+            return queryset
+        columnas, relaciones = acotado
+        # El paginador por cursor lee el campo de orden de cada fila
+        columnas.update(campo.lstrip('-') for campo in getattr(self.pagination_class, 'ordering', ()))
+        queryset = queryset.select_related(None).only(*columnas)
+        # Sin argumentos select_related() seguiría todas las FK: solo si hay relaciones
+        return queryset.select_related(*relaciones) if relaciones else queryset
+
+
+class ListadoRapidoMixin:
+    """
+    Listados desde .values() con el mapeo precompilado de lectura_rapida.py, sin
+    instanciar modelos ni recorrer el serializer por fila. Misma salida que DRF; si la
+    representación no se puede compilar se usa el listado normal.
+    """
+    def list(self, request, *args, **kwargs):
+        mapeo = compilar_mapeo(self.get_serializer()) if getattr(settings, 'API_LISTADO_RAPIDO', True) else None
+        if mapeo is None:
+            return super().list(request, *args, **kwargs)
+
+        columnas, mapear = mapeo
+        # El paginador por cursor lee el campo de orden de cada fila
+        orden = [campo.lstrip('-') for campo in getattr(self.pagination_class, 'ordering', ())]
+        queryset = self.filter_queryset(self.get_queryset()).values(*dict.fromkeys(columnas + orden))
+
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response([mapear(fila) for fila in queryset])
+        return self.get_paginated_response([mapear(fila) for fila in page])
+
+
+class GetCondicionalMixin:
+    """
+    ETag débil y Last-Modified en list/retrieve a partir de los contadores de versión
+    (versiones.py). Con If-None-Match (o If-Modified-Since) vigente responde 304 antes
+    de ejecutar el listado: solo se lee la fila del contador. Si no, la respuesta sale
+    de la caché de la API (cache_respuestas.py) con la misma versión en la clave.
+    """
+    def claves_version(self):
+        # None = todos los contadores (anónimos y staff ven todos los grupos)
+        grupo_id = _grupo_del_usuario(self.request)
+        if grupo_id is None:
+            return None
+        # Los usuarios van anidados con ?expand=
+        return [clave_grupo(grupo_id), CLAVE_USUARIOS]
+
+    def list(self, request, *args, **kwargs):
+        return self._condicional(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._condicional(request, super().retrieve, *args, **kwargs)
+
+    def _condicional(self, request, vista, *args, **kwargs):
+        claves = self.claves_version()
+        version, fecha = version_actual(claves)
+        fecha = _fecha_estable(fecha)
+        # El ETag depende de la URL completa (filtros, cursor, ?fields=) y del formato
+        base = f"{type(self).__name__}|{request.user.pk}|{claves}|{version}|{request.get_full_path()}|{request.accepted_media_type}"
+        etag = f'W/"{hashlib.md5(base.encode()).hexdigest()}"'
+
+        if _etag_vigente(request, etag) or (
+            'HTTP_IF_NONE_MATCH' not in request.META and _sin_modificar(request, fecha)
+        ):
+            response = Response(status=304)
+        else:
+            response = self._desde_cache(request, vista, claves, version, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if fecha is not None:
+                response['Last-Modified'] = http_date(fecha.timestamp())
+        return response
+
+    def _desde_cache(self, request, vista, claves, version, *args, **kwargs):
+        if not cache_habilitada():
+            return vista(request, *args, **kwargs)
+        # Los datos dependen de los grupos que ve el usuario (claves), no del usuario ni
+        # del formato: se guarda response.data y cada request lo renderiza. La URL
+        # absoluta cuenta por los links de paginación; los parámetros van ordenados.
+        parametros = sorted(request.query_params.lists())
+        clave = clave_de_respuesta(
+            type(self).__name__, claves, version, request.build_absolute_uri(request.path), parametros
+        )
+        calculada = []
+
+        def calcular():
+            response = vista(request, *args, **kwargs)
+            calculada.append(response)
+            return response.data if response.status_code == 200 else None
+
+        datos = obtener_o_calcular(clave, calcular)
+        if calculada:
+            return calculada[0]
+        if datos is None:
+            # No se pudo usar el cálculo de otro request: se responde sin caché
+            return vista(request, *args, **kwargs)
+        return Response(datos)
+
+
+def _etag_vigente(request, etag):
+    # Comparación débil (RFC 9110): se ignora el prefijo W/
+    pedidos = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    return '*' in pedidos or etag.removeprefix('W/') in {e.removeprefix('W/') for e in pedidos}
+
+
+def _fecha_estable(fecha):
+    # Last-Modified tiene resolución de un segundo: un cambio dentro del mismo segundo que
+    # la fecha anunciada no la haría avanzar y If-Modified-Since daría un 304 viejo. Hasta
+    # que pase un segundo entero no se anuncia y el único validador es el ETag.
+    if fecha is None or fecha > timezone.now() - timedelta(seconds=1):
+        return None
+    return fecha
+
+
+def _sin_modificar(request, fecha):
+    desde = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    return fecha is not None and desde is not None and int(fecha.timestamp()) <= desde
+
+
+class LoteMixin:
+    """
+    /<recurso>/lote/ para escribir muchos objetos en un request y una transacción:
+      POST   [{...}, ...]               alta
+      PATCH  [{"id": 1, ...}, ...]      modificación parcial
+      DELETE {"ids": [1, 2, ...]}       baja
+    Todo se valida antes de escribir (serializer many=True): si falla algún elemento no
+    se escribe nada y la respuesta lista los errores por índice. Se guarda con
+    bulk_create/bulk_update, que no disparan señales: lo que hacen las señales para
+    estos modelos se repite a mano en despues_del_lote().
+    """
+    @action(detail=False, methods=['post', 'patch', 'delete'])
+    def lote(self, request, *args, **kwargs):
+        if request.method == 'DELETE':
+            return self._borrar_lote(request)
+        if not isinstance(request.data, list):
+            raise ValidationError({'non_field_errors': ['Se esperaba una lista de elementos.']})
+        _validar_tamano_lote(len(request.data))
+        if request.method == 'POST':
+            return self._crear_lote(request)
+        return self._actualizar_lote(request)
+
+    def preparar_creacion(self, instancia):
+        """Equivalente a perform_create para cada instancia del lote."""
+
+    def despues_del_lote(self, creadas, actualizadas):
+        """Dentro de la transacción, después de escribir."""
+
+    def _crear_lote(self, request):
+        serializer = self.get_serializer(data=request.data, many=True)
+        if not serializer.is_valid():
+            return _errores_del_lote(_por_indice(serializer.errors))
+
+        model = self.get_queryset().model
+        instancias = [model(**attrs) for attrs in serializer.validated_data]
+        for instancia in instancias:
+            self.preparar_creacion(instancia)
+        errores = self._fuera_del_grupo(instancias)
+        if errores:
+            return _errores_del_lote(errores)
+
+        grupos = {self._grupo_de_instancia(instancia) for instancia in instancias}
+        with transaction.atomic(), versiones_en_lote({clave_grupo(grupo_id) for grupo_id in grupos}):
+            model.objects.bulk_create(instancias)
+            self.despues_del_lote(instancias, [])
+        return Response(self.get_serializer(instancias, many=True).data, status=status.HTTP_201_CREATED)
+
+    def _actualizar_lote(self, request):
+        errores, ids = [], []
+        for indice, elemento in enumerate(request.data):
+            pk = elemento.get('id') if isinstance(elemento, dict) else None
+            if not isinstance(pk, int):
+                errores.append((indice, {'id': ['Se requiere el id del elemento.']}))
+            elif pk in ids:
+                errores.append((indice, {'id': ['Repetido en el lote.']}))
+            ids.append(pk)
+
+        instancias = self.get_queryset().in_bulk([pk for pk in ids if isinstance(pk, int)])
+        errores += [
+            (indice, {'id': ['No encontrado.']})
+            for indice, pk in enumerate(ids) if isinstance(pk, int) and pk not in instancias
+        ]
+        if errores:
+            return _errores_del_lote(errores)
+
+        serializer = self.get_serializer(instancias, data=request.data, many=True, partial=True)
+        if not serializer.is_valid():
+            return _errores_del_lote(_por_indice(serializer.errors))
+
+        # Grupos antes y después: si un objeto cambia de grupo, cambian los dos
+        grupos = {self._grupo_de_instancia(instancia) for instancia in instancias.values()}
+        campos = set()
+        for pk, attrs in zip(ids, serializer.validated_data):
+            for campo, valor in attrs.items():
+                setattr(instancias[pk], campo, valor)
+            campos.update(attrs)
+        actualizadas = [instancias[pk] for pk in ids]
+        errores = self._fuera_del_grupo(actualizadas)
+        if errores:
+            return _errores_del_lote(errores)
+        grupos.update(self._grupo_de_instancia(instancia) for instancia in actualizadas)
+
+        with transaction.atomic(), versiones_en_lote({clave_grupo(grupo_id) for grupo_id in grupos}):
+            if campos:
+                self.get_queryset().model.objects.bulk_update(actualizadas, list(campos))
+            self.despues_del_lote([], actualizadas)
+        return Response(self.get_serializer(actualizadas, many=True).data)
+
+    def _borrar_lote(self, request):
+        ids = request.data.get('ids') if isinstance(request.data, dict) else None
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            raise ValidationError({'ids': ['Se esperaba una lista de ids.']})
+        _validar_tamano_lote(len(ids))
+
+        queryset = self.get_queryset().filter(pk__in=ids)
+        encontrados = dict(queryset.values_list('pk', self.campo_grupo))
+        errores = [(indice, {'id': ['No encontrado.']}) for indice, pk in enumerate(ids) if pk not in encontrados]
+        if errores:
+            return _errores_del_lote(errores)
+
+        # Las señales de post_delete siguen corriendo (referencias, etc.), salvo las versiones
+        grupos = set(encontrados.values())
+        with transaction.atomic(), versiones_en_lote({clave_grupo(grupo_id) for grupo_id in grupos}):
+            queryset.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def _grupo_de_instancia(self, instancia):
+        # Recorre campo_grupo ('grupo', 'tarea__grupo') sobre la instancia ya cargada
+        *camino, ultimo = self.campo_grupo.split('__')
+        for paso in camino:
+            instancia = getattr(instancia, paso)
+        return getattr(instancia, f"{ultimo}_id")
+
+    def _fuera_del_grupo(self, instancias):
+        grupo_id = _grupo_del_usuario(self.request)
+        if grupo_id is None:
+            return []
+        return [
+            (indice, {'grupo': ['Fuera del grupo del usuario.']})
+            for indice, instancia in enumerate(instancias)
+            if self._grupo_de_instancia(instancia) != grupo_id
+        ]
+
+
+def _validar_tamano_lote(cantidad):
+    maximo = getattr(settings, 'API_LOTE_MAX_ELEMENTOS', 500)
+    if cantidad > maximo:
+        raise ValidationError({'non_field_errors': [f"Máximo {maximo} elementos por lote."]})
+
+
+def _por_indice(errores):
+    # Según la versión de DRF, los errores de un many=True son una lista alineada con
+    # los datos o un dict índice -> errores
+    return errores.items() if isinstance(errores, dict) else enumerate(errores)
+
+
+def _errores_del_lote(errores):
+    return Response(
+        {'errores': [{'indice': indice, 'errores': error} for indice, error in sorted(errores, key=lambda e: e[0]) if error]},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
 # Usuarios (solo lectura)
-class UsuarioViewSet(viewsets.ReadOnlyModelViewSet):
+class UsuarioViewSet(GetCondicionalMixin, ListadoRapidoMixin, viewsets.ReadOnlyModelViewSet):
     queryset = User.objects.all().order_by('username')
     serializer_class = UsuarioSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = PaginacionPorUsername
+
+    def claves_version(self):
+        return [CLAVE_USUARIOS]
 
 # Grupos
-class GrupoViewSet(viewsets.ModelViewSet):
-    queryset = Grupo.objects.all().order_by('-fecha_creacion')
+class GrupoViewSet(GetCondicionalMixin, ListadoRapidoMixin, AcotadoAlGrupoMixin, viewsets.ModelViewSet):
+    queryset = Grupo.objects.all().order_by('-fecha_creacion', '-id')
     serializer_class = GrupoSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = PaginacionPorFechaCreacion
+    campo_grupo = 'pk'
 
 # Perfiles de usuario
-class PerfilUsuarioViewSet(viewsets.ModelViewSet):
-    queryset = PerfilUsuario.objects.select_related('user', 'grupo').all()
+class PerfilUsuarioViewSet(GetCondicionalMixin, ListadoRapidoMixin, AcotadoAlGrupoMixin, viewsets.ModelViewSet):
+    queryset = PerfilUsuario.objects.select_related('user', 'grupo').all().order_by('-id')
     serializer_class = PerfilUsuarioSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = CursorPaginacion
 
 # Documentos
-class DocumentoViewSet(viewsets.ModelViewSet):
-    queryset = Documento.objects.select_related('grupo', 'usuario').all().order_by('-fecha_subida')
+class DocumentoViewSet(GetCondicionalMixin, ListadoRapidoMixin, AcotadoAlGrupoMixin, CamposAcotadosMixin, viewsets.ModelViewSet):
+    queryset = Documento.objects.select_related('grupo', 'usuario').all().order_by('-fecha_subida', '-id')
     serializer_class = DocumentoSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = PaginacionPorFechaSubida
+
+    # ?grupo= &tipo_documento= &procesado=true|false &desde=AAAA-MM-DD &hasta=AAAA-MM-DD
+    def filtrar(self, queryset, params):
+        filtros = {}
+        grupo = _param_int(params, 'grupo')
+        if grupo is not None:
+            filtros['grupo_id'] = grupo
+        tipos = _param_opciones(params, 'tipo_documento', Documento.TIPOS)
+        if tipos:
+            filtros['tipo_documento__in'] = tipos
+        procesado = _param_bool(params, 'procesado')
+        if procesado is not None:
+            filtros['procesado'] = procesado
+        desde = _param_fecha(params, 'desde')
+        if desde:
+            filtros['fecha_subida__gte'] = _inicio_del_dia(desde)
+        hasta = _param_fecha(params, 'hasta')
+        if hasta:
+            filtros['fecha_subida__lt'] = _inicio_del_dia(hasta + timedelta(days=1))
+        return queryset.filter(**filtros)
 
     # si querés que el usuario logueado sea automáticamente el "uploader"
     def perform_create(self, serializer):
+        self.verificar_grupo(serializer)
         if self.request.user.is_authenticated:
             serializer.save(usuario=self.request.user)
         else:
             serializer.save()
 
 # Tareas
-class TareaViewSet(viewsets.ModelViewSet):
-    queryset = Tarea.objects.select_related('grupo', 'documento', 'creado_por', 'asignado_a').all().order_by('-fecha_creacion')
+class TareaViewSet(LoteMixin, GetCondicionalMixin, ListadoRapidoMixin, AcotadoAlGrupoMixin, CamposAcotadosMixin, viewsets.ModelViewSet):
+    queryset = Tarea.objects.select_related('grupo', 'documento', 'creado_por', 'asignado_a').all().order_by('-fecha_creacion', '-id')
     serializer_class = TareaSerializer
     permission_classes = [permissions.AllowAny]
+    pagination_class = PaginacionPorFechaCreacion
+
+    # ?grupo= &estado=pendiente,en_progreso &asignado_a= &vence_desde= &vence_hasta= &monto_min= &monto_max=
+    def filtrar(self, queryset, params):
+        filtros = {}
+        grupo = _param_int(params, 'grupo')
+        if grupo is not None:
+            filtros['grupo_id'] = grupo
+        estados = _param_opciones(params, 'estado', Tarea.ESTADOS)
+        if estados:
+            filtros['estado__in'] = estados
+        asignado_a = _param_int(params, 'asignado_a')
+        if asignado_a is not None:
+            filtros['asignado_a_id'] = asignado_a
+        vence_desde = _param_fecha(params, 'vence_desde')
+        if vence_desde:
+            filtros['fecha_vencimiento__gte'] = vence_desde
+        vence_hasta = _param_fecha(params, 'vence_hasta')
+        if vence_hasta:
+            filtros['fecha_vencimiento__lte'] = vence_hasta
+        monto_min = _param_decimal(params, 'monto_min')
+        if monto_min is not None:
+            filtros['monto__gte'] = monto_min
+        monto_max = _param_decimal(params, 'monto_max')
+        if monto_max is not None:
+            filtros['monto__lte'] = monto_max
+        return queryset.filter(**filtros)
 
     def perform_create(self, serializer):
+        self.verificar_grupo(serializer)
         if self.request.user.is_authenticated:
             serializer.save(creado_por=self.request.user)
         else:
             serializer.save()
 
+    def preparar_creacion(self, instancia):
+        if self.request.user.is_authenticated:
+            instancia.creado_por = self.request.user
+
+    def despues_del_lote(self, creadas, actualizadas):
+        # Lo que hacen las señales post_save de Tarea
+        ajustar_tareas(creadas, creadas=True)
+        ajustar_tareas(actualizadas)
+        publicar_al_confirmar(
+            [evento_de_tarea(tarea, 'creada') for tarea in creadas]
+            + [evento_de_tarea(tarea, 'actualizada') for tarea in actualizadas]
+        )
+        programar_notificaciones(creadas, creadas=True)
+        programar_notificaciones(actualizadas, creadas=False)
+        registrar_cambios_de_vencimiento(actualizadas)
+
 # Notificaciones
-class NotificacionViewSet(viewsets.ModelViewSet):
-    queryset = Notificacion.objects.select_related('usuario', 'tarea').all().order_by('-fecha_envio')
+class NotificacionViewSet(LoteMixin, GetCondicionalMixin, ListadoRapidoMixin, AcotadoAlGrupoMixin, CamposAcotadosMixin, viewsets.ModelViewSet):
+    queryset = Notificacion.objects.select_related('usuario', 'tarea').all().order_by('-fecha_envio', '-id')
     serializer_class = NotificacionSerializer
-    permission_classes = [permissions.AllowAny]
\ No newline at end of file
+    permission_classes = [permissions.AllowAny]
+    pagination_class = PaginacionPorFechaEnvio
+    campo_grupo = 'tarea__grupo'
+
+    # ?usuario= &leida=true|false
+    def filtrar(self, queryset, params):
+        filtros = {}
+        usuario = _param_int(params, 'usuario')
+        if usuario is not None:
+            filtros['usuario_id'] = usuario
+        leida = _param_bool(params, 'leida')
+        if leida is not None:
+            filtros['leida'] = leida
+        return queryset.filter(**filtros)
+
+    def preparar_creacion(self, instancia):
+        # El serializer no recibe el usuario: la notificación es para quien la crea
+        if not self.request.user.is_authenticated:
+            raise ValidationError({'usuario': ['Se requiere un usuario autenticado.']})
+        instancia.usuario = self.request.user
+
+    def despues_del_lote(self, creadas, actualizadas):
+        # Lo que hacen las señales post_save de Notificacion
+        ajustar_notificaciones(creadas, creadas=True)
+        ajustar_notificaciones(actualizadas)
+        publicar_al_confirmar(
+            [evento_de_notificacion(notificacion, 'creada') for notificacion in creadas]
+            + [evento_de_notificacion(notificacion, 'actualizada') for notificacion in actualizadas]
+        )
+
+# Tablero: contadores mantenidos por las señales (ver resumenes.py)
+class TableroViewSet(viewsets.ViewSet):
+    """
+    GET /api/tablero/: notificaciones sin leer del usuario y, por grupo, tareas por
+    estado, vencidas y monto de las abiertas que vencen este mes. Lee unas pocas filas
+    por grupo, no las tareas ni las notificaciones. ?grupo= para ver uno solo.
+    """
+    permission_classes = [permissions.AllowAny]
+    campo_monto = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+    def list(self, request):
+        grupo_id = _grupo_del_usuario(request)
+        if grupo_id is None:
+            grupo_id = _param_int(request.query_params, 'grupo')
+
+        hoy = timezone.localdate()
+        inicio_mes = hoy.replace(day=1)
+        fin_mes = (inicio_mes + timedelta(days=32)).replace(day=1)
+        vacio = {**{campo: 0 for campo in CAMPO_POR_ESTADO.values()}, 'tareas_vencidas': 0, 'monto_del_mes': Decimal('0')}
+
+        resumenes = ResumenGrupo.objects.all()
+        vencimientos = ResumenVencimiento.objects.filter(fecha_vencimiento__lt=fin_mes)
+        grupos = {}
+        if grupo_id is not None:
+            resumenes = resumenes.filter(grupo_id=grupo_id)
+            vencimientos = vencimientos.filter(grupo_id=grupo_id)
+            grupos[grupo_id] = {'grupo': grupo_id, **vacio}
+
+        for fila in resumenes.values('grupo_id', *CAMPO_POR_ESTADO.values()):
+            grupo = grupos.setdefault(fila['grupo_id'], {'grupo': fila['grupo_id'], **vacio})
+            grupo.update({campo: fila[campo] for campo in CAMPO_POR_ESTADO.values()})
+
+        # Vencidas y monto del mes: una fila por grupo y día, agregadas en la base
+        for fila in vencimientos.values('grupo_id').annotate(
+            vencidas=Sum('tareas', filter=Q(fecha_vencimiento__lt=hoy)),
+            monto=Sum('monto', filter=Q(fecha_vencimiento__gte=inicio_mes)),
+        ):
+            grupo = grupos.setdefault(fila['grupo_id'], {'grupo': fila['grupo_id'], **vacio})
+            grupo['tareas_vencidas'] = fila['vencidas'] or 0
+            grupo['monto_del_mes'] = fila['monto'] or Decimal('0')
+
+        no_leidas = None
+        if request.user.is_authenticated:
+            no_leidas = ResumenUsuario.objects.filter(user=request.user).values_list(
+                'notificaciones_no_leidas', flat=True
+            ).first() or 0
+
+        for grupo in grupos.values():
+            grupo['monto_del_mes'] = self.campo_monto.to_representation(grupo['monto_del_mes'])
+        return Response({
+            'fecha': hoy,
+            'notificaciones_no_leidas': no_leidas,
+            'grupos': [grupos[grupo] for grupo in sorted(grupos)],
+        })
\ No newline at end of file
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApiHomeCloudConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api_home_cloud'
+
+    def ready(self):
+        # Registra los receivers de signals.py
+        from . import signals  # noqa: F401
@@ -1,9 +1,21 @@
 import os
+import base64
+import hashlib
 import logging
-from typing import List, Optional, BinaryIO
-from azure.storage.blob import BlobServiceClient, BlobClient, ContainerClient
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, BinaryIO
+from azure.storage.blob import (
+    BlobServiceClient, BlobClient, ContainerClient, BlobBlock, ContentSettings,
+    BlobSasPermissions, generate_blob_sas,
+)
 from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
 from django.conf import settings
+from django.core.cache import caches
+from .storage_backends import StorageBackend
+from .azure_transport import build_retry_policy, build_transport, operation, track_operation
 
 # Instancias BlobServiceClient (Te conectas a Azure). ↓
 # Le pides al servicio un ContainerClient (Eliges la carpeta "media"). ↓
@@ -13,42 +25,139 @@ from django.conf import settings
 
 logger = logging.getLogger(__name__)
 
-class AzureStorageService:
+# Serializa el descarte del cliente heredado tras un fork (ver `blob_service_client`).
+# En el hijo se reemplaza por uno nuevo: otro hilo del padre podía tenerlo tomado al forkear.
+_fork_lock = threading.Lock()
+
+
+def _reset_fork_lock():
+    global _fork_lock
+    _fork_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_fork_lock)
+
+class AzureStorageService(StorageBackend):
     """
     Clase de servicio que encapsula la interacción con la API de Azure Blob Storage.
     """
+    name = 'azure'
+
     def __init__(self):
         """
         Constructor de la clase.
         Realiza la inyección de dependencias de configuración obteniendo las credenciales
-        desde `django.conf.settings`. Inicializa el `BlobServiceClient` mediante
-        Connection String o par Account Name/Key.
+        desde `django.conf.settings`. No crea el `BlobServiceClient` (ver `blob_service_client`).
         """
         # Recuperación segura de constantes de configuración mediante getattr (evita AttributeError)
         self.account_name = getattr(settings, 'AZURE_STORAGE_ACCOUNT_NAME', None)
         self.account_key = getattr(settings, 'AZURE_STORAGE_ACCOUNT_KEY', None)
         self.connection_string = getattr(settings, 'AZURE_STORAGE_CONNECTION_STRING', None)
         self.container_name = getattr(settings, 'AZURE_STORAGE_CONTAINER_NAME', 'files')
+        # Tamaño de cada bloque leído en las descargas en streaming (memoria constante por request)
+        self.download_chunk_size = getattr(settings, 'AZURE_STORAGE_DOWNLOAD_CHUNK_SIZE', 4 * 1024 * 1024)
+        # Subida por bloques: tamaño de bloque, hilos simultáneos y umbral para usar un único PUT
+        self.upload_block_size = getattr(settings, 'AZURE_STORAGE_UPLOAD_BLOCK_SIZE', 8 * 1024 * 1024)
+        self.upload_max_concurrency = getattr(settings, 'AZURE_STORAGE_UPLOAD_MAX_CONCURRENCY', 4)
+        self.upload_single_shot_threshold = getattr(
+            settings, 'AZURE_STORAGE_UPLOAD_SINGLE_SHOT_THRESHOLD', 64 * 1024 * 1024
+        )
+        # Listados paginados: tamaño de página por defecto/máximo y TTL de la caché
+        self.list_page_size = getattr(settings, 'AZURE_STORAGE_LIST_PAGE_SIZE', 100)
+        self.list_max_page_size = getattr(settings, 'AZURE_STORAGE_LIST_MAX_PAGE_SIZE', 1000)
+        self.list_cache_ttl = getattr(settings, 'AZURE_STORAGE_LIST_CACHE_TTL', 30)
+        # Vigencia de las URLs SAS para subidas directas del cliente a Azure
+        self.sas_expiry_seconds = getattr(settings, 'AZURE_STORAGE_SAS_EXPIRY_SECONDS', 15 * 60)
+        # El cliente se crea al primer uso y una vez por proceso (ver `blob_service_client`):
+        # importar el módulo no hace I/O de red y cada worker de un servidor pre-fork
+        # tiene su propio pool de conexiones en lugar de compartir sockets con el padre.
+        self._client = None
+        self._client_pid = None
+        self._container_checked = False
+        self._lock = threading.Lock()
         # Validación de integridad de la configuración antes de intentar la conexión
         if not self._is_configured():
             logger.warning("Azure Storage no está configurado correctamente")
-            self.blob_service_client = None
-            return
 
+    @property
+    def blob_service_client(self) -> Optional[BlobServiceClient]:
+        """
+        `BlobServiceClient` del proceso actual, creado de forma perezosa.
+
+        Si el proceso cambió (fork) desde que se creó el cliente, se descarta y se crea
+        uno nuevo. Devuelve None si Azure no está configurado o la creación falló.
+        """
+        pid = os.getpid()
+        if self._client is not None and self._client_pid == pid:
+            return self._client
+
+        if not self._is_configured():
+            return None
+
+        if self._client_pid != pid:
+            with _fork_lock:
+                if self._client_pid != pid:
+                    # Proceso nuevo: nada de lo heredado del padre (cliente, lock) es
+                    # reutilizable. El pid se asigna al final: quien lo vea ya actualizado
+                    # ve también el lock nuevo.
+                    self._client = None
+                    self._container_checked = False
+                    self._lock = threading.Lock()
+                    self._client_pid = pid
+
+        with self._lock:
+            if self._client is None:
+                self._client = self._create_client()
+            if self._client is not None and not self._container_checked:
+                # Verificación de pre-condiciones: El contenedor destino debe existir
+                self._ensure_container_exists(self._client)
+                self._container_checked = True
+
+        return self._client
+
+    @blob_service_client.setter
+    def blob_service_client(self, client: Optional[BlobServiceClient]):
+        """
+        Permite inyectar un cliente ya construido (por ejemplo un doble en tests).
+        """
+        self._client = client
+        self._client_pid = os.getpid()
+        self._container_checked = True
+
+    def _create_client(self) -> Optional[BlobServiceClient]:
+        """
+        Construye el `BlobServiceClient` mediante Connection String o par Account Name/Key.
+        No hace llamadas de red.
+        """
         try:
+            # El SDK pide por defecto un primer GET de 32 MB; lo alineamos al tamaño de bloque
+            # para que ninguna descarga retenga en memoria más de un bloque a la vez.
+            client_options = {
+                'max_single_get_size': self.download_chunk_size,
+                'max_chunk_get_size': self.download_chunk_size,
+                # Un único transporte (pool keep-alive) y política de reintentos por proceso;
+                # los BlobClient/ContainerClient que se derivan del servicio lo comparten.
+                'transport': build_transport(),
+                'retry_policy': build_retry_policy(),
+            }
             # Prioridad a Connection String sobre Account Key
             if self.connection_string:
-                self.blob_service_client = BlobServiceClient.from_connection_string(self.connection_string)
-            else:
-                account_url = f"https://{self.account_name}.blob.core.windows.net"
-                self.blob_service_client = BlobServiceClient(account_url=account_url, credential=self.account_key)
+                return BlobServiceClient.from_connection_string(self.connection_string, **client_options)
 
-            # Verificación de pre-condiciones: El contenedor destino debe existir
-            self._ensure_container_exists()
+            account_url = f"https://{self.account_name}.blob.core.windows.net"
+            return BlobServiceClient(account_url=account_url, credential=self.account_key, **client_options)
 
         except Exception as e:
             logger.error(f"Error inicializando Azure Storage: {str(e)}")
-            self.blob_service_client = None
+            return None
+
+    @property
+    def is_configured(self) -> bool:
+        """
+        True si el cliente de Azure quedó inicializado.
+        """
+        return self.blob_service_client is not None
 
     def _is_configured(self) -> bool:
         """
@@ -62,27 +171,36 @@ class AzureStorageService:
             self.connection_string
         ) and self.container_name
 
-    def _ensure_container_exists(self):
+    def _ensure_container_exists(self, client: BlobServiceClient):
         """
         Garantiza la existencia del contenedor (bucket) en el servicio remoto.
         Implementa una operación idempotente (safe creation).
-        """        
-        if not self.blob_service_client:
+
+        El resultado se guarda en `storage_cache()`: con una caché compartida solo el
+        primer proceso que arranca paga el round trip; con la de memoria por defecto,
+        una vez por proceso.
+        """
+        cache = storage_cache()
+        cache_key = container_cache_key(self.container_name)
+        if cache.get(cache_key):
             return
 
         try:
             # Instanciación del cliente de nivel 'Contenedor'
-            container_client = self.blob_service_client.get_container_client(self.container_name)
+            container_client = client.get_container_client(self.container_name)
             # Intento de creación. Lanza ResourceExistsError si ya existe.
             container_client.create_container()
             logger.info(f"Contenedor '{self.container_name}' creado")
+            cache.set(cache_key, True, None)
 
         except ResourceExistsError:
             # Manejo de excepción esperada: El recurso ya existe, flujo normal.
             logger.info(f"Contenedor '{self.container_name}' ya existe")
+            cache.set(cache_key, True, None)
         except Exception as e:
             logger.error(f"Error creando contenedor: {str(e)}")
 
+    @track_operation('upload_file')
     def upload_file(self, file_obj: BinaryIO, blob_name: str, content_type: str = None) -> Optional[str]:
         """
         Realiza la transmisión (upload) de un flujo binario hacia Azure.
@@ -108,9 +226,17 @@ class AzureStorageService:
             # CRÍTICO: Reinicio del puntero de lectura del stream.
             # Garantiza que se lea el archivo desde el byte 0, en caso de lecturas previas.
             file_obj.seek(0)  # Asegurar que estamos al inicio del archivo
-            # Ejecución de la transferencia de datos. 'overwrite=True' impone semántica de reemplazo.
-            blob_client.upload_blob(file_obj, overwrite=True, content_type=content_type)
+            size = _stream_size(file_obj)
 
+            if size is not None and size <= self.upload_single_shot_threshold:
+                # Ejecución de la transferencia de datos. 'overwrite=True' impone semántica de reemplazo.
+                blob_client.upload_blob(file_obj, overwrite=True, content_type=content_type)
+            else:
+                # Archivos grandes (o de tamaño desconocido): bloques en paralelo + commit final.
+                # Commit Block List reemplaza el contenido, equivalente a overwrite=True.
+                self._upload_in_blocks(blob_client, file_obj, content_type)
+
+            invalidate_listing_cache()
             logger.info(f"Archivo '{blob_name}' subido exitosamente")
             return blob_client.url
 
@@ -118,6 +244,131 @@ class AzureStorageService:
             logger.error(f"Error subiendo archivo '{blob_name}': {str(e)}")
             return None
 
+    def _upload_in_blocks(self, blob_client: BlobClient, file_obj: BinaryIO, content_type: str = None):
+        """
+        Sube un stream dividido en bloques de `upload_block_size` bytes usando un pool
+        de `upload_max_concurrency` hilos y confirma la lista de bloques al final.
+
+        La lectura del stream es secuencial (un único hilo), pero el envío de cada bloque
+        (Put Block) ocurre en paralelo. Un semáforo limita los bloques leídos y aún no
+        enviados, así la memoria usada queda acotada a ~2 x concurrencia x tamaño de bloque.
+
+        Raises:
+            Exception: la primera excepción de cualquier Put Block; en ese caso no se
+            hace el commit y el blob previo (si existía) queda intacto.
+        """
+        in_flight = threading.BoundedSemaphore(self.upload_max_concurrency * 2)
+        failed = threading.Event()
+        block_ids = []
+        futures = []
+
+        def stage(block_id, data):
+            try:
+                # Los hilos del pool no heredan la operación en curso del hilo que sube
+                with operation('upload_file'):
+                    blob_client.stage_block(block_id=block_id, data=data, length=len(data))
+            except Exception:
+                failed.set()
+                raise
+            finally:
+                in_flight.release()
+
+        with ThreadPoolExecutor(max_workers=self.upload_max_concurrency) as executor:
+            try:
+                index = 0
+                while True:
+                    in_flight.acquire()
+                    data = file_obj.read(self.upload_block_size)
+                    if not data:
+                        in_flight.release()
+                        break
+
+                    block_id = make_block_id(index)
+                    block_ids.append(block_id)
+                    futures.append(executor.submit(stage, block_id, data))
+                    index += 1
+
+                    # Cortar la lectura en cuanto falle algún bloque
+                    if failed.is_set():
+                        break
+
+                for future in futures:
+                    future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        blob_client.commit_block_list(
+            [BlobBlock(block_id=block_id) for block_id in block_ids],
+            content_settings=ContentSettings(content_type=content_type),
+        )
+        logger.info(f"Archivo '{blob_client.blob_name}' subido en {len(block_ids)} bloques")
+
+    @track_operation('stage_block')
+    def stage_block(self, blob_name: str, block_id: str, data: bytes) -> bool:
+        """
+        Sube un bloque sin confirmar (Put Block) para un blob.
+
+        Args:
+            blob_name: Nombre del blob
+            block_id: Identificador del bloque (ver `make_block_id`)
+            data: Contenido del bloque
+
+        Returns:
+            True si el bloque quedó guardado, False si falló
+        """
+        if not self.blob_service_client:
+            logger.error("Azure Storage no está configurado")
+            return False
+
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            blob_client.stage_block(block_id=block_id, data=data, length=len(data))
+            return True
+
+        except Exception as e:
+            logger.error(f"Error subiendo bloque de '{blob_name}': {str(e)}")
+            return False
+
+    @track_operation('commit_blocks')
+    def commit_blocks(self, blob_name: str, block_ids: List[str], content_type: str = None) -> Optional[str]:
+        """
+        Confirma (Put Block List) los bloques subidos con `stage_block`, en el orden dado.
+
+        Args:
+            blob_name: Nombre del blob
+            block_ids: Identificadores de bloque en el orden final del archivo
+            content_type: Tipo MIME del archivo
+
+        Returns:
+            URL del blob resultante, None si falló
+        """
+        if not self.blob_service_client:
+            logger.error("Azure Storage no está configurado")
+            return None
+
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            blob_client.commit_block_list(
+                [BlobBlock(block_id=block_id) for block_id in block_ids],
+                content_settings=ContentSettings(content_type=content_type),
+            )
+            invalidate_listing_cache()
+            logger.info(f"Archivo '{blob_name}' confirmado con {len(block_ids)} bloques")
+            return blob_client.url
+
+        except Exception as e:
+            logger.error(f"Error confirmando bloques de '{blob_name}': {str(e)}")
+            return None
+
+    @track_operation('download_file')
     def download_file(self, blob_name: str) -> Optional[bytes]:
         """
         Descarga un archivo desde Azure Blob Storage
@@ -151,6 +402,87 @@ class AzureStorageService:
             logger.error(f"Error descargando archivo '{blob_name}': {str(e)}")
             return None
 
+    @track_operation('get_file_properties')
+    def get_file_properties(self, blob_name: str) -> Optional[dict]:
+        """
+        Obtiene los metadatos de un blob sin descargar su contenido (HEAD).
+
+        Args:
+            blob_name: Nombre del blob
+
+        Returns:
+            Diccionario con 'size', 'content_type', 'etag' y 'last_modified',
+            None si el archivo no existe o falló la consulta
+        """
+        if not self.blob_service_client:
+            logger.error("Azure Storage no está configurado")
+            return None
+
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            properties = blob_client.get_blob_properties()
+
+            return {
+                'size': properties.size,
+                'content_type': properties.content_settings.content_type,
+                'etag': properties.etag,
+                'last_modified': properties.last_modified,
+            }
+
+        except ResourceNotFoundError:
+            logger.error(f"Archivo '{blob_name}' no encontrado")
+            return None
+        except Exception as e:
+            logger.error(f"Error obteniendo propiedades de '{blob_name}': {str(e)}")
+            return None
+
+    @track_operation('stream_file')
+    def stream_file(self, blob_name: str, offset: Optional[int] = None, length: Optional[int] = None) -> Optional[dict]:
+        """
+        Abre una descarga en streaming de un archivo de Azure Blob Storage.
+
+        A diferencia de `download_file`, el contenido no se carga completo en memoria:
+        se devuelve un iterador que va pidiendo bloques de `download_chunk_size` bytes
+        a medida que el cliente HTTP los consume.
+
+        Args:
+            blob_name: Nombre del blob
+            offset: Byte inicial a descargar (para peticiones con Range)
+            length: Cantidad de bytes a descargar desde `offset`
+
+        Returns:
+            Diccionario con 'chunks' (iterador de bytes) y 'size' (bytes a transferir),
+            None si el archivo no existe o falló la descarga
+        """
+        if not self.blob_service_client:
+            logger.error("Azure Storage no está configurado")
+            return None
+
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            # download_blob() hace el primer GET aquí, así un blob inexistente se detecta
+            # antes de empezar a responder al cliente. Con offset/length sólo viajan esos bytes.
+            downloader = blob_client.download_blob(offset=offset, length=length)
+
+            return {
+                'chunks': _iter_chunks(downloader, self.download_chunk_size),
+                'size': downloader.size,
+            }
+
+        except ResourceNotFoundError:
+            logger.error(f"Archivo '{blob_name}' no encontrado")
+            return None
+        except Exception as e:
+            logger.error(f"Error descargando archivo '{blob_name}': {str(e)}")
+            return None
+
+    @track_operation('delete_file')
     def delete_file(self, blob_name: str) -> bool:
         """
         Elimina un archivo de Azure Blob Storage
@@ -172,6 +504,7 @@ class AzureStorageService:
             )
 
             blob_client.delete_blob()
+            invalidate_listing_cache()
             logger.info(f"Archivo '{blob_name}' eliminado exitosamente")
             return True
 
@@ -182,6 +515,7 @@ class AzureStorageService:
             logger.error(f"Error eliminando archivo '{blob_name}': {str(e)}")
             return False
 
+    @track_operation('list_files')
     def list_files(self, prefix: str = "") -> List[dict]:
         """
         Lista archivos en el contenedor
@@ -202,12 +536,7 @@ class AzureStorageService:
 
             files = []
             for blob in blobs:
-                files.append({
-                    'name': blob.name,
-                    'size': blob.size,
-                    'last_modified': blob.last_modified,
-                    'url': f"https://{self.account_name}.blob.core.windows.net/{self.container_name}/{blob.name}"
-                })
+                files.append(self._blob_info(blob))
 
             return files
 
@@ -215,6 +544,105 @@ class AzureStorageService:
             logger.error(f"Error listando archivos: {str(e)}")
             return []
 
+    @track_operation('list_files_page')
+    def list_files_page(self, prefix: str = "", page_size: Optional[int] = None,
+                        continuation_token: Optional[str] = None) -> Optional[dict]:
+        """
+        Lista una página de archivos usando el continuation token de Azure.
+
+        Las páginas se guardan en `storage_cache()` durante `list_cache_ttl` segundos,
+        con clave por prefijo + tamaño + token; subir o borrar archivos invalida la caché.
+
+        Args:
+            prefix: Prefijo para filtrar archivos
+            page_size: Cantidad máxima de blobs por página
+            continuation_token: Token devuelto por la página anterior (None = primera página)
+
+        Returns:
+            Diccionario con 'files' y 'continuation_token' (None en la última página),
+            None si falló el listado
+        """
+        if not self.blob_service_client:
+            logger.error("Azure Storage no está configurado")
+            return None
+
+        page_size = min(page_size or self.list_page_size, self.list_max_page_size)
+        cache_key = listing_cache_key(prefix, page_size, continuation_token)
+        page = storage_cache().get(cache_key)
+        if page is not None:
+            return page
+
+        try:
+            container_client = self.blob_service_client.get_container_client(self.container_name)
+            pager = container_client.list_blobs(
+                name_starts_with=prefix, results_per_page=page_size
+            ).by_page(continuation_token=continuation_token)
+
+            files = [self._blob_info(blob) for blob in next(pager, [])]
+            page = {
+                'files': files,
+                'continuation_token': pager.continuation_token or None,
+            }
+            storage_cache().set(cache_key, page, self.list_cache_ttl)
+
+            return page
+
+        except Exception as e:
+            logger.error(f"Error listando archivos: {str(e)}")
+            return None
+
+    def _blob_info(self, blob) -> dict:
+        return {
+            'name': blob.name,
+            'size': blob.size,
+            'last_modified': blob.last_modified,
+            'url': f"https://{self.account_name}.blob.core.windows.net/{self.container_name}/{blob.name}"
+        }
+
+    @track_operation('generate_upload_url')
+    def generate_upload_url(self, blob_name: str, expires_in: Optional[int] = None) -> Optional[dict]:
+        """
+        Genera una URL SAS de solo escritura para que el cliente suba el blob directamente
+        a Azure (PUT con 'x-ms-blob-type: BlockBlob'), sin pasar los bytes por Django.
+
+        Args:
+            blob_name: Nombre del blob a crear o reemplazar
+            expires_in: Segundos de validez (por defecto `sas_expiry_seconds`)
+
+        Returns:
+            Diccionario con 'url' y 'expires_at', None si no hay Account Key para firmar
+        """
+        if not self.blob_service_client:
+            logger.error("Azure Storage no está configurado")
+            return None
+
+        # Con Connection String la clave viene dentro de la credencial del cliente
+        credential = self.blob_service_client.credential
+        account_key = self.account_key or getattr(credential, 'account_key', None)
+        if not account_key:
+            logger.error("No hay Account Key disponible para firmar URLs SAS")
+            return None
+
+        try:
+            blob_client = self.blob_service_client.get_blob_client(
+                container=self.container_name,
+                blob=blob_name
+            )
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in or self.sas_expiry_seconds)
+            sas_token = sign_upload_sas(
+                self.blob_service_client.account_name, account_key,
+                self.container_name, blob_name, expires_at
+            )
+
+            return {
+                'url': f"{blob_client.url}?{sas_token}",
+                'expires_at': expires_at,
+            }
+
+        except Exception as e:
+            logger.error(f"Error generando URL SAS para '{blob_name}': {str(e)}")
+            return None
+
     def get_file_url(self, blob_name: str) -> Optional[str]:
         """
         Obtiene la URL de un archivo
@@ -237,6 +665,115 @@ class AzureStorageService:
         except Exception:
             return None
 
+LISTING_GENERATION_KEY = 'azure_storage:list_generation'
+
+def container_cache_key(container_name: str) -> str:
+    """
+    Marca de "el contenedor existe", compartida por el servicio síncrono y el async.
+    """
+    return f"azure_storage:container_ok:{container_name}"
+
+def storage_cache():
+    """
+    Caché de los listados (alias AZURE_STORAGE_CACHE_ALIAS de CACHES). Con una caché
+    en memoria cada worker tiene la suya y solo se invalida la del que atendió la
+    subida o el borrado: con varios workers tiene que ser una compartida (Redis).
+    """
+    return caches[getattr(settings, 'AZURE_STORAGE_CACHE_ALIAS', 'default')]
+
+def listing_cache_key(prefix: str, page_size: int, continuation_token: Optional[str]) -> str:
+    """
+    Clave de caché de una página de listado. Incluye la generación vigente, así que
+    al invalidar las páginas viejas quedan inalcanzables y expiran solas por TTL.
+    """
+    generation = storage_cache().get_or_set(LISTING_GENERATION_KEY, time.time_ns(), None)
+    page_id = hashlib.sha1(f"{prefix}|{page_size}|{continuation_token or ''}".encode()).hexdigest()
+    return f"azure_storage:list:{generation}:{page_id}"
+
+def invalidate_listing_cache():
+    """
+    Invalida todas las páginas de listado cacheadas (tras subir o borrar un blob).
+
+    Se invalida por completo y no por prefijo: un blob aparece en los listados de
+    todos sus prefijos posibles, y subir o borrar es mucho menos frecuente que listar.
+    """
+    cache = storage_cache()
+    try:
+        cache.incr(LISTING_GENERATION_KEY)
+    except ValueError:
+        # La clave expiró o fue desalojada: una generación nueva basada en el reloj
+        # nunca coincide con una anterior
+        cache.set(LISTING_GENERATION_KEY, time.time_ns(), None)
+
+def sign_upload_sas(account_name: str, account_key: str, container_name: str,
+                    blob_name: str, expires_at: datetime) -> str:
+    """
+    Firma un token SAS de creación/escritura para un único blob.
+
+    La firma es un HMAC local con la Account Key: no hace ninguna llamada de red,
+    por lo que puede usarse sin conexión (por ejemplo en tests con una clave falsa).
+    """
+    return generate_blob_sas(
+        account_name=account_name,
+        container_name=container_name,
+        blob_name=blob_name,
+        account_key=account_key,
+        permission=BlobSasPermissions(create=True, write=True),
+        expiry=expires_at,
+    )
+
+def make_block_id(index: int, prefix: str = "") -> str:
+    """
+    Genera el identificador (base64) de un bloque a partir de su posición.
+
+    Azure exige que todos los ids de bloque de un mismo blob tengan la misma longitud,
+    por eso el índice se rellena con ceros.
+    """
+    return base64.b64encode(f"{prefix}{index:08d}".encode()).decode()
+
+def _stream_size(file_obj: BinaryIO) -> Optional[int]:
+    """
+    Tamaño restante de un stream desde la posición actual, o None si no se puede saber.
+    """
+    size = getattr(file_obj, 'size', None)
+    if size is not None:
+        return size
+
+    try:
+        position = file_obj.tell()
+        end = file_obj.seek(0, os.SEEK_END)
+        file_obj.seek(position)
+        return end - position
+    except (AttributeError, OSError, ValueError):
+        return None
+
+def _iter_chunks(downloader, chunk_size: int) -> Iterator[bytes]:
+    """
+    Recorre una descarga bloque a bloque.
+
+    Usa `chunks()` del `StorageStreamDownloader` del SDK; si el objeto no lo ofrece
+    (por ejemplo un doble local usado en tests que devuelve un archivo), lee con
+    `read(chunk_size)` hasta agotar el stream.
+
+    Los GET de cada bloque ocurren al iterar, fuera de `stream_file`: se atribuyen a
+    'stream_file' solo mientras se pide el bloque, no mientras quien consume lo usa.
+    """
+    if hasattr(downloader, 'chunks'):
+        chunks = iter(downloader.chunks())
+
+        def read_chunk():
+            return next(chunks, b'')
+    else:
+        def read_chunk():
+            return downloader.read(chunk_size)
+
+    while True:
+        with operation('stream_file'):
+            chunk = read_chunk()
+        if not chunk:
+            break
+        yield chunk
+
 # Instanciación Singleton del servicio a nivel de módulo.
-# Esto asegura que la conexión se configure una única vez al importar el módulo.
+# Solo lee la configuración: la conexión se configura al primer uso en cada proceso.
 azure_storage = AzureStorageService()
\ No newline at end of file
@@ -0,0 +1,331 @@
+import asyncio
+import logging
+import weakref
+from typing import AsyncIterator, List, Optional, BinaryIO
+from asgiref.sync import sync_to_async
+from azure.storage.blob.aio import BlobServiceClient
+from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
+from django.conf import settings
+from .azure_storage import container_cache_key, invalidate_listing_cache, listing_cache_key, storage_cache
+
+# Versión asíncrona de AzureStorageService (SDK azure.storage.blob.aio + aiohttp).
+# Misma interfaz que el servicio síncrono, pero cada operación es una corutina:
+# mientras se espera a Azure el event loop atiende otras peticiones, así un único
+# proceso ASGI puede sostener cientos de transferencias lentas sin un hilo por cada una.
+# Solo se usa bajo ASGI (ver get_async_storage_backend): el cliente vive tanto como el
+# event loop del servidor, es decir, como el proceso.
+
+logger = logging.getLogger(__name__)
+
+class AsyncAzureStorageService:
+    """
+    Clase de servicio asíncrona para Azure Blob Storage.
+    """
+    def __init__(self):
+        """
+        Constructor de la clase.
+        Solo lee la configuración: el cliente se crea al primer uso dentro del event loop,
+        porque la sesión aiohttp queda ligada al loop en el que se creó.
+        """
+        self.account_name = getattr(settings, 'AZURE_STORAGE_ACCOUNT_NAME', None)
+        self.account_key = getattr(settings, 'AZURE_STORAGE_ACCOUNT_KEY', None)
+        self.connection_string = getattr(settings, 'AZURE_STORAGE_CONNECTION_STRING', None)
+        self.container_name = getattr(settings, 'AZURE_STORAGE_CONTAINER_NAME', 'files')
+        self.download_chunk_size = getattr(settings, 'AZURE_STORAGE_DOWNLOAD_CHUNK_SIZE', 4 * 1024 * 1024)
+        self.upload_block_size = getattr(settings, 'AZURE_STORAGE_UPLOAD_BLOCK_SIZE', 8 * 1024 * 1024)
+        self.upload_max_concurrency = getattr(settings, 'AZURE_STORAGE_UPLOAD_MAX_CONCURRENCY', 4)
+        self.upload_single_shot_threshold = getattr(
+            settings, 'AZURE_STORAGE_UPLOAD_SINGLE_SHOT_THRESHOLD', 64 * 1024 * 1024
+        )
+        self.list_page_size = getattr(settings, 'AZURE_STORAGE_LIST_PAGE_SIZE', 100)
+        self.list_max_page_size = getattr(settings, 'AZURE_STORAGE_LIST_MAX_PAGE_SIZE', 1000)
+        self.list_cache_ttl = getattr(settings, 'AZURE_STORAGE_LIST_CACHE_TTL', 30)
+        # Un cliente por event loop (con ASGI hay uno solo por proceso)
+        self._clients = weakref.WeakKeyDictionary()
+        # Loops cuyo cliente ya verificó que el contenedor existe
+        self._containers_checked = weakref.WeakSet()
+
+        if not self.is_configured:
+            logger.warning("Azure Storage (async) no está configurado correctamente")
+
+    @property
+    def is_configured(self) -> bool:
+        """
+        Valida que existan las credenciales mínimas requeridas.
+        """
+        return bool(
+            ((self.account_name and self.account_key) or self.connection_string)
+            and self.container_name
+        )
+
+    def _get_client(self) -> Optional[BlobServiceClient]:
+        """
+        Devuelve el BlobServiceClient asíncrono del event loop actual, creándolo si hace falta.
+        """
+        if not self.is_configured:
+            return None
+
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            # Mismos tamaños de bloque que el servicio síncrono: el SDK usa Put Block en
+            # paralelo por encima de max_single_put_size y descarga en bloques acotados.
+            client_options = {
+                'max_single_get_size': self.download_chunk_size,
+                'max_chunk_get_size': self.download_chunk_size,
+                'max_single_put_size': self.upload_single_shot_threshold,
+                'max_block_size': self.upload_block_size,
+            }
+            if self.connection_string:
+                client = BlobServiceClient.from_connection_string(self.connection_string, **client_options)
+            else:
+                account_url = f"https://{self.account_name}.blob.core.windows.net"
+                client = BlobServiceClient(account_url=account_url, credential=self.account_key, **client_options)
+            self._clients[loop] = client
+
+        return client
+
+    async def _get_ready_client(self) -> Optional[BlobServiceClient]:
+        """
+        Como `_get_client`, pero la primera vez en cada loop verifica que el contenedor
+        exista, igual que el servicio síncrono.
+        """
+        client = self._get_client()
+        if client is not None:
+            loop = asyncio.get_running_loop()
+            if loop not in self._containers_checked:
+                await self._ensure_container_exists(client)
+                self._containers_checked.add(loop)
+        return client
+
+    async def _ensure_container_exists(self, client: BlobServiceClient):
+        """
+        Crea el contenedor si no existe. Usa la misma marca en `storage_cache()` que el
+        servicio síncrono: si alguno ya lo verificó, no hay round trip.
+        """
+        cache = storage_cache()
+        cache_key = container_cache_key(self.container_name)
+        if await cache.aget(cache_key):
+            return
+
+        try:
+            await client.get_container_client(self.container_name).create_container()
+            logger.info(f"Contenedor '{self.container_name}' creado")
+            await cache.aset(cache_key, True, None)
+
+        except ResourceExistsError:
+            logger.info(f"Contenedor '{self.container_name}' ya existe")
+            await cache.aset(cache_key, True, None)
+        except Exception as e:
+            logger.error(f"Error creando contenedor: {str(e)}")
+
+    async def upload_file(self, file_obj: BinaryIO, blob_name: str, content_type: str = None) -> Optional[str]:
+        """
+        Sube un stream a Azure; por encima del umbral el SDK lo envía en bloques paralelos.
+
+        Returns:
+            Optional[str]: URL absoluta del recurso creado, o None si la operación falla.
+        """
+        client = await self._get_ready_client()
+        if not client:
+            logger.error("Azure Storage no está configurado")
+            return None
+
+        try:
+            blob_client = client.get_blob_client(container=self.container_name, blob=blob_name)
+            file_obj.seek(0)
+            await blob_client.upload_blob(
+                file_obj, overwrite=True, content_type=content_type,
+                max_concurrency=self.upload_max_concurrency
+            )
+
+            await sync_to_async(invalidate_listing_cache)()
+            logger.info(f"Archivo '{blob_name}' subido exitosamente")
+            return blob_client.url
+
+        except Exception as e:
+            logger.error(f"Error subiendo archivo '{blob_name}': {str(e)}")
+            return None
+
+    async def get_file_properties(self, blob_name: str) -> Optional[dict]:
+        """
+        Obtiene los metadatos de un blob sin descargar su contenido.
+
+        Returns:
+            Diccionario con 'size', 'content_type', 'etag' y 'last_modified', None si falló
+        """
+        client = await self._get_ready_client()
+        if not client:
+            logger.error("Azure Storage no está configurado")
+            return None
+
+        try:
+            blob_client = client.get_blob_client(container=self.container_name, blob=blob_name)
+            properties = await blob_client.get_blob_properties()
+
+            return {
+                'size': properties.size,
+                'content_type': properties.content_settings.content_type,
+                'etag': properties.etag,
+                'last_modified': properties.last_modified,
+            }
+
+        except ResourceNotFoundError:
+            logger.error(f"Archivo '{blob_name}' no encontrado")
+            return None
+        except Exception as e:
+            logger.error(f"Error obteniendo propiedades de '{blob_name}': {str(e)}")
+            return None
+
+    async def stream_file(self, blob_name: str, offset: Optional[int] = None, length: Optional[int] = None) -> Optional[dict]:
+        """
+        Abre una descarga en streaming (opcionalmente de un rango de bytes).
+
+        Returns:
+            Diccionario con 'chunks' (iterador asíncrono de bytes) y 'size',
+            None si el archivo no existe o falló la descarga
+        """
+        client = await self._get_ready_client()
+        if not client:
+            logger.error("Azure Storage no está configurado")
+            return None
+
+        try:
+            blob_client = client.get_blob_client(container=self.container_name, blob=blob_name)
+            downloader = await blob_client.download_blob(offset=offset, length=length)
+
+            return {
+                'chunks': _aiter_chunks(downloader),
+                'size': downloader.size,
+            }
+
+        except ResourceNotFoundError:
+            logger.error(f"Archivo '{blob_name}' no encontrado")
+            return None
+        except Exception as e:
+            logger.error(f"Error descargando archivo '{blob_name}': {str(e)}")
+            return None
+
+    async def delete_file(self, blob_name: str) -> bool:
+        """
+        Elimina un archivo de Azure Blob Storage
+
+        Returns:
+            True si se eliminó correctamente, False si falló
+        """
+        client = await self._get_ready_client()
+        if not client:
+            logger.error("Azure Storage no está configurado")
+            return False
+
+        try:
+            blob_client = client.get_blob_client(container=self.container_name, blob=blob_name)
+            await blob_client.delete_blob()
+            await sync_to_async(invalidate_listing_cache)()
+            logger.info(f"Archivo '{blob_name}' eliminado exitosamente")
+            return True
+
+        except ResourceNotFoundError:
+            logger.warning(f"Archivo '{blob_name}' no encontrado para eliminar")
+            return False
+        except Exception as e:
+            logger.error(f"Error eliminando archivo '{blob_name}': {str(e)}")
+            return False
+
+    async def list_files(self, prefix: str = "") -> List[dict]:
+        """
+        Lista archivos en el contenedor
+
+        Returns:
+            Lista de diccionarios con información de los blobs
+        """
+        client = await self._get_ready_client()
+        if not client:
+            logger.error("Azure Storage no está configurado")
+            return []
+
+        try:
+            container_client = client.get_container_client(self.container_name)
+
+            files = []
+            async for blob in container_client.list_blobs(name_starts_with=prefix):
+                files.append(self._blob_info(blob))
+
+            return files
+
+        except Exception as e:
+            logger.error(f"Error listando archivos: {str(e)}")
+            return []
+
+    async def list_files_page(self, prefix: str = "", page_size: Optional[int] = None,
+                              continuation_token: Optional[str] = None) -> Optional[dict]:
+        """
+        Lista una página de archivos (misma caché y formato que el servicio síncrono).
+
+        Returns:
+            Diccionario con 'files' y 'continuation_token', None si falló el listado
+        """
+        client = await self._get_ready_client()
+        if not client:
+            logger.error("Azure Storage no está configurado")
+            return None
+
+        page_size = min(page_size or self.list_page_size, self.list_max_page_size)
+        cache_key = await sync_to_async(listing_cache_key)(prefix, page_size, continuation_token)
+        page = await storage_cache().aget(cache_key)
+        if page is not None:
+            return page
+
+        try:
+            container_client = client.get_container_client(self.container_name)
+            pager = container_client.list_blobs(
+                name_starts_with=prefix, results_per_page=page_size
+            ).by_page(continuation_token=continuation_token)
+
+            files = []
+            async for blob_page in pager:
+                files = [self._blob_info(blob) async for blob in blob_page]
+                break
+
+            page = {
+                'files': files,
+                'continuation_token': pager.continuation_token or None,
+            }
+            await storage_cache().aset(cache_key, page, self.list_cache_ttl)
+
+            return page
+
+        except Exception as e:
+            logger.error(f"Error listando archivos: {str(e)}")
+            return None
+
+    def _blob_info(self, blob) -> dict:
+        return {
+            'name': blob.name,
+            'size': blob.size,
+            'last_modified': blob.last_modified,
+            'url': f"https://{self.account_name}.blob.core.windows.net/{self.container_name}/{blob.name}"
+        }
+
+    def get_file_url(self, blob_name: str) -> Optional[str]:
+        """
+        Obtiene la URL de un archivo (se arma localmente, no hace I/O)
+        """
+        client = self._get_client()
+        if not client:
+            return None
+
+        try:
+            return client.get_blob_client(container=self.container_name, blob=blob_name).url
+        except Exception:
+            return None
+
+async def _aiter_chunks(downloader) -> AsyncIterator[bytes]:
+    """
+    Recorre una descarga asíncrona bloque a bloque.
+    """
+    async for chunk in downloader.chunks():
+        yield chunk
+
+# Instancia a nivel de módulo; no hace I/O al importarse.
+async_azure_storage = AsyncAzureStorageService()
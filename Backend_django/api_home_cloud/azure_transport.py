@@ -0,0 +1,154 @@
+import functools
+import threading
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+from azure.core.pipeline.transport import RequestsTransport
+from azure.storage.blob import ExponentialRetry
+from django.conf import settings
+
+# Transporte HTTP compartido por todas las operaciones de AzureStorageService.
+# Un único requests.Session por proceso (pool de conexiones keep-alive con tamaño y
+# timeouts configurables) + reintentos exponenciales con jitter del SDK. Además cuenta,
+# por operación, cuántas peticiones reutilizaron una conexión abierta y cuántas tuvieron
+# que abrir una nueva (con su handshake TLS).
+
+_local = threading.local()
+
+
+class TransportMetrics:
+    """
+    Contadores por operación: peticiones HTTP y conexiones nuevas abiertas.
+    Las peticiones que no abrieron conexión reutilizaron una del pool.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+
+    def _record(self, field: str):
+        operation = getattr(_local, 'operation', None) or 'otra'
+        with self._lock:
+            counters = self._counters.setdefault(operation, {'requests': 0, 'new_connections': 0})
+            counters[field] += 1
+
+    def record_request(self):
+        self._record('requests')
+
+    def record_new_connection(self):
+        self._record('new_connections')
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            result = {}
+            for operation, counters in self._counters.items():
+                requests_count = counters['requests']
+                reused = max(requests_count - counters['new_connections'], 0)
+                result[operation] = {
+                    **counters,
+                    'reused_connections': reused,
+                    'reuse_ratio': round(reused / requests_count, 3) if requests_count else None,
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+
+
+metrics = TransportMetrics()
+
+
+@contextmanager
+def operation(name: str):
+    """
+    Atribuye a `name` las peticiones HTTP que haga el hilo actual dentro del bloque.
+    """
+    previous = getattr(_local, 'operation', None)
+    _local.operation = name
+    try:
+        yield
+    finally:
+        _local.operation = previous
+
+
+def track_operation(name: str):
+    """
+    Decorador de métodos del servicio: registra sus peticiones bajo `name`.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with operation(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        metrics.record_new_connection()
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        metrics.record_new_connection()
+        return super()._new_conn()
+
+
+class CountingHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter que cuenta peticiones y conexiones nuevas. Los reintentos de urllib3
+    se desactivan: de eso se encarga la política de reintentos del SDK.
+    """
+    def __init__(self, pool_maxsize: int):
+        super().__init__(
+            pool_connections=1,
+            pool_maxsize=pool_maxsize,
+            max_retries=Retry(total=False, redirect=False, raise_on_status=False),
+        )
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        metrics.record_request()
+        return super().send(request, **kwargs)
+
+
+def build_transport() -> RequestsTransport:
+    """
+    Crea el transporte del proceso: una sesión con un pool de
+    AZURE_STORAGE_POOL_MAXSIZE conexiones keep-alive y timeouts de conexión/lectura.
+    """
+    session = requests.Session()
+    adapter = CountingHTTPAdapter(pool_maxsize=getattr(settings, 'AZURE_STORAGE_POOL_MAXSIZE', 32))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return RequestsTransport(
+        session=session,
+        session_owner=False,
+        connection_timeout=getattr(settings, 'AZURE_STORAGE_CONNECT_TIMEOUT', 10),
+        read_timeout=getattr(settings, 'AZURE_STORAGE_READ_TIMEOUT', 60),
+    )
+
+
+def build_retry_policy() -> ExponentialRetry:
+    """
+    Reintentos exponenciales con jitter: espera ~initial_backoff + base^intento segundos
+    (± jitter) para que los workers no reintenten todos al mismo tiempo.
+    """
+    return ExponentialRetry(
+        initial_backoff=getattr(settings, 'AZURE_STORAGE_RETRY_INITIAL_BACKOFF', 1),
+        increment_base=getattr(settings, 'AZURE_STORAGE_RETRY_INCREMENT_BASE', 2),
+        retry_total=getattr(settings, 'AZURE_STORAGE_RETRY_TOTAL', 3),
+        random_jitter_range=getattr(settings, 'AZURE_STORAGE_RETRY_JITTER', 1),
+    )
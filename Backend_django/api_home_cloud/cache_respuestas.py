@@ -0,0 +1,217 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+# Caché de lectura de las respuestas de los viewsets (list/retrieve, ver
+# GetCondicionalMixin en api.py), en el alias 'api' de CACHES: 'memoria' (LRU por
+# proceso) o 'redis' (compartida por todos los workers; sirve cualquier servidor
+# compatible con el protocolo de Redis).
+#
+# La clave incluye la versión de los grupos que ve el usuario (versiones.py): cuando
+# una señal incrementa la versión, las entradas viejas dejan de usarse y el LRU o el
+# TTL las descartan; no hace falta borrarlas.
+#
+# Estampida: si muchos requests piden la misma clave ausente a la vez, uno la calcula
+# y los demás esperan su resultado (en el proceso con un Event; entre procesos, con la
+# caché compartida, con un candado en la propia caché).
+
+logger = logging.getLogger(__name__)
+
+_FALTA = object()
+
+
+class EstadisticasCache:
+    """
+    Contadores de este worker para dimensionar la caché: aciertos, fallos, desalojos
+    del LRU, requests que esperaron el cálculo de otro y errores del backend.
+    """
+    CAMPOS = ('aciertos', 'fallos', 'desalojos', 'coalescidas', 'errores')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._contadores = dict.fromkeys(self.CAMPOS, 0)
+
+    def registrar(self, campo: str):
+        with self._lock:
+            self._contadores[campo] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            resultado = dict(self._contadores)
+        lecturas = resultado['aciertos'] + resultado['fallos']
+        resultado['tasa_aciertos'] = round(resultado['aciertos'] / lecturas, 3) if lecturas else None
+        return resultado
+
+    def reset(self):
+        with self._lock:
+            self._contadores = dict.fromkeys(self.CAMPOS, 0)
+
+
+estadisticas = EstadisticasCache()
+
+
+class CacheLRU(LocMemCache):
+    """
+    LocMemCache (ya ordena por uso) que al llenarse desaloja de a una entrada, la usada
+    hace más tiempo, en lugar de un tercio de golpe, y cuenta los desalojos.
+    """
+    def _cull(self):
+        key, _ = self._cache.popitem()
+        del self._expire_info[key]
+        estadisticas.registrar('desalojos')
+
+    def cantidad_entradas(self) -> int:
+        return len(self._cache)
+
+
+class _Calculo:
+    def __init__(self):
+        self.listo = threading.Event()
+        self.valor = None
+
+
+_en_curso: Dict[str, _Calculo] = {}
+_en_curso_lock = threading.Lock()
+
+
+def cache_habilitada() -> bool:
+    return getattr(settings, 'API_CACHE_ENABLED', True)
+
+
+def cache_api():
+    return caches['api']
+
+
+def clave_de_respuesta(*partes) -> str:
+    # md5: las URLs pueden ser largas y tener caracteres que memcached/redis no aceptan
+    return 'respuesta:' + hashlib.md5('|'.join(str(parte) for parte in partes).encode()).hexdigest()
+
+
+def obtener_o_calcular(clave: str, calcular: Callable[[], Optional[object]]) -> Optional[object]:
+    """
+    Devuelve el valor cacheado de `clave` o lo calcula con `calcular()` y lo guarda
+    (si no devuelve None, que significa "no cachear"). Un solo cálculo por clave a la
+    vez: los demás requests esperan hasta API_CACHE_ESPERA_SEGUNDOS y usan ese valor.
+
+    Returns:
+        El valor, o None si no se pudo obtener de la caché ni del cálculo de otro
+        request (quien llama lo calcula por su cuenta).
+    """
+    cache = cache_api()
+    valor = _leer(cache, clave)
+    if valor is not _FALTA:
+        estadisticas.registrar('aciertos')
+        return valor
+    estadisticas.registrar('fallos')
+
+    espera = getattr(settings, 'API_CACHE_ESPERA_SEGUNDOS', 5)
+    with _en_curso_lock:
+        calculo = _en_curso.get(clave)
+        propio = calculo is None
+        if propio:
+            calculo = _en_curso[clave] = _Calculo()
+
+    if not propio:
+        # Otro hilo de este proceso ya lo está calculando
+        estadisticas.registrar('coalescidas')
+        calculo.listo.wait(espera)
+        return calculo.valor
+
+    candado = None
+    try:
+        if not isinstance(cache, LocMemCache):
+            candado = f"{clave}:calculando"
+            if not _tomar_candado(cache, candado, espera):
+                # Lo está calculando otro worker: se espera a que lo escriba
+                candado = None
+                estadisticas.registrar('coalescidas')
+                calculo.valor = _esperar_valor(cache, clave, espera)
+                return calculo.valor
+        calculo.valor = calcular()
+        if calculo.valor is not None:
+            _escribir(cache, clave, calculo.valor)
+        return calculo.valor
+    finally:
+        if candado:
+            _borrar(cache, candado)
+        calculo.listo.set()
+        with _en_curso_lock:
+            _en_curso.pop(clave, None)
+
+
+def _tomar_candado(cache, candado: str, espera: float) -> bool:
+    # add() es atómico en la caché compartida; si falla la caché se calcula igual
+    try:
+        return cache.add(candado, 1, timeout=max(int(espera), 1))
+    except Exception as e:
+        logger.error(f"Error en la caché de la API: {e}")
+        estadisticas.registrar('errores')
+        return True
+
+
+def _esperar_valor(cache, clave: str, espera: float):
+    limite = time.monotonic() + espera
+    while time.monotonic() < limite:
+        time.sleep(0.05)
+        valor = _leer(cache, clave)
+        if valor is not _FALTA:
+            return valor
+    return None
+
+
+def _leer(cache, clave: str):
+    try:
+        return cache.get(clave, _FALTA)
+    except Exception as e:
+        # Sin caché se sigue respondiendo desde la base
+        logger.error(f"Error leyendo la caché de la API: {e}")
+        estadisticas.registrar('errores')
+        return _FALTA
+
+
+def _escribir(cache, clave: str, valor):
+    try:
+        cache.set(clave, valor)
+    except Exception as e:
+        logger.error(f"Error escribiendo la caché de la API: {e}")
+        estadisticas.registrar('errores')
+
+
+def _borrar(cache, clave: str):
+    try:
+        cache.delete(clave)
+    except Exception as e:
+        logger.error(f"Error escribiendo la caché de la API: {e}")
+        estadisticas.registrar('errores')
+
+
+def estado_cache() -> dict:
+    """
+    Backend, contadores de este worker y, si se pueden leer, los del servidor.
+    """
+    cache = cache_api()
+    estado = {
+        'habilitada': cache_habilitada(),
+        'backend': f"{type(cache).__module__}.{type(cache).__name__}",
+        'estadisticas': estadisticas.snapshot(),
+    }
+    if isinstance(cache, CacheLRU):
+        estado['entradas'] = cache.cantidad_entradas()
+        estado['max_entradas'] = cache._max_entries
+    else:
+        # Redis (o compatible): sus contadores son de todo el servidor, no solo de la API
+        try:
+            info = cache._cache.get_client().info()
+            estado['servidor'] = {
+                campo: info.get(campo)
+                for campo in ('keyspace_hits', 'keyspace_misses', 'evicted_keys', 'used_memory', 'maxmemory')
+            }
+        except Exception as e:
+            logger.error(f"No se pudieron leer las estadísticas del servidor de caché: {e}")
+    return estado
@@ -0,0 +1,186 @@
+import hashlib
+import logging
+from datetime import timedelta
+from typing import BinaryIO, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .storage_backends import get_storage_backend
+from .models import ContenidoBlob
+
+# Almacenamiento direccionado por contenido (opcional, AZURE_STORAGE_DEDUP_ENABLED):
+# cada archivo se guarda una sola vez bajo su SHA-256 y los Documentos apuntan a él
+# con un contador de referencias. Cuando el contador llega a 0 se borra el blob.
+# Entre la subida y la creación del Documento el contenido queda sin referencias: se
+# respeta un período de gracia (AZURE_STORAGE_DEDUP_GRACIA_SEGUNDOS) desde su último
+# uso y los que nadie reclamó los borra recolectar_huerfanos().
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def blob_name_for_digest(digest: str) -> str:
+    """
+    Nombre del blob para un hash. El primer byte como carpeta evita directorios
+    gigantes al listar por prefijo.
+    """
+    return f"cas/{digest[:2]}/{digest}"
+
+
+def calcular_sha256(file_obj: BinaryIO) -> Tuple[str, int]:
+    """
+    Calcula el SHA-256 y el tamaño de un stream y lo deja posicionado de nuevo al inicio.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    file_obj.seek(0)
+    while True:
+        chunk = file_obj.read(HASH_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+    file_obj.seek(0)
+    return digest.hexdigest(), size
+
+
+def guardar_contenido(file_obj: BinaryIO, content_type: str = None) -> Tuple[Optional[ContenidoBlob], bool]:
+    """
+    Guarda un archivo en modo deduplicado.
+
+    Django ya tiene el archivo completo en disco/memoria cuando llega a la vista, así que
+    el hash se calcula sobre esa copia local antes de enviar nada: si el contenido ya
+    existe no se transfiere ni un byte al almacenamiento.
+
+    Returns:
+        Tupla (ContenidoBlob, nuevo). ContenidoBlob es None si falló la subida.
+    """
+    digest, size = calcular_sha256(file_obj)
+
+    existente = _reservar_existente(digest)
+    if existente is not None:
+        logger.info(f"Contenido '{digest}' ya existe, se omite la subida")
+        return existente, False
+
+    blob_name = blob_name_for_digest(digest)
+    url = get_storage_backend().upload_file(file_obj, blob_name, content_type)
+    if not url:
+        return None, False
+
+    try:
+        with transaction.atomic():
+            contenido = ContenidoBlob.objects.create(
+                sha256=digest,
+                blob_name=blob_name,
+                url_archivo=url,
+                tamano=size,
+                content_type=content_type or 'application/octet-stream',
+            )
+        return contenido, True
+    except IntegrityError:
+        # Otra petición subió el mismo contenido en paralelo; el blob es idéntico.
+        return _reservar_existente(digest), False
+
+
+def _reservar_existente(digest: str) -> Optional[ContenidoBlob]:
+    """
+    Devuelve el contenido con ese hash renovando su fecha de último uso bajo bloqueo:
+    un restar_referencia concurrente lo ve recién usado y no lo borra.
+    """
+    with transaction.atomic():
+        contenido = ContenidoBlob.objects.select_for_update().filter(sha256=digest).first()
+        if contenido is not None:
+            contenido.fecha_ultimo_uso = timezone.now()
+            contenido.save(update_fields=['fecha_ultimo_uso'])
+        return contenido
+
+
+def _limite_gracia(segundos: int = None):
+    if segundos is None:
+        segundos = getattr(settings, 'AZURE_STORAGE_DEDUP_GRACIA_SEGUNDOS', 3600)
+    return timezone.now() - timedelta(seconds=segundos)
+
+
+def bloquear_contenido(contenido_id: int) -> Optional[ContenidoBlob]:
+    """
+    Bloquea la fila del contenido hasta el final de la transacción en curso. Creando el
+    Documento dentro de esa misma transacción, la referencia se suma antes de que un
+    restar_referencia concurrente pueda decidir borrarlo. None si ya no existe.
+    """
+    return ContenidoBlob.objects.select_for_update().filter(pk=contenido_id).first()
+
+
+def sumar_referencia(contenido_id: int):
+    ContenidoBlob.objects.filter(pk=contenido_id).update(referencias=F('referencias') + 1)
+
+
+def restar_referencia(contenido_id: int):
+    """
+    Descuenta una referencia; si no quedan Documentos apuntando al contenido, borra
+    la fila y (tras el commit) el blob.
+    """
+    with transaction.atomic():
+        contenido = ContenidoBlob.objects.select_for_update().filter(pk=contenido_id).first()
+        if contenido is None:
+            return
+
+        if contenido.referencias > 1:
+            contenido.referencias = F('referencias') - 1
+            contenido.save(update_fields=['referencias'])
+            return
+
+        if contenido.documentos.exists():
+            # Contador desfasado: todavía hay documentos, no se borra nada
+            contenido.referencias = contenido.documentos.count()
+            contenido.save(update_fields=['referencias'])
+            return
+
+        if contenido.fecha_ultimo_uso > _limite_gracia():
+            # Una subida acaba de devolverlo y su Documento puede estar por crearse:
+            # queda sin referencias y, si nadie lo reclama, lo borra recolectar_huerfanos()
+            contenido.referencias = 0
+            contenido.save(update_fields=['referencias'])
+            return
+
+        blob_name = contenido.blob_name
+        contenido.delete()
+        transaction.on_commit(lambda: _borrar_blob(blob_name))
+
+
+def recolectar_huerfanos(gracia_segundos: int = None) -> int:
+    """
+    Borra los contenidos sin referencias que nadie usó durante el período de gracia
+    (subidas cuyo Documento nunca se creó) y sus blobs. Devuelve cuántos borró.
+    """
+    limite = _limite_gracia(gracia_segundos)
+    candidatos = list(
+        ContenidoBlob.objects.filter(referencias=0, fecha_ultimo_uso__lt=limite).values_list('pk', flat=True)
+    )
+
+    borrados = 0
+    for contenido_id in candidatos:
+        with transaction.atomic():
+            # Se vuelve a comprobar bajo bloqueo: pudo reutilizarse desde la consulta
+            contenido = ContenidoBlob.objects.select_for_update().filter(
+                pk=contenido_id, referencias=0, fecha_ultimo_uso__lt=limite
+            ).first()
+            if contenido is None or contenido.documentos.exists():
+                continue
+            blob_name = contenido.blob_name
+            contenido.delete()
+            transaction.on_commit(lambda blob_name=blob_name: _borrar_blob(blob_name))
+        borrados += 1
+
+    logger.info(f"Contenidos huérfanos borrados: {borrados} de {len(candidatos)} candidatos")
+    return borrados
+
+
+def _borrar_blob(blob_name: str):
+    from .derivados import borrar_derivados
+
+    get_storage_backend().delete_file(blob_name)
+    borrar_derivados(blob_name)
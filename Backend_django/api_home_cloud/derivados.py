@@ -0,0 +1,234 @@
+import io
+import logging
+import mimetypes
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .storage_backends import get_storage_backend
+from .models import Documento
+from .versiones import clave_grupo, incrementar_version
+
+# Miniaturas y vistas previas de los documentos (WebP), generadas en segundo plano.
+# Al crear un Documento se encola su procesamiento (después del commit) en un pool de
+# hilos del proceso; los derivados se guardan junto al blob original
+# ('<blob>.miniatura.webp' y '<blob>.vista_previa.webp') y sus URLs quedan en el
+# Documento, así la grilla del frontend baja unos pocos KB por ítem.
+#
+# Pillow es necesario para generar derivados y pypdfium2 para las vistas previas de
+# PDF; ambos figuran en requirements.txt pero se toleran ausentes: sin Pillow no se
+# genera nada y sin pypdfium2 los PDF quedan sin vista previa.
+
+logger = logging.getLogger(__name__)
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+    logger.warning("Pillow no está instalado: no se generan miniaturas ni vistas previas")
+
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+    logger.warning("pypdfium2 no está instalado: los PDF quedan sin vista previa")
+
+SUFIJO_MINIATURA = '.miniatura.webp'
+SUFIJO_VISTA_PREVIA = '.vista_previa.webp'
+
+# Lo que no entra en memoria se vuelca a un temporal mientras se descarga el original
+_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Pool de hilos del proceso actual (se recrea tras un fork, como el cliente de Azure).
+    """
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'MINIATURAS_MAX_WORKERS', 2),
+                thread_name_prefix='miniaturas',
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def derivados_habilitados() -> bool:
+    return getattr(settings, 'MINIATURAS_ENABLED', True) and Image is not None
+
+
+def programar_derivados(documento_id: int):
+    """
+    Encola la generación de derivados de un Documento para cuando se confirme la
+    transacción actual (si no, el hilo podría no ver la fila todavía).
+    """
+    if not derivados_habilitados():
+        return
+    transaction.on_commit(lambda: _get_executor().submit(_generar_en_hilo, documento_id))
+
+
+def _generar_en_hilo(documento_id: int):
+    try:
+        generar_derivados(documento_id)
+    except Exception as e:
+        logger.error(f"Error generando derivados del documento {documento_id}: {str(e)}")
+    finally:
+        # El hilo del pool no pasa por el ciclo request/response que cierra conexiones
+        close_old_connections()
+
+
+def generar_derivados(documento_id: int) -> bool:
+    """
+    Genera (o reutiliza, si ya existen junto al blob) la miniatura y la vista previa
+    de un Documento y guarda sus URLs.
+
+    Returns:
+        True si el Documento quedó con derivados, False si no aplica o falló.
+    """
+    documento = Documento.objects.filter(pk=documento_id).first()
+    if documento is None or not documento.blob_name:
+        return False
+
+    storage = get_storage_backend()
+    blob_name = documento.blob_name
+    nombre_miniatura = blob_name + SUFIJO_MINIATURA
+    nombre_vista_previa = blob_name + SUFIJO_VISTA_PREVIA
+
+    # Con deduplicación varios Documentos comparten blob: los derivados se hacen una vez
+    if (documento.contenido_id and storage.get_file_properties(nombre_miniatura)
+            and storage.get_file_properties(nombre_vista_previa)):
+        url_miniatura = storage.get_file_url(nombre_miniatura)
+        url_vista_previa = storage.get_file_url(nombre_vista_previa)
+    else:
+        properties = storage.get_file_properties(blob_name)
+        if properties is None:
+            return False
+
+        max_bytes = getattr(settings, 'MINIATURAS_MAX_SOURCE_BYTES', 50 * 1024 * 1024)
+        if properties['size'] > max_bytes:
+            logger.info(f"'{blob_name}' supera {max_bytes} bytes, no se generan derivados")
+            return False
+
+        content_type = properties['content_type']
+        if not content_type or content_type == 'application/octet-stream':
+            content_type = mimetypes.guess_type(documento.nombre_archivo)[0] or ''
+
+        imagen = _abrir_original(storage, blob_name, content_type)
+        if imagen is None:
+            return False
+
+        url_miniatura = storage.upload_file(_miniatura(imagen), nombre_miniatura, 'image/webp')
+        url_vista_previa = storage.upload_file(_vista_previa(imagen), nombre_vista_previa, 'image/webp')
+        if not url_miniatura or not url_vista_previa:
+            return False
+
+    # update() en lugar de save(): no dispara las señales del Documento (la versión del
+    # grupo para los ETag se incrementa a mano)
+    with transaction.atomic():
+        Documento.objects.filter(pk=documento_id).update(
+            url_miniatura=url_miniatura, url_vista_previa=url_vista_previa
+        )
+        incrementar_version(clave_grupo(documento.grupo_id))
+    logger.info(f"Derivados del documento {documento_id} generados")
+    return True
+
+
+def borrar_derivados(blob_name: str):
+    """
+    Borra los derivados de un blob; se llama al borrar el original.
+    """
+    if blob_name.endswith((SUFIJO_MINIATURA, SUFIJO_VISTA_PREVIA)):
+        # Es a su vez un derivado: no tiene derivados propios
+        return
+    storage = get_storage_backend()
+    for sufijo in (SUFIJO_MINIATURA, SUFIJO_VISTA_PREVIA):
+        storage.delete_file(blob_name + sufijo)
+
+
+def _abrir_original(storage, blob_name: str, content_type: str) -> Optional['Image.Image']:
+    """
+    Descarga el original en streaming a un temporal y lo decodifica como imagen
+    (primera página rasterizada en el caso de un PDF).
+    """
+    es_pdf = content_type == 'application/pdf'
+    if not (es_pdf or content_type.startswith('image/')):
+        return None
+    if es_pdf and pypdfium2 is None:
+        logger.info(f"pypdfium2 no está instalado, se omite la vista previa de '{blob_name}'")
+        return None
+
+    download = storage.stream_file(blob_name)
+    if download is None:
+        return None
+
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES) as original:
+        try:
+            for chunk in download['chunks']:
+                original.write(chunk)
+        finally:
+            if hasattr(download['chunks'], 'close'):
+                download['chunks'].close()
+        original.seek(0)
+
+        if es_pdf:
+            return _rasterizar_pdf(original)
+
+        imagen = Image.open(original)
+        # En JPEG decodifica directamente a escala reducida (mucho menos CPU y memoria)
+        lado = getattr(settings, 'VISTA_PREVIA_TAMANO', 1024)
+        imagen.draft('RGB', (lado, lado))
+        imagen = ImageOps.exif_transpose(imagen)
+        imagen.load()
+        return imagen
+
+
+def _rasterizar_pdf(original) -> 'Image.Image':
+    """
+    Renderiza la primera página del PDF al tamaño de la vista previa.
+    """
+    pdf = pypdfium2.PdfDocument(original.read())
+    try:
+        pagina = pdf[0]
+        ancho, alto = pagina.get_size()
+        escala = getattr(settings, 'VISTA_PREVIA_TAMANO', 1024) / max(ancho, alto)
+        return pagina.render(scale=escala).to_pil()
+    finally:
+        pdf.close()
+
+
+def _a_webp(imagen: 'Image.Image') -> io.BytesIO:
+    if imagen.mode not in ('RGB', 'RGBA'):
+        imagen = imagen.convert('RGBA' if imagen.has_transparency_data else 'RGB')
+    buffer = io.BytesIO()
+    imagen.save(buffer, 'WEBP', quality=getattr(settings, 'MINIATURAS_WEBP_QUALITY', 80), method=4)
+    buffer.seek(0)
+    return buffer
+
+
+def _miniatura(imagen: 'Image.Image') -> io.BytesIO:
+    """
+    Miniatura cuadrada de tamaño fijo (recorte centrado) para las grillas.
+    """
+    lado = getattr(settings, 'MINIATURA_TAMANO', 256)
+    return _a_webp(ImageOps.fit(imagen, (lado, lado), Image.Resampling.LANCZOS))
+
+
+def _vista_previa(imagen: 'Image.Image') -> io.BytesIO:
+    """
+    Vista previa que respeta la proporción, con el lado mayor acotado.
+    """
+    lado = getattr(settings, 'VISTA_PREVIA_TAMANO', 1024)
+    vista_previa = imagen.copy()
+    vista_previa.thumbnail((lado, lado), Image.Resampling.LANCZOS)
+    return _a_webp(vista_previa)
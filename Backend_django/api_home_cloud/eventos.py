@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Eventos en tiempo real para el stream SSE de /api/eventos/ (ver views.eventos).
+# Las señales publican los cambios de Tarea (canal del grupo) y de Notificacion (canal
+# del usuario) al confirmarse la transacción; cada conexión abierta tiene una cola
+# acotada en su event loop y recibe solo los canales a los que se suscribió.
+#
+# Sin broker (EVENTOS_BROKER vacío) el reparto es en memoria y solo llega a las
+# conexiones del mismo proceso. Con varios procesos o hosts, EVENTOS_BROKER='redis' (o
+# la ruta a otra clase con la interfaz de Broker) reparte los eventos entre todos.
+#
+# Contrapresión: si un cliente no lee y su cola se llena, la conexión se cierra con un
+# evento 'resync' para que el cliente vuelva a pedir los datos por la API REST (los
+# ETag hacen que eso sea barato) y reconecte.
+
+logger = logging.getLogger(__name__)
+
+BROKER_ALIASES = {
+    'redis': 'api_home_cloud.eventos.BrokerRedis',
+}
+
+
+def canal_grupo(grupo_id: int) -> str:
+    return f"grupo:{grupo_id}"
+
+
+def canal_usuario(usuario_id: int) -> str:
+    return f"usuario:{usuario_id}"
+
+
+class Suscripcion:
+    """
+    Una conexión abierta: cola acotada en el event loop de la conexión. Se llena desde
+    cualquier hilo con call_soon_threadsafe.
+    """
+    def __init__(self, canales: Iterable[str], loop: asyncio.AbstractEventLoop):
+        self.canales = set(canales)
+        self.loop = loop
+        self.cola = asyncio.Queue(maxsize=getattr(settings, 'EVENTOS_COLA_MAX', 100))
+        self.desbordada = False
+
+    def entregar(self, evento: dict):
+        # Corre en self.loop
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.desbordada = True
+
+
+class Bus:
+    """
+    Pub/sub en memoria del proceso. publicar() es síncrono y no bloquea: se puede
+    llamar desde las vistas, las señales o los comandos.
+    """
+    def __init__(self):
+        self._suscripciones: Dict[str, Set[Suscripcion]] = {}
+        self._lock = threading.Lock()
+        self._broker = None
+        self._pid = None
+
+    def suscribir(self, canales: Iterable[str]) -> Suscripcion:
+        suscripcion = Suscripcion(canales, asyncio.get_running_loop())
+        with self._lock:
+            for canal in suscripcion.canales:
+                self._suscripciones.setdefault(canal, set()).add(suscripcion)
+        # El hilo del broker se arranca con la primera conexión del proceso
+        self._broker_del_proceso()
+        return suscripcion
+
+    def desuscribir(self, suscripcion: Suscripcion):
+        with self._lock:
+            for canal in suscripcion.canales:
+                suscriptores = self._suscripciones.get(canal)
+                if suscriptores is not None:
+                    suscriptores.discard(suscripcion)
+                    if not suscriptores:
+                        del self._suscripciones[canal]
+
+    def publicar(self, canal: str, evento: dict):
+        broker = self._broker_del_proceso()
+        if broker is not None:
+            try:
+                # El propio proceso lo recibe de vuelta por el broker
+                broker.publicar(json.dumps({'canal': canal, 'evento': evento}))
+                return
+            except Exception as e:
+                logger.error(f"Error publicando en el broker de eventos, se entrega solo en este proceso: {e}")
+        self.entregar_local(canal, evento)
+
+    def entregar_local(self, canal: str, evento: dict):
+        with self._lock:
+            suscriptores = list(self._suscripciones.get(canal, ()))
+        for suscripcion in suscriptores:
+            try:
+                suscripcion.loop.call_soon_threadsafe(suscripcion.entregar, evento)
+            except RuntimeError:
+                # El event loop de la conexión ya se cerró
+                self.desuscribir(suscripcion)
+
+    def _broker_del_proceso(self):
+        # Un broker (y su hilo de escucha) por proceso: tras un fork se crea otro
+        if self._pid == os.getpid():
+            return self._broker
+        with self._lock:
+            if self._pid != os.getpid():
+                self._broker = _crear_broker()
+                if self._broker is not None:
+                    threading.Thread(
+                        target=self._escuchar_broker, args=(self._broker,),
+                        name='eventos-broker', daemon=True,
+                    ).start()
+                self._pid = os.getpid()
+        return self._broker
+
+    def _escuchar_broker(self, broker):
+        while True:
+            try:
+                broker.escuchar(self._mensaje_del_broker)
+            except Exception as e:
+                logger.error(f"Se perdió la conexión con el broker de eventos, reintentando: {e}")
+                time.sleep(1)
+
+    def _mensaje_del_broker(self, mensaje):
+        try:
+            datos = json.loads(mensaje)
+            self.entregar_local(datos['canal'], datos['evento'])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Mensaje inválido del broker de eventos: {e}")
+
+
+bus = Bus()
+
+
+class Broker:
+    """
+    Interfaz de los brokers de EVENTOS_BROKER: reparten los eventos entre procesos.
+    """
+    def publicar(self, mensaje: str):
+        raise NotImplementedError
+
+    def escuchar(self, entregar: Callable[[str], None]):
+        """Bloquea llamando a entregar(mensaje) por cada mensaje publicado (por cualquier proceso)."""
+        raise NotImplementedError
+
+
+class BrokerRedis(Broker):
+    """
+    Pub/sub de Redis (paquete redis, incluido en requirements.txt).
+    """
+    def __init__(self):
+        import redis
+        self.cliente = redis.Redis.from_url(getattr(settings, 'EVENTOS_REDIS_URL', 'redis://localhost:6379/0'))
+        self.canal = getattr(settings, 'EVENTOS_REDIS_CANAL', 'home_cloud:eventos')
+
+    def publicar(self, mensaje: str):
+        self.cliente.publish(self.canal, mensaje)
+
+    def escuchar(self, entregar: Callable[[str], None]):
+        pubsub = self.cliente.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.canal)
+        try:
+            for mensaje in pubsub.listen():
+                entregar(mensaje['data'])
+        finally:
+            pubsub.close()
+
+
+def _crear_broker() -> Optional[Broker]:
+    nombre = getattr(settings, 'EVENTOS_BROKER', '')
+    if not nombre:
+        return None
+    try:
+        return import_string(BROKER_ALIASES.get(nombre, nombre))()
+    except Exception as e:
+        logger.error(f"No se pudo crear el broker de eventos '{nombre}', se usa solo memoria: {e}")
+        return None
+
+
+def eventos_habilitados() -> bool:
+    return getattr(settings, 'EVENTOS_ENABLED', True)
+
+
+def publicar_al_confirmar(publicaciones: Iterable[tuple]):
+    """
+    Publica (canal, evento) cuando se confirma la transacción actual: un cliente nunca
+    recibe un cambio que después se revierte o que todavía no puede leer por la API.
+    """
+    if not eventos_habilitados():
+        return
+    publicaciones = list(publicaciones)
+    if publicaciones:
+        transaction.on_commit(lambda: _publicar_todas(publicaciones))
+
+
+def _publicar_todas(publicaciones):
+    for canal, evento in publicaciones:
+        bus.publicar(canal, evento)
+
+
+def evento_de_tarea(tarea, accion: str) -> tuple:
+    return canal_grupo(tarea.grupo_id), {
+        'tipo': 'tarea', 'accion': accion, 'id': tarea.pk,
+        'estado': tarea.estado, 'titulo': tarea.titulo,
+    }
+
+
+def evento_de_notificacion(notificacion, accion: str) -> tuple:
+    return canal_usuario(notificacion.usuario_id), {
+        'tipo': 'notificacion', 'accion': accion, 'id': notificacion.pk,
+        'tarea': notificacion.tarea_id, 'mensaje': notificacion.mensaje, 'leida': notificacion.leida,
+    }
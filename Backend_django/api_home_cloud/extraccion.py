@@ -0,0 +1,176 @@
+import io
+import logging
+import mimetypes
+import re
+import signal
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from typing import List, Optional
+
+import django
+from django.conf import settings
+
+from .storage_backends import get_storage_backend
+
+# Extracción de texto y de candidatos (monto, vencimiento) de un documento.
+# Corre dentro de los procesos del worker de procesamiento (ver procesamiento.py):
+# no toca la base de datos, solo lee el archivo y devuelve un dict serializable.
+#
+# Texto de PDFs con pypdfium2 y OCR de imágenes con pytesseract (+ Pillow); figuran en
+# requirements.txt pero se toleran ausentes: sin ellos esos documentos se marcan
+# procesados sin candidatos.
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pypdfium2
+except ImportError:
+    pypdfium2 = None
+    logger.warning("pypdfium2 no está instalado: no se extrae texto de los PDF")
+
+try:
+    import pytesseract
+    from PIL import Image
+except ImportError:
+    pytesseract = None
+    logger.warning("pytesseract o Pillow no están instalados: no se hace OCR de las imágenes")
+
+# Número con separadores de miles opcionales y dos decimales opcionales:
+# 1.234,56 / 1,234.56 / 1234,56 / 1234
+_NUMERO = r'\d{1,3}(?:[.,]\d{3})+(?:[.,]\d{2})?|\d+(?:[.,]\d{2})?'
+_MONTO_CON_CLAVE = re.compile(
+    rf'(?:total|importe|monto|a pagar|saldo)\b[^\d\n]{{0,25}}?({_NUMERO})(?!\d)', re.IGNORECASE
+)
+_MONTO_CON_MONEDA = re.compile(rf'(?:\$|€|US\$|U\$S|USD|ARS|EUR)\s?({_NUMERO})(?!\d)', re.IGNORECASE)
+_FECHA = re.compile(r'\b(?:(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})|(\d{4})-(\d{2})-(\d{2}))\b')
+_CLAVE_VENCIMIENTO = re.compile(r'venc|vto|fecha l[ií]mite|pagar antes|due', re.IGNORECASE)
+
+# Tarea.monto es DecimalField(max_digits=10, decimal_places=2)
+_MONTO_MAXIMO = Decimal('99999999.99')
+
+
+def inicializar_proceso():
+    """
+    Initializer de los procesos del pool: configura Django y deja el Ctrl+C al
+    proceso principal, que se encarga de apagar el pool ordenadamente.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    django.setup()
+
+
+def extraer_candidatos(blob_name: str, nombre_archivo: str) -> dict:
+    """
+    Lee un documento del almacenamiento y busca monto y fecha de vencimiento.
+
+    Returns:
+        Diccionario con 'texto' (extracto para la descripción de la Tarea), 'monto' (str o None) y
+        'fecha_vencimiento' (ISO o None).
+
+    Raises:
+        RuntimeError: si el archivo no se pudo leer (el trabajo se reintenta).
+    """
+    storage = get_storage_backend()
+    properties = storage.get_file_properties(blob_name)
+    if properties is None:
+        raise RuntimeError(f"No se pudo leer '{blob_name}'")
+
+    if properties['size'] > getattr(settings, 'PROCESAMIENTO_MAX_BYTES', 25 * 1024 * 1024):
+        return analizar_texto('')
+
+    content_type = properties['content_type']
+    if not content_type or content_type == 'application/octet-stream':
+        content_type = mimetypes.guess_type(nombre_archivo)[0] or ''
+
+    download = storage.stream_file(blob_name)
+    if download is None:
+        raise RuntimeError(f"No se pudo descargar '{blob_name}'")
+    try:
+        data = b''.join(download['chunks'])
+    finally:
+        if hasattr(download['chunks'], 'close'):
+            download['chunks'].close()
+
+    return analizar_texto(extraer_texto(data, content_type))
+
+
+def extraer_texto(data: bytes, content_type: str) -> str:
+    if content_type.startswith('text/') or content_type in ('application/json', 'application/xml'):
+        return data.decode('utf-8', errors='replace')
+
+    if content_type == 'application/pdf' and pypdfium2 is not None:
+        pdf = pypdfium2.PdfDocument(data)
+        try:
+            max_paginas = getattr(settings, 'PROCESAMIENTO_MAX_PAGINAS', 20)
+            return '\n'.join(
+                pdf[i].get_textpage().get_text_range() for i in range(min(len(pdf), max_paginas))
+            )
+        finally:
+            pdf.close()
+
+    if content_type.startswith('image/') and pytesseract is not None:
+        idioma = getattr(settings, 'PROCESAMIENTO_OCR_IDIOMA', 'spa')
+        return pytesseract.image_to_string(Image.open(io.BytesIO(data)), lang=idioma)
+
+    return ''
+
+
+def analizar_texto(texto: str) -> dict:
+    """
+    Busca candidatos en el texto: el monto mayor junto a "total"/"importe"/... (o, si
+    no hay, junto a un símbolo de moneda) y la fecha de vencimiento (la que sigue a
+    "vencimiento"/"vto"/... en su línea; si no, la más tardía cuando hay varias fechas,
+    porque en una factura la emisión precede al vencimiento).
+    """
+    montos = _montos(_MONTO_CON_CLAVE, texto) or _montos(_MONTO_CON_MONEDA, texto)
+    monto = max(montos) if montos else None
+
+    fecha_vencimiento = None
+    todas = []
+    for linea in texto.splitlines():
+        fechas = _fechas(linea)
+        clave = _CLAVE_VENCIMIENTO.search(linea)
+        if fechas and fecha_vencimiento is None and clave:
+            # Preferentemente la fecha que sigue a la palabra clave
+            fecha_vencimiento = (_fechas(linea[clave.end():]) or fechas)[0]
+        todas.extend(fechas)
+    if fecha_vencimiento is None and len(todas) > 1:
+        fecha_vencimiento = max(todas)
+
+    return {
+        'texto': texto.strip()[:getattr(settings, 'PROCESAMIENTO_MAX_TEXTO', 500)],
+        'monto': str(monto) if monto is not None else None,
+        'fecha_vencimiento': fecha_vencimiento.isoformat() if fecha_vencimiento else None,
+    }
+
+
+def parsear_monto(valor: str) -> Optional[Decimal]:
+    """
+    Convierte '1.234,56', '1,234.56' o '1234' a Decimal. El último separador es el
+    decimal solo si lo siguen exactamente dos dígitos.
+    """
+    if len(valor) > 3 and valor[-3] in ',.':
+        entero, decimales = valor[:-3], valor[-2:]
+    else:
+        entero, decimales = valor, '00'
+    try:
+        monto = Decimal(f"{entero.replace('.', '').replace(',', '')}.{decimales}")
+    except InvalidOperation:
+        return None
+    return monto if 0 < monto <= _MONTO_MAXIMO else None
+
+
+def _montos(patron: re.Pattern, texto: str) -> List[Decimal]:
+    return [m for m in (parsear_monto(v) for v in patron.findall(texto)) if m is not None]
+
+
+def _fechas(linea: str) -> List[date]:
+    fechas = []
+    for dia, mes, anio, anio_iso, mes_iso, dia_iso in _FECHA.findall(linea):
+        try:
+            if anio_iso:
+                fechas.append(date(int(anio_iso), int(mes_iso), int(dia_iso)))
+            else:
+                fechas.append(date(int(anio), int(mes), int(dia)))
+        except ValueError:
+            continue
+    return fechas
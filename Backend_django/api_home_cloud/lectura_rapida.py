@@ -0,0 +1,143 @@
+import logging
+from collections import OrderedDict
+from threading import Lock
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+# Camino rápido de solo lectura para los listados de la API.
+# En lugar de instanciar un modelo por fila y recorrer los campos del serializer uno a
+# uno, el listado se arma desde filas de .values() con una función generada una sola
+# vez por representación (serializer + ?fields= + ?expand=). Cada campo se convierte
+# con el mismo to_representation del serializer, así la salida es idéntica.
+#
+# orjson figura en requirements.txt pero se tolera ausente: sin él JSONRapidoRenderer
+# genera el JSON con el encoder de DRF.
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logger.warning("orjson no está instalado: los listados se serializan con el encoder de DRF")
+
+# Campos cuya representación es el mismo valor que devuelve la base
+_SIN_CONVERSION = (serializers.CharField, serializers.BooleanField, serializers.IntegerField)
+
+_MAX_MAPEOS = 128
+_mapeos = OrderedDict()
+_mapeos_lock = Lock()
+
+
+class _NoCompilable(Exception):
+    pass
+
+
+def compilar_mapeo(serializer):
+    """
+    Devuelve (columnas, mapear): las columnas a pedir con .values() y una función que
+    convierte cada fila en el dict que produciría el serializer. None si algún campo no
+    sale de una columna (métodos, propiedades, relaciones many) y hay que usar DRF.
+    """
+    clave = _clave(serializer)
+    with _mapeos_lock:
+        if clave in _mapeos:
+            _mapeos.move_to_end(clave)
+            return _mapeos[clave]
+
+    try:
+        columnas, conversores = [], {}
+        expresion = _compilar(serializer, '', columnas, conversores)
+        codigo = f"def mapear(fila):\n    return {expresion}\n"
+        espacio = dict(conversores)
+        exec(compile(codigo, f"<mapeo {type(serializer).__name__}>", 'exec'), espacio)
+        mapeo = (columnas, espacio['mapear'])
+    except _NoCompilable:
+        mapeo = None
+
+    with _mapeos_lock:
+        _mapeos[clave] = mapeo
+        if len(_mapeos) > _MAX_MAPEOS:
+            _mapeos.popitem(last=False)
+    return mapeo
+
+
+def _clave(serializer):
+    return (type(serializer), tuple(
+        (nombre, type(campo), _clave(campo) if isinstance(campo, serializers.BaseSerializer) else None)
+        for nombre, campo in serializer.fields.items()
+    ))
+
+
+def _compilar(serializer, prefijo, columnas, conversores) -> str:
+    """
+    Arma la expresión Python del dict de un serializer (recursiva para los anidados).
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        raise _NoCompilable
+    model = serializer.Meta.model
+
+    partes = []
+    for nombre, campo in serializer.fields.items():
+        fuente = campo.source
+        columna = f"{prefijo}{fuente}"
+
+        if isinstance(campo, serializers.BaseSerializer):
+            # Relación anidada: None si la FK es nula, si no el dict del serializer hijo
+            columnas.append(columna)
+            hijo = _compilar(campo, f"{columna}__", columnas, conversores)
+            valor = f"({hijo} if fila[{columna!r}] is not None else None)"
+        elif isinstance(campo, serializers.SlugRelatedField):
+            columna = f"{columna}__{campo.slug_field}"
+            columnas.append(columna)
+            valor = f"fila[{columna!r}]"
+        elif isinstance(campo, serializers.PrimaryKeyRelatedField):
+            # values('fk') devuelve el id, igual que el PrimaryKeyRelatedField
+            columnas.append(columna)
+            valor = f"fila[{columna!r}]"
+        elif isinstance(campo, (serializers.RelatedField, serializers.SerializerMethodField)):
+            raise _NoCompilable
+        else:
+            try:
+                model._meta.get_field(fuente)
+            except FieldDoesNotExist:
+                raise _NoCompilable
+            columnas.append(columna)
+            if isinstance(campo, _SIN_CONVERSION):
+                valor = f"fila[{columna!r}]"
+            else:
+                conversor = f"_c{len(conversores)}"
+                conversores[conversor] = campo.to_representation
+                valor = f"({conversor}(fila[{columna!r}]) if fila[{columna!r}] is not None else None)"
+
+        partes.append(f"{nombre!r}: {valor}")
+
+    return '{' + ', '.join(partes) + '}'
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    """
+    JSONRenderer que usa orjson (si está instalado) con la misma salida que el de DRF:
+    JSON compacto, UTF-8 sin escapar y \\u2028/\\u2029 escapados. Los tipos que orjson
+    no conoce pasan por el encoder de DRF; con indentación o valores que orjson no
+    soporta se usa el renderer original.
+    """
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or not self.compact or self.ensure_ascii:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self._encoder.default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except TypeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
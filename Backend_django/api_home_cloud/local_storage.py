@@ -0,0 +1,291 @@
+import bisect
+import hashlib
+import logging
+import mimetypes
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+
+from .storage_backends import StorageBackend
+
+# Backend de almacenamiento en disco local (instalaciones self-hosted, tests y benchmarks).
+# Las subidas se escriben en un archivo temporal y se publican con os.replace (atómico),
+# y las descargas devuelven el archivo real para que el servidor WSGI lo envíe con
+# os.sendfile (copia cero: los bytes no pasan por Python).
+
+logger = logging.getLogger(__name__)
+
+# Salt de las URLs de subida firmadas (equivalente local de los SAS de Azure)
+UPLOAD_SIGNING_SALT = 'api_home_cloud.local_storage.upload'
+
+# Archivos temporales y bloques sin confirmar no forman parte del listado
+_TEMP_PREFIX = '.tmp-'
+_BLOCKS_DIR = '.blocks'
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Backend que guarda los archivos bajo settings.LOCAL_STORAGE_ROOT.
+    """
+    name = 'local'
+
+    def __init__(self):
+        """
+        Constructor de la clase. No toca el disco: los directorios se crean al escribir.
+        """
+        self.root = Path(getattr(settings, 'LOCAL_STORAGE_ROOT', settings.BASE_DIR / 'storage'))
+        self.base_url = getattr(settings, 'LOCAL_STORAGE_BASE_URL', 'http://localhost:8000').rstrip('/')
+        self.chunk_size = getattr(settings, 'AZURE_STORAGE_DOWNLOAD_CHUNK_SIZE', 4 * 1024 * 1024)
+        self.list_page_size = getattr(settings, 'AZURE_STORAGE_LIST_PAGE_SIZE', 100)
+        self.list_max_page_size = getattr(settings, 'AZURE_STORAGE_LIST_MAX_PAGE_SIZE', 1000)
+        self.sas_expiry_seconds = getattr(settings, 'AZURE_STORAGE_SAS_EXPIRY_SECONDS', 15 * 60)
+
+    @property
+    def is_configured(self) -> bool:
+        return True
+
+    def _path(self, blob_name: str) -> Path:
+        """
+        Ruta en disco de un blob. Rechaza nombres que escapen de la raíz ('../').
+        """
+        path = (self.root / blob_name).resolve()
+        if self.root.resolve() not in path.parents:
+            raise ValueError(f"Nombre de archivo inválido: '{blob_name}'")
+        return path
+
+    def _blocks_dir(self, blob_name: str) -> Path:
+        return self.root / _BLOCKS_DIR / hashlib.sha1(blob_name.encode()).hexdigest()
+
+    def _write_atomic(self, path: Path, chunks: Iterator[bytes]):
+        """
+        Escribe en un temporal del mismo directorio y lo renombra sobre el destino:
+        un lector nunca ve un archivo a medio escribir.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=_TEMP_PREFIX, dir=path.parent)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                for chunk in chunks:
+                    tmp.write(chunk)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def upload_file(self, file_obj: BinaryIO, blob_name: str, content_type: str = None) -> Optional[str]:
+        try:
+            path = self._path(blob_name)
+            if hasattr(file_obj, 'seek'):
+                file_obj.seek(0)
+            self._write_atomic(path, iter(lambda: file_obj.read(self.chunk_size), b''))
+
+            logger.info(f"Archivo '{blob_name}' guardado en disco")
+            return self.get_file_url(blob_name)
+
+        except Exception as e:
+            logger.error(f"Error guardando archivo '{blob_name}': {str(e)}")
+            return None
+
+    def stage_block(self, blob_name: str, block_id: str, data: bytes) -> bool:
+        try:
+            # Los ids de bloque son base64: se pasan a la variante segura para nombres de archivo
+            block_path = self._blocks_dir(blob_name) / block_id.replace('/', '_').replace('+', '-')
+            self._write_atomic(block_path, [data])
+            return True
+
+        except Exception as e:
+            logger.error(f"Error guardando bloque de '{blob_name}': {str(e)}")
+            return False
+
+    def commit_blocks(self, blob_name: str, block_ids: List[str], content_type: str = None) -> Optional[str]:
+        blocks_dir = self._blocks_dir(blob_name)
+
+        def read_blocks():
+            for block_id in block_ids:
+                with open(blocks_dir / block_id.replace('/', '_').replace('+', '-'), 'rb') as block:
+                    yield from iter(lambda: block.read(self.chunk_size), b'')
+
+        try:
+            self._write_atomic(self._path(blob_name), read_blocks())
+            # Igual que Azure: al confirmar se descartan los bloques no usados
+            shutil.rmtree(blocks_dir, ignore_errors=True)
+
+            logger.info(f"Archivo '{blob_name}' confirmado con {len(block_ids)} bloques")
+            return self.get_file_url(blob_name)
+
+        except Exception as e:
+            logger.error(f"Error confirmando bloques de '{blob_name}': {str(e)}")
+            return None
+
+    def get_file_properties(self, blob_name: str) -> Optional[dict]:
+        try:
+            stat = self._path(blob_name).stat()
+        except (OSError, ValueError):
+            logger.error(f"Archivo '{blob_name}' no encontrado")
+            return None
+
+        return {
+            'size': stat.st_size,
+            'content_type': mimetypes.guess_type(blob_name)[0] or 'application/octet-stream',
+            'etag': f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+            'last_modified': datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+        }
+
+    def stream_file(self, blob_name: str, offset: Optional[int] = None, length: Optional[int] = None) -> Optional[dict]:
+        try:
+            path = self._path(blob_name)
+            file_obj = open(path, 'rb')
+        except (OSError, ValueError):
+            logger.error(f"Archivo '{blob_name}' no encontrado")
+            return None
+
+        size = os.fstat(file_obj.fileno()).st_size
+        offset = offset or 0
+        length = size - offset if length is None else min(length, size - offset)
+        range_file = RangeFile(file_obj, offset, length, self.chunk_size)
+
+        return {
+            'file': range_file,
+            'chunks': range_file,
+            'size': length,
+        }
+
+    def download_file(self, blob_name: str) -> Optional[bytes]:
+        try:
+            return self._path(blob_name).read_bytes()
+        except (OSError, ValueError):
+            logger.error(f"Archivo '{blob_name}' no encontrado")
+            return None
+
+    def delete_file(self, blob_name: str) -> bool:
+        try:
+            os.remove(self._path(blob_name))
+            logger.info(f"Archivo '{blob_name}' eliminado")
+            return True
+        except (OSError, ValueError):
+            logger.warning(f"Archivo '{blob_name}' no encontrado para eliminar")
+            return False
+
+    def _all_names(self, prefix: str) -> List[str]:
+        names = []
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d != _BLOCKS_DIR]
+            for filename in filenames:
+                if filename.startswith(_TEMP_PREFIX):
+                    continue
+                name = os.path.relpath(os.path.join(dirpath, filename), self.root).replace(os.sep, '/')
+                if name.startswith(prefix):
+                    names.append(name)
+        names.sort()
+        return names
+
+    def _file_info(self, name: str) -> dict:
+        properties = self.get_file_properties(name)
+        return {
+            'name': name,
+            'size': properties['size'] if properties else None,
+            'last_modified': properties['last_modified'] if properties else None,
+            'url': self.get_file_url(name),
+        }
+
+    def list_files(self, prefix: str = "") -> List[dict]:
+        return [self._file_info(name) for name in self._all_names(prefix)]
+
+    def list_files_page(self, prefix: str = "", page_size: Optional[int] = None,
+                        continuation_token: Optional[str] = None) -> Optional[dict]:
+        """
+        Página de archivos en orden alfabético; el token es el último nombre devuelto.
+        """
+        page_size = min(page_size or self.list_page_size, self.list_max_page_size)
+        names = self._all_names(prefix)
+        start = bisect.bisect_right(names, continuation_token) if continuation_token else 0
+        page = names[start:start + page_size]
+
+        return {
+            'files': [self._file_info(name) for name in page],
+            'continuation_token': page[-1] if start + page_size < len(names) else None,
+        }
+
+    def get_file_url(self, blob_name: str) -> Optional[str]:
+        return f"{self.base_url}{reverse('azure_download_file', args=[blob_name])}"
+
+    def generate_upload_url(self, blob_name: str, expires_in: Optional[int] = None) -> Optional[dict]:
+        """
+        URL firmada (django.core.signing, HMAC con SECRET_KEY) hacia la vista
+        `local_direct_upload`. Es el equivalente local de los SAS de Azure.
+        """
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=expires_in or self.sas_expiry_seconds)
+        token = signing.dumps(
+            {'blob_name': blob_name, 'exp': int(expires_at.timestamp())}, salt=UPLOAD_SIGNING_SALT
+        )
+
+        return {
+            'url': f"{self.base_url}{reverse('local_direct_upload', args=[token])}",
+            'expires_at': expires_at,
+        }
+
+
+def verify_upload_token(token: str) -> Optional[str]:
+    """
+    Valida una URL de subida firmada por `generate_upload_url`.
+
+    Returns:
+        El blob_name autorizado, o None si la firma es inválida o venció.
+    """
+    try:
+        payload = signing.loads(token, salt=UPLOAD_SIGNING_SALT)
+        if datetime.now(timezone.utc).timestamp() > payload['exp']:
+            return None
+        return payload['blob_name']
+    except (signing.BadSignature, KeyError, TypeError):
+        return None
+
+
+class RangeFile:
+    """
+    Vista de solo lectura sobre un tramo [offset, offset + length) de un archivo.
+
+    Expone fileno() con el descriptor posicionado en `offset`, así el wsgi.file_wrapper
+    del servidor (gunicorn) puede usar os.sendfile limitado por Content-Length; si no
+    hay sendfile, FileResponse lo itera con read(), que nunca pasa del final del tramo.
+    """
+    def __init__(self, file_obj: BinaryIO, offset: int, length: int, chunk_size: int):
+        file_obj.seek(offset)
+        self._file = file_obj
+        self._remaining = length
+        self._chunk_size = chunk_size
+        self.name = file_obj.name
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self._remaining:
+            size = self._remaining
+        data = self._file.read(size)
+        self._remaining -= len(data)
+        return data
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(self._chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+    def close(self):
+        self._file.close()
+
+
+# Instancia a nivel de módulo (no hace I/O al importarse)
+local_storage = LocalStorageBackend()
@@ -0,0 +1,153 @@
+import random
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api_home_cloud.models import Documento, Grupo, Notificacion, Tarea
+
+
+class _Rollback(Exception):
+    pass
+
+
+# Índices compuestos/parciales que se comparan
+INDICES = [
+    'tarea_grupo_estado_venc_idx',
+    'tarea_abiertas_venc_idx',
+    'documento_grupo_fecha_idx',
+    'documento_pendientes_idx',
+    'notif_usuario_leida_fecha_idx',
+    'notif_no_leidas_idx',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Muestra el plan y el tiempo de las consultas más usadas de la API con y sin los "
+        "índices compuestos. Todo corre en una transacción que se revierte al final: no "
+        "deja datos de prueba ni cambia el esquema. Ojo: mientras corre, el DROP INDEX "
+        "bloquea las tablas, no usarlo contra una base en uso."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--filas', type=int, default=20000,
+            help="Filas de prueba a insertar por tabla antes de medir (0 = usar los datos existentes)",
+        )
+        parser.add_argument('--repeticiones', type=int, default=20, help="Ejecuciones por consulta")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                if options['filas']:
+                    self._cargar_datos(options['filas'])
+                grupo, usuario = self._muestra()
+                if grupo is None or usuario is None:
+                    self.stderr.write("No hay datos para medir; usá --filas")
+                    raise _Rollback
+
+                consultas = self._consultas(grupo, usuario)
+                con_indices = self._medir(consultas, options['repeticiones'])
+
+                with connection.cursor() as cursor:
+                    for nombre in INDICES:
+                        cursor.execute(f"DROP INDEX {connection.ops.quote_name(nombre)}")
+                self._analizar()
+                sin_indices = self._medir(consultas, options['repeticiones'])
+
+                for nombre in consultas:
+                    self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {nombre}"))
+                    for titulo, (ms, plan) in (('sin índices', sin_indices[nombre]), ('con índices', con_indices[nombre])):
+                        self.stdout.write(f"-- {titulo}: {ms:.2f} ms/consulta")
+                        self.stdout.write(plan)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _cargar_datos(self, filas: int):
+        """
+        Inserta datos con una distribución parecida a la real: muchos grupos, pocas
+        notificaciones no leídas y pocos documentos sin procesar.
+        """
+        self.stdout.write(f"Insertando {filas} filas por tabla...")
+        grupos = Grupo.objects.bulk_create(
+            [Grupo(nombre=f"bench-{i}") for i in range(max(filas // 100, 1))]
+        )
+        usuarios = User.objects.bulk_create(
+            [User(username=f"bench-{time.time_ns()}-{i}") for i in range(max(filas // 100, 1))]
+        )
+        estados = [estado for estado, _ in Tarea.ESTADOS]
+        hoy = date.today()
+
+        Tarea.objects.bulk_create([
+            Tarea(
+                grupo=random.choice(grupos), titulo=f"tarea {i}", estado=random.choice(estados),
+                fecha_vencimiento=hoy + timedelta(days=random.randint(-90, 90)),
+            )
+            for i in range(filas)
+        ], batch_size=1000)
+        Documento.objects.bulk_create([
+            Documento(
+                grupo=random.choice(grupos), nombre_archivo=f"doc {i}", url_archivo='https://example.com/x',
+                procesado=random.random() > 0.05,
+            )
+            for i in range(filas)
+        ], batch_size=1000)
+        tareas = list(Tarea.objects.values_list('pk', flat=True)[:1000])
+        Notificacion.objects.bulk_create([
+            Notificacion(
+                usuario=random.choice(usuarios), tarea_id=random.choice(tareas), mensaje=f"aviso {i}",
+                leida=random.random() > 0.05,
+            )
+            for i in range(filas)
+        ], batch_size=1000)
+        self._analizar()
+
+    def _analizar(self):
+        # Estadísticas frescas para que el planificador elija como lo haría en producción
+        with connection.cursor() as cursor:
+            for model in (Tarea, Documento, Notificacion):
+                cursor.execute(f"ANALYZE {connection.ops.quote_name(model._meta.db_table)}")
+
+    def _muestra(self):
+        grupo = Grupo.objects.filter(tareas__isnull=False).order_by('?').first()
+        usuario = User.objects.filter(notificaciones__isnull=False).order_by('?').first()
+        return grupo, usuario
+
+    def _consultas(self, grupo, usuario) -> dict:
+        return {
+            'Tareas pendientes de un grupo por vencimiento': (
+                Tarea.objects.filter(grupo=grupo, estado='pendiente').order_by('fecha_vencimiento')[:50]
+            ),
+            'Tareas abiertas que entran en la ventana de recordatorio': (
+                Tarea.objects.filter(
+                    estado__in=['pendiente', 'en_progreso'],
+                    fecha_vencimiento__gt=date.today(), fecha_vencimiento__lte=date.today() + timedelta(days=1),
+                )
+            ),
+            'Documentos de un grupo (página 1)': (
+                Documento.objects.filter(grupo=grupo).order_by('-fecha_subida', '-id')[:50]
+            ),
+            'Documentos sin procesar de un grupo': (
+                Documento.objects.filter(grupo=grupo, procesado=False).order_by('-fecha_subida')[:50]
+            ),
+            'Notificaciones no leídas de un usuario': (
+                Notificacion.objects.filter(usuario=usuario, leida=False).order_by('-fecha_envio')[:50]
+            ),
+            'Notificaciones leídas de un usuario': (
+                Notificacion.objects.filter(usuario=usuario, leida=True).order_by('-fecha_envio')[:50]
+            ),
+        }
+
+    def _medir(self, consultas: dict, repeticiones: int) -> dict:
+        resultados = {}
+        for nombre, queryset in consultas.items():
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                list(queryset.all())
+            ms = (time.perf_counter() - inicio) * 1000 / repeticiones
+            resultados[nombre] = (ms, queryset.explain())
+        return resultados
@@ -0,0 +1,126 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from api_home_cloud.lectura_rapida import JSONRapidoRenderer, compilar_mapeo, orjson
+from api_home_cloud.models import Documento, Grupo, Tarea
+from api_home_cloud.serializers import DocumentoSerializer, TareaSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara filas/segundo de los listados armados con el serializer de DRF contra el "
+        "camino rápido (.values() + mapeo precompilado) y el tiempo de generar el JSON con "
+        "json y con orjson. Verifica que ambas salidas sean idénticas. Corre en una "
+        "transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=5000, help="Filas de prueba por tabla")
+        parser.add_argument('--repeticiones', type=int, default=5, help="Ejecuciones por medición")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._cargar_datos(options['filas'])
+                casos = {
+                    'tareas': (TareaSerializer, Tarea.objects.order_by('-id')),
+                    'tareas ?expand=creado_por,asignado_a': (
+                        TareaSerializer, Tarea.objects.order_by('-id'), {'expand': 'creado_por,asignado_a'}
+                    ),
+                    'documentos': (DocumentoSerializer, Documento.objects.order_by('-id')),
+                }
+                for nombre, caso in casos.items():
+                    self._comparar(nombre, *caso, repeticiones=options['repeticiones'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _cargar_datos(self, filas: int):
+        self.stdout.write(f"Insertando {filas} filas por tabla...")
+        grupo = Grupo.objects.create(nombre='bench')
+        usuarios = User.objects.bulk_create(
+            [User(username=f"bench-{time.time_ns()}-{i}", email=f"bench{i}@example.com") for i in range(20)]
+        )
+        estados = [estado for estado, _ in Tarea.ESTADOS]
+        hoy = date.today()
+        Tarea.objects.bulk_create([
+            Tarea(
+                grupo=grupo, titulo=f"Pagar factura {i}", descripcion="Creada automáticamente " * 3,
+                estado=random.choice(estados), monto=Decimal(random.randint(100, 99999)) / 100,
+                fecha_vencimiento=hoy + timedelta(days=random.randint(-90, 90)),
+                creado_por=random.choice(usuarios), asignado_a=random.choice(usuarios + [None]),
+            )
+            for i in range(filas)
+        ], batch_size=1000)
+        Documento.objects.bulk_create([
+            Documento(
+                grupo=grupo, usuario=random.choice(usuarios), nombre_archivo=f"factura_{i}.pdf",
+                url_archivo=f"https://example.com/{i}.pdf", blob_name=f"{i}.pdf",
+                procesado=random.random() > 0.1,
+            )
+            for i in range(filas)
+        ], batch_size=1000)
+
+    def _comparar(self, nombre, serializer_class, queryset, parametros=None, repeticiones=5):
+        request = _Request(parametros or {})
+        serializer = serializer_class(context={'request': request})
+        mapeo = compilar_mapeo(serializer)
+        if mapeo is None:
+            raise CommandError(f"{serializer_class.__name__} no se puede compilar")
+        columnas, mapear = mapeo
+
+        relaciones = [c for c in serializer.fields if c in (parametros or {}).get('expand', '').split(',')]
+
+        def con_drf():
+            qs = queryset.select_related(*relaciones) if relaciones else queryset
+            return serializer_class(qs, many=True, context={'request': request}).data
+
+        def con_mapeo():
+            return [mapear(fila) for fila in queryset.values(*columnas)]
+
+        drf_ms, datos_drf = _medir(con_drf, repeticiones)
+        rapido_ms, datos_rapidos = _medir(con_mapeo, repeticiones)
+
+        drf_json = JSONRenderer().render(datos_drf)
+        if JSONRapidoRenderer().render(datos_rapidos) != drf_json:
+            raise CommandError(f"{nombre}: la salida del camino rápido difiere de la de DRF")
+
+        filas = len(datos_rapidos)
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {nombre} ({filas} filas, salida idéntica)"))
+        self.stdout.write(f"-- serializer DRF:   {drf_ms:8.1f} ms  {filas / drf_ms * 1000:10.0f} filas/s")
+        self.stdout.write(f"-- values + mapeo:   {rapido_ms:8.1f} ms  {filas / rapido_ms * 1000:10.0f} filas/s")
+
+        json_ms, _ = _medir(lambda: JSONRenderer().render(datos_rapidos), repeticiones)
+        self.stdout.write(f"-- JSON (json):      {json_ms:8.1f} ms")
+        if orjson is not None:
+            orjson_ms, _ = _medir(lambda: JSONRapidoRenderer().render(datos_rapidos), repeticiones)
+            self.stdout.write(f"-- JSON (orjson):    {orjson_ms:8.1f} ms")
+        else:
+            self.stdout.write("-- JSON (orjson):    no instalado")
+
+
+class _Request:
+    """
+    Lo mínimo que leen los serializers (?fields=/?expand=) fuera de una vista.
+    """
+    def __init__(self, parametros: dict):
+        self.query_params = parametros
+
+
+def _medir(funcion, repeticiones: int):
+    resultado = None
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        resultado = funcion()
+    return (time.perf_counter() - inicio) * 1000 / repeticiones, resultado
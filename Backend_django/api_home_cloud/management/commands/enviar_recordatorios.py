@@ -0,0 +1,51 @@
+import signal
+import threading
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api_home_cloud.recordatorios import enviar_recordatorios, ventanas
+
+
+class Command(BaseCommand):
+    help = (
+        "Envía recordatorios de vencimiento de las tareas abiertas (ventanas "
+        "RECORDATORIOS_DIAS y vencidas). Queda corriendo y repite cada --intervalo "
+        "segundos; cada corrida solo procesa lo nuevo desde la anterior."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--intervalo', type=float, default=getattr(settings, 'RECORDATORIOS_INTERVALO_SEGUNDOS', 3600),
+            help="Segundos entre corridas",
+        )
+        parser.add_argument('--una-vez', action='store_true', help="Hace una corrida y termina (para cron)")
+        parser.add_argument(
+            '--fecha', type=str,
+            help="Corre como si hoy fuera AAAA-MM-DD (implica --una-vez)",
+        )
+
+    def handle(self, *args, **options):
+        hoy = None
+        if options['fecha']:
+            try:
+                hoy = date.fromisoformat(options['fecha'])
+            except ValueError:
+                raise CommandError("--fecha debe ser AAAA-MM-DD")
+
+        detener = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: detener.set())
+        signal.signal(signal.SIGINT, lambda *_: detener.set())
+
+        self.stdout.write(f"Ventanas de recordatorio (días antes del vencimiento): {ventanas()}")
+        while not detener.is_set():
+            try:
+                avisadas = enviar_recordatorios(hoy)
+                self.stdout.write(f"{avisadas} tareas avisadas")
+            except Exception as e:
+                # La corrida fallida no avanzó las marcas: la próxima la repite
+                self.stderr.write(f"Error enviando recordatorios: {e}")
+            if options['una_vez'] or hoy is not None:
+                break
+            detener.wait(options['intervalo'])
@@ -0,0 +1,127 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api_home_cloud.extraccion import extraer_candidatos, inicializar_proceso
+from api_home_cloud.models import Documento, TrabajoProcesamiento
+from api_home_cloud.procesamiento import (
+    completar_trabajo, encolar_documento, fallar_trabajo, reclamar_trabajos,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker de la cola de procesamiento: toma trabajos pendientes y extrae monto y "
+        "vencimiento de los documentos en un pool de procesos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrencia', type=int,
+            default=getattr(settings, 'PROCESAMIENTO_CONCURRENCIA', None) or os.cpu_count(),
+            help="Procesos en paralelo (por defecto PROCESAMIENTO_CONCURRENCIA o la cantidad de CPUs)",
+        )
+        parser.add_argument(
+            '--intervalo', type=float, default=getattr(settings, 'PROCESAMIENTO_INTERVALO_SEGUNDOS', 2),
+            help="Segundos entre consultas a la cola cuando no hay trabajo",
+        )
+        parser.add_argument(
+            '--una-vez', action='store_true',
+            help="Procesa lo que haya disponible y termina (en lugar de quedar escuchando)",
+        )
+        parser.add_argument(
+            '--encolar-pendientes', action='store_true',
+            help="Antes de empezar, encola los documentos no procesados que no tienen trabajo",
+        )
+
+    def handle(self, *args, **options):
+        self.concurrencia = max(options['concurrencia'], 1)
+        self.worker = f"{socket.gethostname()}:{os.getpid()}"
+        self.detener = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *_: self.detener.set())
+        signal.signal(signal.SIGINT, lambda *_: self.detener.set())
+
+        if options['encolar_pendientes']:
+            documentos = Documento.objects.filter(procesado=False).exclude(blob_name='').exclude(
+                trabajos__estado__in=['pendiente', 'en_proceso']
+            ).values_list('pk', flat=True)
+            total = 0
+            for documento_id in documentos.iterator():
+                encolar_documento(documento_id)
+                total += 1
+            self.stdout.write(f"{total} documentos encolados")
+
+        self.stdout.write(f"Worker {self.worker} iniciado con {self.concurrencia} procesos")
+        self.procesados = 0
+        self.en_curso = {}
+        pool = self._nuevo_pool()
+        try:
+            while not self.detener.is_set():
+                try:
+                    libres = self.concurrencia - len(self.en_curso)
+                    for trabajo in reclamar_trabajos(libres, self.worker):
+                        documento = trabajo.documento
+                        futuro = pool.submit(extraer_candidatos, documento.blob_name, documento.nombre_archivo)
+                        self.en_curso[futuro] = trabajo
+                except BrokenProcessPool:
+                    pool = self._reiniciar_pool(pool)
+                    continue
+
+                if not self.en_curso:
+                    if options['una_vez']:
+                        break
+                    self.detener.wait(options['intervalo'])
+                    continue
+
+                listos, _ = wait(self.en_curso, timeout=options['intervalo'], return_when=FIRST_COMPLETED)
+                if self._recoger(listos):
+                    pool = self._reiniciar_pool(pool)
+
+            # Apagado ordenado: se terminan y aplican los trabajos en curso
+            if self.en_curso:
+                self.stdout.write(f"Esperando {len(self.en_curso)} trabajos en curso...")
+                listos, _ = wait(self.en_curso)
+                self._recoger(listos)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        self.stdout.write(self.style.SUCCESS(f"Worker detenido; {self.procesados} documentos procesados"))
+
+    def _nuevo_pool(self) -> ProcessPoolExecutor:
+        # 'spawn': los procesos no heredan las conexiones a la base ni los sockets del padre
+        return ProcessPoolExecutor(
+            max_workers=self.concurrencia,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=inicializar_proceso,
+        )
+
+    def _reiniciar_pool(self, pool: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        self.stderr.write("El pool de procesos se rompió, se crea uno nuevo")
+        pool.shutdown(wait=False, cancel_futures=True)
+        return self._nuevo_pool()
+
+    def _recoger(self, listos) -> bool:
+        """
+        Aplica los resultados terminados. Devuelve True si el pool quedó roto (un
+        proceso murió) y hay que reemplazarlo.
+        """
+        roto = False
+        for futuro in listos:
+            trabajo = self.en_curso.pop(futuro)
+            try:
+                resultado = futuro.result()
+                if completar_trabajo(trabajo, resultado):
+                    self.procesados += 1
+            except BrokenProcessPool as e:
+                roto = True
+                fallar_trabajo(trabajo, f"El proceso del worker terminó inesperadamente: {e}")
+            except Exception as e:
+                fallar_trabajo(trabajo, str(e) or e.__class__.__name__)
+        return roto
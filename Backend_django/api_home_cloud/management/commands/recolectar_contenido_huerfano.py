@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api_home_cloud.deduplicacion import recolectar_huerfanos
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra los contenidos deduplicados que quedaron sin referencias (subidas cuyo "
+        "Documento nunca se creó) una vez vencido AZURE_STORAGE_DEDUP_GRACIA_SEGUNDOS. "
+        "Correr periódicamente desde cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gracia', type=int, default=None,
+            help="Segundos desde el último uso (por defecto AZURE_STORAGE_DEDUP_GRACIA_SEGUNDOS)",
+        )
+
+    def handle(self, *args, **options):
+        borrados = recolectar_huerfanos(options['gracia'])
+        self.stdout.write(f"{borrados} contenidos huérfanos borrados")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api_home_cloud.resumenes import reconciliar
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los contadores del tablero desde las tareas y notificaciones y corrige "
+        "los que difieren. Correr después de migrar (los carga por primera vez) y "
+        "periódicamente desde cron para corregir desvíos."
+    )
+
+    def handle(self, *args, **options):
+        corregidas = reconciliar()
+        for modelo, cantidad in corregidas.items():
+            self.stdout.write(f"{modelo}: {cantidad} filas corregidas")
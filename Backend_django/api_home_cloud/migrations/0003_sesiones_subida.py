@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:29
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_home_cloud', '0002_rename_familia_to_grupo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SesionSubida',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('blob_name', models.CharField(max_length=1024)),
+                ('content_type', models.CharField(default='application/octet-stream', max_length=255)),
+                ('tamano_total', models.PositiveBigIntegerField()),
+                ('tamano_chunk', models.PositiveIntegerField()),
+                ('estado', models.CharField(choices=[('abierta', 'Abierta'), ('completada', 'Completada'), ('cancelada', 'Cancelada')], default='abierta', max_length=20)),
+                ('url_archivo', models.URLField(blank=True, max_length=500)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sesiones_subida', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ChunkSubida',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('numero', models.PositiveIntegerField()),
+                ('tamano', models.PositiveIntegerField()),
+                ('fecha_subida', models.DateTimeField(auto_now=True)),
+                ('sesion', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='api_home_cloud.sesionsubida')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('sesion', 'numero'), name='chunk_unico_por_sesion')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_home_cloud', '0003_sesiones_subida'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documento',
+            name='blob_name',
+            field=models.CharField(blank=True, help_text='Nombre del blob en el almacenamiento, si se conoce', max_length=1024),
+        ),
+    ]
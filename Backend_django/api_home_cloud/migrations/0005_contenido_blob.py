@@ -0,0 +1,32 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_home_cloud', '0004_documento_blob_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContenidoBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('blob_name', models.CharField(max_length=1024)),
+                ('url_archivo', models.URLField(max_length=500)),
+                ('tamano', models.PositiveBigIntegerField()),
+                ('content_type', models.CharField(default='application/octet-stream', max_length=255)),
+                ('referencias', models.PositiveIntegerField(default=0, help_text='Cantidad de Documentos que apuntan a este contenido')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='contenido',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='documentos', to='api_home_cloud.contenidoblob'),
+        ),
+    ]
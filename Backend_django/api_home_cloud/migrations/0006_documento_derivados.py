@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_home_cloud', '0005_contenido_blob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documento',
+            name='url_miniatura',
+            field=models.URLField(blank=True, max_length=500),
+        ),
+        migrations.AddField(
+            model_name='documento',
+            name='url_vista_previa',
+            field=models.URLField(blank=True, max_length=500),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:44
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_home_cloud', '0007_trabajo_procesamiento'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documento',
+            index=models.Index(fields=['-fecha_subida', '-id'], name='documento_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='grupo',
+            index=models.Index(fields=['-fecha_creacion', '-id'], name='grupo_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['-fecha_envio', '-id'], name='notificacion_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['-fecha_creacion', '-id'], name='tarea_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_home_cloud', '0008_indices_paginacion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documento',
+            index=models.Index(fields=['grupo', '-fecha_subida', '-id'], name='documento_grupo_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documento',
+            index=models.Index(condition=models.Q(('procesado', False)), fields=['grupo', '-fecha_subida'], name='documento_pendientes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(fields=['usuario', 'leida', '-fecha_envio'], name='notif_usuario_leida_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificacion',
+            index=models.Index(condition=models.Q(('leida', False)), fields=['usuario', '-fecha_envio'], name='notif_no_leidas_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(fields=['grupo', 'estado', 'fecha_vencimiento'], name='tarea_grupo_estado_venc_idx'),
+        ),
+    ]
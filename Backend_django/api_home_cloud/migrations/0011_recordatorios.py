@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-18 08:59
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_home_cloud', '0010_contador_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarcaRecordatorio',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ventana', models.SmallIntegerField(unique=True)),
+                ('hasta', models.DateField()),
+                ('fecha_ejecucion', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(condition=models.Q(('estado__in', ['pendiente', 'en_progreso'])), fields=['fecha_vencimiento'], name='tarea_abiertas_venc_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_home_cloud', '0011_recordatorios'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenGrupo',
+            fields=[
+                ('grupo', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumen', serialize=False, to='api_home_cloud.grupo')),
+                ('tareas_pendientes', models.IntegerField(default=0)),
+                ('tareas_en_progreso', models.IntegerField(default=0)),
+                ('tareas_completadas', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumenUsuario',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='resumen', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('notificaciones_no_leidas', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ResumenVencimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_vencimiento', models.DateField()),
+                ('tareas', models.IntegerField(default=0)),
+                ('monto', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('grupo', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resumen_vencimientos', to='api_home_cloud.grupo')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('grupo', 'fecha_vencimiento'), name='resumen_venc_unico')],
+            },
+        ),
+    ]
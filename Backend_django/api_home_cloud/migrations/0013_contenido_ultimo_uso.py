@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_home_cloud', '0012_resumenes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contenidoblob',
+            name='fecha_ultimo_uso',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='contenidoblob',
+            index=models.Index(condition=models.Q(('referencias', 0)), fields=['fecha_ultimo_uso'], name='contenido_huerfano_idx'),
+        ),
+    ]
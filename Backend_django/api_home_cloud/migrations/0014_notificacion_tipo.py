@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:55
+
+from django.db import migrations, models
+
+
+def marcar_recordatorios(apps, schema_editor):
+    # Los recordatorios existentes se reconocen por el mensaje (ver mensaje_de_recordatorio)
+    Notificacion = apps.get_model('api_home_cloud', 'Notificacion')
+    Notificacion.objects.filter(mensaje__regex=r"^La tarea '.*' (vence|venció) ").update(tipo='recordatorio')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_home_cloud', '0013_contenido_ultimo_uso'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificacion',
+            name='tipo',
+            field=models.CharField(choices=[('tarea', 'Tarea'), ('recordatorio', 'Recordatorio')], default='tarea', max_length=20),
+        ),
+        migrations.RunPython(marcar_recordatorios, migrations.RunPython.noop),
+    ]
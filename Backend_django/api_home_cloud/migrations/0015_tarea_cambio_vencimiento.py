@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 09:58
+
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def desde_la_creacion(apps, schema_editor):
+    # Sin esto todas las tareas contarían como cambiadas ahora y la próxima corrida de
+    # recordatorios volvería a avisar de todas
+    Tarea = apps.get_model('api_home_cloud', 'Tarea')
+    Tarea.objects.update(fecha_cambio_vencimiento=models.F('fecha_creacion'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api_home_cloud', '0014_notificacion_tipo'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tarea',
+            name='fecha_cambio_vencimiento',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(desde_la_creacion, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tarea',
+            index=models.Index(condition=models.Q(('estado__in', ['pendiente', 'en_progreso'])), fields=['fecha_cambio_vencimiento'], name='tarea_abiertas_cambio_idx'),
+        ),
+    ]
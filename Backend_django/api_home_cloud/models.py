@@ -1,4 +1,8 @@
+import math
+import uuid
+
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 # Grupo (familia, amigos, consorcio, equipo de trabajo, etc.)
@@ -16,6 +20,12 @@ class Grupo(models.Model):
     descripcion = models.TextField(blank=True, help_text="Descripción opcional del grupo")
     fecha_creacion = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Orden del listado paginado por cursor
+            models.Index(fields=['-fecha_creacion', '-id'], name='grupo_fecha_idx'),
+        ]
+
     def __str__(self):
         return f"{self.nombre} ({self.get_tipo_grupo_display()})"
 
@@ -34,6 +44,32 @@ class PerfilUsuario(models.Model):
         return f"{self.user.username} ({self.rol})"
 
 
+# Contenido deduplicado: un blob por hash SHA-256, compartido por varios Documentos
+class ContenidoBlob(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True)
+    blob_name = models.CharField(max_length=1024)
+    url_archivo = models.URLField(max_length=500)
+    tamano = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=255, default='application/octet-stream')
+    referencias = models.PositiveIntegerField(default=0, help_text="Cantidad de Documentos que apuntan a este contenido")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Última vez que una subida devolvió este contenido: da tiempo a crear el Documento
+    # antes de que recolectar_huerfanos() lo borre
+    fecha_ultimo_uso = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Contenidos sin referencias, candidatos a recolectar
+            models.Index(
+                fields=['fecha_ultimo_uso'], condition=models.Q(referencias=0),
+                name='contenido_huerfano_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.referencias} refs)"
+
+
 # Documento (archivos subidos)
 class Documento(models.Model):
     TIPOS = [
@@ -47,10 +83,27 @@ class Documento(models.Model):
     usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='documentos')
     nombre_archivo = models.CharField(max_length=255)
     url_archivo = models.URLField(max_length=500)
+    blob_name = models.CharField(max_length=1024, blank=True, help_text="Nombre del blob en el almacenamiento, si se conoce")
+    contenido = models.ForeignKey(ContenidoBlob, on_delete=models.PROTECT, null=True, blank=True, related_name='documentos')
+    # Derivados WebP generados en segundo plano (ver derivados.py)
+    url_miniatura = models.URLField(max_length=500, blank=True)
+    url_vista_previa = models.URLField(max_length=500, blank=True)
     tipo_documento = models.CharField(max_length=20, choices=TIPOS, default='otro')
     fecha_subida = models.DateTimeField(auto_now_add=True)
     procesado = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-fecha_subida', '-id'], name='documento_fecha_idx'),
+            # Documentos de un grupo, más recientes primero
+            models.Index(fields=['grupo', '-fecha_subida', '-id'], name='documento_grupo_fecha_idx'),
+            # Parcial: solo los pendientes de procesar (una fracción chica de la tabla)
+            models.Index(
+                fields=['grupo', '-fecha_subida'], condition=models.Q(procesado=False),
+                name='documento_pendientes_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.nombre_archivo} - {self.tipo_documento}"
 
@@ -62,6 +115,8 @@ class Tarea(models.Model):
         ('en_progreso', 'En progreso'),
         ('completada', 'Completada'),
     ]
+    # Recordatorios y contadores del tablero (tiene que coincidir con tarea_abiertas_venc_idx)
+    ESTADOS_ABIERTOS = ['pendiente', 'en_progreso']
 
     grupo = models.ForeignKey(Grupo, on_delete=models.CASCADE, related_name='tareas')
     documento = models.ForeignKey(Documento, on_delete=models.SET_NULL, null=True, blank=True, related_name='tareas')
@@ -73,6 +128,26 @@ class Tarea(models.Model):
     creado_por = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='tareas_creadas')
     asignado_a = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='tareas_asignadas')
     fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Alta o último cambio de fecha_vencimiento: los recordatorios revisan las tareas
+    # cuyo vencimiento cambió desde la corrida anterior (ver recordatorios.py)
+    fecha_cambio_vencimiento = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-fecha_creacion', '-id'], name='tarea_fecha_idx'),
+            # Tareas de un grupo por estado, ordenadas por vencimiento
+            models.Index(fields=['grupo', 'estado', 'fecha_vencimiento'], name='tarea_grupo_estado_venc_idx'),
+            # Recordatorios (recordatorios.py): rango de vencimientos de las tareas abiertas
+            models.Index(
+                fields=['fecha_vencimiento'], name='tarea_abiertas_venc_idx',
+                condition=models.Q(estado__in=['pendiente', 'en_progreso']),
+            ),
+            # Recordatorios: tareas abiertas con vencimiento nuevo desde la corrida anterior
+            models.Index(
+                fields=['fecha_cambio_vencimiento'], name='tarea_abiertas_cambio_idx',
+                condition=models.Q(estado__in=['pendiente', 'en_progreso']),
+            ),
+        ]
 
     def __str__(self):
         return f"{self.titulo} ({self.estado})"
@@ -80,11 +155,167 @@ class Tarea(models.Model):
 
 # Notificación (para avisos automáticos)
 class Notificacion(models.Model):
+    TIPOS = [
+        ('tarea', 'Tarea'),
+        ('recordatorio', 'Recordatorio'),
+    ]
+
     usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notificaciones')
     tarea = models.ForeignKey(Tarea, on_delete=models.CASCADE, related_name='notificaciones')
     mensaje = models.CharField(max_length=255)
+    # Alta/cambio de estado de la tarea o recordatorio de vencimiento: solo se juntan
+    # avisos del mismo tipo (ver notificaciones.py)
+    tipo = models.CharField(max_length=20, choices=TIPOS, default='tarea')
     fecha_envio = models.DateTimeField(auto_now_add=True)
     leida = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-fecha_envio', '-id'], name='notificacion_fecha_idx'),
+            # Bandeja de un usuario (todas o filtradas por leída), más recientes primero
+            models.Index(fields=['usuario', 'leida', '-fecha_envio'], name='notif_usuario_leida_fecha_idx'),
+            # Parcial: el contador y la lista de no leídas solo recorren esas filas
+            models.Index(
+                fields=['usuario', '-fecha_envio'], condition=models.Q(leida=False),
+                name='notif_no_leidas_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Notif. a {self.usuario.username}: {self.mensaje[:30]}..."
+
+
+# Sesión de subida reanudable (el archivo llega en partes numeradas)
+class SesionSubida(models.Model):
+    ESTADOS = [
+        ('abierta', 'Abierta'),
+        ('completada', 'Completada'),
+        ('cancelada', 'Cancelada'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='sesiones_subida')
+    blob_name = models.CharField(max_length=1024)
+    content_type = models.CharField(max_length=255, default='application/octet-stream')
+    tamano_total = models.PositiveBigIntegerField()
+    tamano_chunk = models.PositiveIntegerField()
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='abierta')
+    url_archivo = models.URLField(max_length=500, blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    @property
+    def total_chunks(self):
+        return math.ceil(self.tamano_total / self.tamano_chunk)
+
+    def tamano_esperado(self, numero):
+        """Tamaño que debe tener la parte `numero` (la última puede ser más corta)."""
+        if numero == self.total_chunks - 1:
+            return self.tamano_total - numero * self.tamano_chunk
+        return self.tamano_chunk
+
+    def __str__(self):
+        return f"{self.blob_name} ({self.estado})"
+
+
+# Parte recibida de una sesión de subida (ya guardada como bloque sin confirmar)
+class ChunkSubida(models.Model):
+    sesion = models.ForeignKey(SesionSubida, on_delete=models.CASCADE, related_name='chunks')
+    numero = models.PositiveIntegerField()
+    tamano = models.PositiveIntegerField()
+    fecha_subida = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['sesion', 'numero'], name='chunk_unico_por_sesion'),
+        ]
+
+    def __str__(self):
+        return f"{self.sesion_id} #{self.numero}"
+
+
+# Trabajo de procesamiento de un Documento (cola en la base, ver procesamiento.py)
+class TrabajoProcesamiento(models.Model):
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('en_proceso', 'En proceso'),
+        ('completado', 'Completado'),
+        ('fallido', 'Fallido'),
+    ]
+
+    documento = models.ForeignKey(Documento, on_delete=models.CASCADE, related_name='trabajos')
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='pendiente')
+    intentos = models.PositiveIntegerField(default=0)
+    # Pendiente: a partir de cuándo se puede tomar (reintentos con espera).
+    # En proceso: hasta cuándo es del worker que lo tomó; vencido, otro lo puede retomar.
+    disponible_desde = models.DateTimeField(default=timezone.now)
+    worker = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'disponible_desde'], name='trabajo_cola_idx'),
+        ]
+
+    def __str__(self):
+        return f"Documento {self.documento_id} ({self.estado})"
+
+
+# Versión de los datos que ve cada grupo (ETag / Last-Modified de la API, ver versiones.py)
+class ContadorVersion(models.Model):
+    # 'grupo:<id>' para los datos de un grupo, 'usuarios' para los usuarios
+    clave = models.CharField(max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    fecha_modificacion = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.clave} v{self.version}"
+
+
+# Hasta qué vencimiento se enviaron los recordatorios de cada ventana (ver recordatorios.py)
+class MarcaRecordatorio(models.Model):
+    # Días antes del vencimiento (0 = el día que vence, -1 = vencida)
+    ventana = models.SmallIntegerField(unique=True)
+    hasta = models.DateField()
+    fecha_ejecucion = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Ventana {self.ventana}: hasta {self.hasta}"
+
+
+# Contadores del tablero (/api/tablero/, ver resumenes.py)
+class ResumenUsuario(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='resumen')
+    notificaciones_no_leidas = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.notificaciones_no_leidas} sin leer"
+
+
+class ResumenGrupo(models.Model):
+    grupo = models.OneToOneField(Grupo, on_delete=models.CASCADE, primary_key=True, related_name='resumen')
+    tareas_pendientes = models.IntegerField(default=0)
+    tareas_en_progreso = models.IntegerField(default=0)
+    tareas_completadas = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Grupo {self.grupo_id}: {self.tareas_pendientes} pendientes"
+
+
+# Tareas abiertas de un grupo que vencen un día dado: vencidas y monto del mes se suman
+# sobre estas filas (una por día con tareas abiertas, no una por tarea)
+class ResumenVencimiento(models.Model):
+    grupo = models.ForeignKey(Grupo, on_delete=models.CASCADE, related_name='resumen_vencimientos')
+    fecha_vencimiento = models.DateField()
+    tareas = models.IntegerField(default=0)
+    monto = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['grupo', 'fecha_vencimiento'], name='resumen_venc_unico'),
+        ]
+
     def __str__(self):
-        return f"Notif. a {self.usuario.username}: {self.mensaje[:30]}..."
\ No newline at end of file
+        return f"Grupo {self.grupo_id} {self.fecha_vencimiento}: {self.tareas} abiertas"
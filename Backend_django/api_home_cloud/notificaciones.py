@@ -0,0 +1,121 @@
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from typing import Iterable, List, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .eventos import evento_de_notificacion, publicar_al_confirmar
+from .models import Notificacion, PerfilUsuario, Tarea
+from .resumenes import ajustar_notificaciones
+from .versiones import clave_grupo, incrementar_version
+
+# Notificaciones a los miembros del grupo cuando se crea una Tarea o cambia su estado.
+# Los destinatarios salen de PerfilUsuario con una consulta y las filas se insertan con
+# bulk_create por tandas: avisar a un grupo de 40 personas son 1-2 consultas, no 40.
+#
+# Eventos repetidos de la misma tarea dentro de NOTIFICACIONES_VENTANA_SEGUNDOS se
+# juntan: en lugar de otra tanda de filas se actualiza el mensaje de las que ya se
+# enviaron (y vuelven a quedar sin leer). Así una tarea genera como mucho una tanda de
+# inserts por ventana, por más veces que cambie. Solo se juntan filas del mismo tipo:
+# un cambio de estado no pisa el recordatorio de vencimiento de la misma tarea.
+
+logger = logging.getLogger(__name__)
+
+# (tarea_id, grupo_id, mensaje, usuario a no notificar)
+Aviso = Tuple[int, int, str, int]
+
+
+def notificaciones_habilitadas() -> bool:
+    return getattr(settings, 'NOTIFICACIONES_ENABLED', True)
+
+
+def programar_notificaciones(tareas: Iterable[Tarea], creadas: bool):
+    """
+    Arma los avisos de `tareas` (todas si son nuevas; si no, las que cambiaron de
+    estado desde que se cargaron) y los envía cuando se confirma la transacción.
+    """
+    if not notificaciones_habilitadas():
+        return
+
+    avisos = []
+    for tarea in tareas:
+        anterior = getattr(tarea, '_estado_original', None)
+        if creadas:
+            # Quien la crea no necesita el aviso
+            avisos.append((tarea.pk, tarea.grupo_id, f"Nueva tarea: {tarea.titulo}"[:255], tarea.creado_por_id))
+        elif anterior is not None and tarea.estado != anterior:
+            mensaje = f"La tarea '{tarea.titulo}' pasó a {tarea.get_estado_display()}"[:255]
+            avisos.append((tarea.pk, tarea.grupo_id, mensaje, None))
+        tarea._estado_original = tarea.estado
+
+    if avisos:
+        transaction.on_commit(lambda: _notificar_sin_fallar(avisos))
+
+
+def _notificar_sin_fallar(avisos: List[Aviso]):
+    # Corre después del commit: un error acá no tiene que romper el request
+    try:
+        notificar(avisos)
+    except Exception as e:
+        logger.error(f"Error enviando notificaciones de {len(avisos)} tareas: {e}")
+
+
+def notificar(avisos: List[Aviso], agrupar: bool = True, tipo: str = 'tarea') -> int:
+    """
+    Envía los avisos: junta los de tareas con notificaciones de `tipo` dentro de la
+    ventana (si `agrupar`) y crea el resto con bulk_create.
+
+    Returns:
+        Cantidad de notificaciones creadas.
+    """
+    # Si una tarea aparece varias veces, vale el último evento
+    por_tarea = {aviso[0]: aviso for aviso in avisos}
+    limite = timezone.now() - timedelta(seconds=getattr(settings, 'NOTIFICACIONES_VENTANA_SEGUNDOS', 300))
+    tamano_tanda = getattr(settings, 'NOTIFICACIONES_LOTE', 500)
+
+    with transaction.atomic():
+        # Las filas que se van a juntar (usuario y leída, para los eventos y el contador
+        # de no leídas), en la misma consulta que dice qué tareas ya tienen avisos
+        agrupadas = list(
+            Notificacion.objects.filter(tarea_id__in=por_tarea, tipo=tipo, fecha_envio__gte=limite)
+            .only('pk', 'usuario_id', 'tarea_id', 'leida')
+        ) if agrupar else []
+        recientes = {notificacion.tarea_id for notificacion in agrupadas}
+        for tarea_id in recientes:
+            Notificacion.objects.filter(tarea_id=tarea_id, tipo=tipo, fecha_envio__gte=limite).update(
+                mensaje=por_tarea[tarea_id][2], leida=False
+            )
+        for notificacion in agrupadas:
+            notificacion.mensaje = por_tarea[notificacion.tarea_id][2]
+            notificacion.leida = False
+
+        nuevos = [aviso for tarea_id, aviso in por_tarea.items() if tarea_id not in recientes]
+        miembros = defaultdict(list)
+        if nuevos:
+            for grupo_id, user_id in PerfilUsuario.objects.filter(
+                grupo_id__in={aviso[1] for aviso in nuevos}
+            ).values_list('grupo_id', 'user_id'):
+                miembros[grupo_id].append(user_id)
+
+        filas = [
+            Notificacion(usuario_id=user_id, tarea_id=tarea_id, mensaje=mensaje, tipo=tipo)
+            for tarea_id, grupo_id, mensaje, excluir in nuevos
+            for user_id in miembros[grupo_id] if user_id != excluir
+        ]
+        Notificacion.objects.bulk_create(filas, batch_size=tamano_tanda)
+
+        # bulk_create/update() no disparan las señales: contadores, eventos y versión de
+        # los grupos a mano
+        ajustar_notificaciones(agrupadas)
+        ajustar_notificaciones(filas, creadas=True)
+        publicar_al_confirmar(
+            [evento_de_notificacion(notificacion, 'actualizada') for notificacion in agrupadas]
+            + [evento_de_notificacion(notificacion, 'creada') for notificacion in filas]
+        )
+        incrementar_version(*{clave_grupo(aviso[1]) for aviso in por_tarea.values()})
+
+    logger.info(f"{len(filas)} notificaciones creadas, {len(recientes)} tareas agrupadas")
+    return len(filas)
@@ -0,0 +1,49 @@
+from django.conf import settings
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+
+# Paginación por cursor de los viewsets de api.py.
+# A diferencia de ?page=N (OFFSET), el cursor guarda la posición en el orden del listado
+# y la página siguiente es un WHERE fecha < x ORDER BY fecha LIMIT n que resuelve un
+# índice: el costo no crece con la cantidad de filas ni con lo lejos que se navegue.
+# Cada orden lleva el id como desempate para que el recorrido sea estable.
+# ?ordering= solo permite invertir el orden (ej. ?ordering=fecha_creacion para los más
+# viejos primero): ordenar por cualquier otra columna necesitaría otro índice.
+
+
+class CursorPaginacion(CursorPagination):
+    """
+    Base: tamaño de página REST_FRAMEWORK['PAGE_SIZE'], ajustable con ?page_size=
+    hasta API_MAX_PAGE_SIZE.
+    """
+    ordering = ('-id',)
+    page_size_query_param = 'page_size'
+    max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 200)
+
+    def get_ordering(self, request, queryset, view):
+        pedido = request.query_params.get('ordering')
+        if not pedido:
+            return self.ordering
+
+        campos = [campo.lstrip('-') for campo in self.ordering]
+        if pedido == campos[0]:
+            return tuple(campos)
+        if pedido == f"-{campos[0]}":
+            return tuple(f"-{campo}" for campo in campos)
+        raise ValidationError({'ordering': f"Valores permitidos: {campos[0]}, -{campos[0]}"})
+
+
+class PaginacionPorFechaCreacion(CursorPaginacion):
+    ordering = ('-fecha_creacion', '-id')
+
+
+class PaginacionPorFechaSubida(CursorPaginacion):
+    ordering = ('-fecha_subida', '-id')
+
+
+class PaginacionPorFechaEnvio(CursorPaginacion):
+    ordering = ('-fecha_envio', '-id')
+
+
+class PaginacionPorUsername(CursorPaginacion):
+    ordering = ('username',)
@@ -0,0 +1,141 @@
+import logging
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import List
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Documento, Tarea, TrabajoProcesamiento
+
+# Cola de procesamiento de documentos guardada en la base de datos.
+# Cada Documento nuevo encola un TrabajoProcesamiento; el comando `procesar_documentos`
+# toma trabajos, extrae texto y candidatos en un pool de procesos (extraccion.py) y
+# aplica el resultado: crea la Tarea y marca el Documento como procesado.
+#
+# Un trabajo tomado queda 'en_proceso' hasta `disponible_desde` (timeout de visibilidad);
+# si el worker muere, vencido ese plazo otro worker lo retoma. Los fallos se reintentan
+# con espera exponencial hasta PROCESAMIENTO_MAX_INTENTOS.
+
+logger = logging.getLogger(__name__)
+
+
+def encolar_documento(documento_id: int) -> TrabajoProcesamiento:
+    return TrabajoProcesamiento.objects.create(documento_id=documento_id)
+
+
+def _disponibles(ahora):
+    """
+    Trabajos que se pueden tomar: pendientes cuya espera terminó o en proceso con el
+    timeout de visibilidad vencido.
+    """
+    return TrabajoProcesamiento.objects.filter(
+        estado__in=['pendiente', 'en_proceso'], disponible_desde__lte=ahora
+    )
+
+
+def reclamar_trabajos(limite: int, worker: str) -> List[TrabajoProcesamiento]:
+    """
+    Toma hasta `limite` trabajos para `worker` y los deja 'en_proceso'.
+
+    En PostgreSQL usa SELECT ... FOR UPDATE SKIP LOCKED: varios workers reclaman en
+    paralelo sin bloquearse ni tomar el mismo trabajo. En SQLite (sin SKIP LOCKED) cada
+    trabajo se toma con un UPDATE condicionado al número de intentos leído, que solo
+    gana un worker.
+    """
+    if limite <= 0:
+        return []
+
+    ahora = timezone.now()
+    max_intentos = getattr(settings, 'PROCESAMIENTO_MAX_INTENTOS', 3)
+    visibilidad = timedelta(seconds=getattr(settings, 'PROCESAMIENTO_VISIBILIDAD_SEGUNDOS', 300))
+    cambios = {
+        'estado': 'en_proceso',
+        'intentos': F('intentos') + 1,
+        'disponible_desde': ahora + visibilidad,
+        'worker': worker,
+    }
+
+    # Trabajos abandonados que ya agotaron sus intentos no se retoman
+    _disponibles(ahora).filter(estado='en_proceso', intentos__gte=max_intentos).update(
+        estado='fallido', error='Se agotó el tiempo de procesamiento'
+    )
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                _disponibles(ahora).select_for_update(skip_locked=True)
+                .order_by('disponible_desde').values_list('pk', flat=True)[:limite]
+            )
+            TrabajoProcesamiento.objects.filter(pk__in=ids).update(**cambios)
+    else:
+        ids = []
+        candidatos = _disponibles(ahora).order_by('disponible_desde').values_list('pk', 'intentos')[:limite * 2]
+        for pk, intentos in candidatos:
+            if len(ids) >= limite:
+                break
+            if _disponibles(ahora).filter(pk=pk, intentos=intentos).update(**cambios):
+                ids.append(pk)
+
+    return list(TrabajoProcesamiento.objects.filter(pk__in=ids).select_related('documento'))
+
+
+def completar_trabajo(trabajo: TrabajoProcesamiento, resultado: dict) -> bool:
+    """
+    Aplica el resultado de la extracción en una transacción: crea la Tarea (si hay
+    monto o vencimiento) y marca el Documento como procesado.
+
+    Returns:
+        False si el trabajo ya no es de este worker (venció y lo retomó otro).
+    """
+    with transaction.atomic():
+        vigente = TrabajoProcesamiento.objects.select_for_update().filter(
+            pk=trabajo.pk, estado='en_proceso', intentos=trabajo.intentos
+        ).exists()
+        if not vigente:
+            logger.warning(f"Trabajo {trabajo.pk} retomado por otro worker, se descarta el resultado")
+            return False
+
+        documento = Documento.objects.get(pk=trabajo.documento_id)
+        if resultado['monto'] or resultado['fecha_vencimiento']:
+            Tarea.objects.create(
+                grupo_id=documento.grupo_id,
+                documento=documento,
+                titulo=f"{'Pagar' if resultado['monto'] else 'Revisar'} {documento.nombre_archivo}"[:255],
+                descripcion=(
+                    f"Creada automáticamente al procesar '{documento.nombre_archivo}'.\n\n{resultado['texto']}"
+                ).strip(),
+                monto=Decimal(resultado['monto']) if resultado['monto'] else None,
+                fecha_vencimiento=(
+                    date.fromisoformat(resultado['fecha_vencimiento']) if resultado['fecha_vencimiento'] else None
+                ),
+                creado_por_id=documento.usuario_id,
+            )
+
+        documento.procesado = True
+        documento.save(update_fields=['procesado'])
+        TrabajoProcesamiento.objects.filter(pk=trabajo.pk).update(estado='completado', error='')
+
+    logger.info(f"Documento {documento.pk} procesado")
+    return True
+
+
+def fallar_trabajo(trabajo: TrabajoProcesamiento, error: str):
+    """
+    Registra un fallo: vuelve a 'pendiente' con espera exponencial o queda 'fallido'
+    si ya agotó los intentos.
+    """
+    max_intentos = getattr(settings, 'PROCESAMIENTO_MAX_INTENTOS', 3)
+    espera = getattr(settings, 'PROCESAMIENTO_REINTENTO_SEGUNDOS', 30) * 2 ** (trabajo.intentos - 1)
+    agotado = trabajo.intentos >= max_intentos
+
+    TrabajoProcesamiento.objects.filter(
+        pk=trabajo.pk, estado='en_proceso', intentos=trabajo.intentos
+    ).update(
+        estado='fallido' if agotado else 'pendiente',
+        disponible_desde=timezone.now() + timedelta(seconds=0 if agotado else espera),
+        error=error[:2000],
+    )
+    logger.error(f"Error procesando documento {trabajo.documento_id} (intento {trabajo.intentos}): {error}")
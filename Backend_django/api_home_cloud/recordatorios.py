@@ -0,0 +1,146 @@
+import logging
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import MarcaRecordatorio, Tarea
+from .notificaciones import notificar
+
+# Recordatorios de vencimiento de las Tareas abiertas (comando enviar_recordatorios).
+# Cada ventana (RECORDATORIOS_DIAS, por ejemplo 7, 1 y 0 días antes, más la de
+# vencidas) guarda en MarcaRecordatorio hasta qué fecha de vencimiento ya avisó. Una
+# corrida solo recorre el tramo nuevo de cada ventana, (hasta, hoy + días], con un rango
+# sobre el índice parcial tarea_abiertas_venc_idx: el costo depende de las tareas que
+# entran en la ventana, no del tamaño de la tabla. Si el comando estuvo parado, la
+# siguiente corrida recorre todo el tramo atrasado de una vez.
+#
+# Además se avisa de las tareas creadas o con vencimiento modificado desde la corrida
+# anterior cuyo vencimiento cae en un tramo que ya se había recorrido (rango sobre
+# fecha_cambio_vencimiento, que mantiene registrar_cambios_de_vencimiento()).
+# La primera corrida de una ventana solo avisa del día que entra, no de todo lo anterior.
+
+logger = logging.getLogger(__name__)
+
+VENCIDA = -1
+
+
+def ventanas() -> List[int]:
+    """
+    Días antes del vencimiento en los que se avisa, de la más cercana a la más lejana
+    (siempre incluye la de vencidas).
+    """
+    dias = getattr(settings, 'RECORDATORIOS_DIAS', '7,1,0')
+    return sorted({int(d) for d in str(dias).split(',') if d.strip()} | {VENCIDA})
+
+
+def enviar_recordatorios(hoy: Optional[date] = None) -> int:
+    """
+    Avisa de las tareas que entraron en alguna ventana desde la corrida anterior y
+    avanza las marcas. Todo en una transacción: si falla, la próxima corrida repite el
+    mismo tramo.
+
+    Returns:
+        Cantidad de tareas avisadas.
+    """
+    hoy = hoy or timezone.localdate()
+    ahora = timezone.now()
+    dias = ventanas()
+
+    # Una tarea que entra en varias ventanas en la misma corrida recibe un solo aviso:
+    # el de la más cercana (se recorren en ese orden)
+    avisadas: Set[int] = set()
+    nuevas_marcas = []
+    with transaction.atomic():
+        # FOR UPDATE: dos corridas a la vez no avisan dos veces el mismo tramo
+        marcas = {
+            marca.ventana: marca
+            for marca in MarcaRecordatorio.objects.select_for_update().filter(ventana__in=dias)
+        }
+        anterior = min((marca.fecha_ejecucion for marca in marcas.values()), default=None)
+
+        for ventana in dias:
+            objetivo = hoy + timedelta(days=ventana)
+            marca = marcas.get(ventana)
+            desde = marca.hasta if marca else objetivo - timedelta(days=1)
+            if objetivo > desde:
+                _avisar(_abiertas().filter(
+                    fecha_vencimiento__gt=desde, fecha_vencimiento__lte=objetivo
+                ), hoy, avisadas)
+            nuevas_marcas.append(
+                MarcaRecordatorio(ventana=ventana, hasta=max(objetivo, desde), fecha_ejecucion=ahora)
+            )
+
+        if anterior is not None:
+            _avisar(_abiertas().filter(
+                fecha_cambio_vencimiento__gte=anterior, fecha_vencimiento__lte=hoy + timedelta(days=dias[-1])
+            ), hoy, avisadas)
+
+        # Todas las marcas en un solo INSERT ... ON CONFLICT
+        MarcaRecordatorio.objects.bulk_create(
+            nuevas_marcas, update_conflicts=True, unique_fields=['ventana'],
+            update_fields=['hasta', 'fecha_ejecucion'],
+        )
+
+    logger.info(f"Recordatorios enviados para {len(avisadas)} tareas")
+    return len(avisadas)
+
+
+def registrar_cambios_de_vencimiento(tareas: Iterable[Tarea]):
+    """
+    Marca fecha_cambio_vencimiento en las tareas cuyo vencimiento cambió desde que se
+    cargaron, con un solo UPDATE: la próxima corrida las revisa aunque el vencimiento
+    nuevo caiga en un tramo ya recorrido.
+    """
+    cambiadas = []
+    for tarea in tareas:
+        # __dict__: un campo diferido que no se asignó no cambió
+        vencimiento = tarea.__dict__.get('fecha_vencimiento')
+        if vencimiento != getattr(tarea, '_vencimiento_original', vencimiento):
+            cambiadas.append(tarea)
+        tarea._vencimiento_original = vencimiento
+
+    if cambiadas:
+        ahora = timezone.now()
+        Tarea.objects.filter(pk__in=[tarea.pk for tarea in cambiadas]).update(fecha_cambio_vencimiento=ahora)
+        for tarea in cambiadas:
+            tarea.fecha_cambio_vencimiento = ahora
+
+
+def _abiertas():
+    return Tarea.objects.filter(estado__in=Tarea.ESTADOS_ABIERTOS)
+
+
+def _avisar(tareas, hoy: date, avisadas: Set[int]):
+    """
+    Notifica a los grupos de `tareas` por tandas de RECORDATORIOS_LOTE, sin cargar
+    todas en memoria.
+    """
+    tamano_tanda = getattr(settings, 'RECORDATORIOS_LOTE', 500)
+    tanda = []
+    filas = tareas.values_list('pk', 'grupo_id', 'titulo', 'fecha_vencimiento')
+    for pk, grupo_id, titulo, vencimiento in filas.iterator(chunk_size=tamano_tanda):
+        if pk in avisadas:
+            continue
+        avisadas.add(pk)
+        tanda.append((pk, grupo_id, mensaje_de_recordatorio(titulo, vencimiento, hoy), None))
+        if len(tanda) >= tamano_tanda:
+            notificar(tanda, agrupar=False, tipo='recordatorio')
+            tanda = []
+    if tanda:
+        notificar(tanda, agrupar=False, tipo='recordatorio')
+
+
+def mensaje_de_recordatorio(titulo: str, vencimiento: date, hoy: date) -> str:
+    faltan = (vencimiento - hoy).days
+    if faltan < 0:
+        mensaje = f"La tarea '{titulo}' venció el {vencimiento:%d/%m/%Y}"
+    elif faltan == 0:
+        mensaje = f"La tarea '{titulo}' vence hoy"
+    elif faltan == 1:
+        mensaje = f"La tarea '{titulo}' vence mañana"
+    else:
+        mensaje = f"La tarea '{titulo}' vence en {faltan} días ({vencimiento:%d/%m/%Y})"
+    return mensaje[:255]
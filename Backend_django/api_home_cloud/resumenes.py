@@ -0,0 +1,236 @@
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterable, Tuple
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import Notificacion, ResumenGrupo, ResumenUsuario, ResumenVencimiento, Tarea
+
+# Contadores del tablero (/api/tablero/): notificaciones sin leer de cada usuario, tareas
+# por estado de cada grupo y, por grupo y día de vencimiento, cantidad y monto de las
+# tareas abiertas. Las señales (signals.py) los ajustan con la diferencia entre lo que
+# aportaba el objeto al cargarse y lo que aporta después de guardarse o borrarse: el
+# tablero lee unas pocas filas por grupo, sin recorrer Tarea ni Notificacion.
+#
+# bulk_create/bulk_update/update() no disparan señales: quien los use llama a
+# ajustar_tareas() / ajustar_notificaciones() a mano. El comando reconciliar_resumenes
+# recalcula todo desde las tablas y corrige las diferencias (y carga los contadores la
+# primera vez, después de migrar).
+
+logger = logging.getLogger(__name__)
+
+CAMPO_POR_ESTADO = {
+    'pendiente': 'tareas_pendientes',
+    'en_progreso': 'tareas_en_progreso',
+    'completada': 'tareas_completadas',
+}
+
+CAMPOS_TAREA = ('grupo_id', 'estado', 'fecha_vencimiento', 'monto')
+CAMPOS_NOTIFICACION = ('usuario_id', 'leida')
+
+# Campo que no se cargó (.only()/.defer()) cuando se creó la instancia
+_DIFERIDO = object()
+
+
+def recordar_valores(instance, campos: Tuple[str, ...]):
+    # __dict__ y no el atributo: leer un campo diferido haría una consulta por objeto
+    instance._resumen_original = tuple(instance.__dict__.get(campo, _DIFERIDO) for campo in campos)
+
+
+def _valores_originales(instance, campos: Tuple[str, ...], borrada: bool):
+    originales = getattr(instance, '_resumen_original', None)
+    if originales is None:
+        return None
+    if _DIFERIDO in originales:
+        if borrada:
+            # Ya no está en la base para leer lo que falta: lo corrige la reconciliación
+            logger.warning(f"{type(instance).__name__} {instance.pk} borrada con campos diferidos, contadores sin ajustar")
+            return _DIFERIDO
+        # Un campo diferido que no se asignó no se guardó: vale lo que está en la base
+        originales = tuple(
+            getattr(instance, campo) if valor is _DIFERIDO else valor
+            for campo, valor in zip(campos, originales)
+        )
+    return originales
+
+
+def _aportes_tarea(valores, signo: int, por_grupo, por_vencimiento):
+    grupo_id, estado, fecha_vencimiento, monto = valores
+    campo = CAMPO_POR_ESTADO.get(estado)
+    if campo:
+        por_grupo[grupo_id][campo] += signo
+    if estado in Tarea.ESTADOS_ABIERTOS and fecha_vencimiento is not None:
+        aporte = por_vencimiento[(grupo_id, fecha_vencimiento)]
+        aporte['tareas'] += signo
+        # str(): una instancia creada en código puede traer el monto como float
+        aporte['monto'] += signo * Decimal(str(monto or 0))
+
+
+def ajustar_tareas(tareas: Iterable[Tarea], creadas: bool = False, borradas: bool = False):
+    """
+    Aplica a los contadores lo que cambió en `tareas` desde que se cargaron (todo su
+    aporte si son nuevas; restado si se borraron).
+    """
+    por_grupo = defaultdict(lambda: defaultdict(int))
+    por_vencimiento = defaultdict(lambda: {'tareas': 0, 'monto': Decimal('0')})
+    for tarea in tareas:
+        antes = None if creadas else _valores_originales(tarea, CAMPOS_TAREA, borradas)
+        if antes is _DIFERIDO:
+            continue
+        despues = None if borradas else tuple(getattr(tarea, campo) for campo in CAMPOS_TAREA)
+        if antes == despues:
+            continue
+        if antes is not None:
+            _aportes_tarea(antes, -1, por_grupo, por_vencimiento)
+        if despues is not None:
+            _aportes_tarea(despues, 1, por_grupo, por_vencimiento)
+        tarea._resumen_original = despues
+
+    _sumar(ResumenGrupo, ('grupo_id',), por_grupo)
+    _sumar(ResumenVencimiento, ('grupo_id', 'fecha_vencimiento'), por_vencimiento)
+
+
+def ajustar_notificaciones(notificaciones: Iterable[Notificacion], creadas: bool = False, borradas: bool = False):
+    """
+    Como ajustar_tareas() para el contador de no leídas de cada usuario.
+    """
+    por_usuario = defaultdict(lambda: defaultdict(int))
+    for notificacion in notificaciones:
+        antes = None if creadas else _valores_originales(notificacion, CAMPOS_NOTIFICACION, borradas)
+        if antes is _DIFERIDO:
+            continue
+        despues = None if borradas else (notificacion.usuario_id, notificacion.leida)
+        if antes == despues:
+            continue
+        if antes is not None and not antes[1]:
+            por_usuario[antes[0]]['notificaciones_no_leidas'] -= 1
+        if despues is not None and not despues[1]:
+            por_usuario[despues[0]]['notificaciones_no_leidas'] += 1
+        notificacion._resumen_original = despues
+
+    _sumar(ResumenUsuario, ('user_id',), por_usuario)
+
+
+def _sumar(modelo, campos_clave: Tuple[str, ...], deltas: Dict[object, Dict[str, object]]):
+    """
+    Suma `deltas` ({clave: {campo: delta}}) a las filas de `modelo` con UPDATE ... SET
+    campo = campo + delta: una consulta por cada combinación distinta de deltas (en un
+    aviso a todo un grupo, una sola para todos los usuarios), sin leer las filas.
+    Las filas que faltan se crean en cero y se suman después.
+    """
+    por_cambio = defaultdict(list)
+    for clave, cambios in deltas.items():
+        cambios = tuple(sorted((campo, delta) for campo, delta in cambios.items() if delta))
+        if cambios:
+            por_cambio[cambios].append(clave if len(campos_clave) > 1 else (clave,))
+
+    for cambios, claves in por_cambio.items():
+        actualizacion = {campo: F(campo) + delta for campo, delta in cambios}
+        actualizadas = modelo.objects.filter(_filtro(campos_clave, claves)).update(**actualizacion)
+        if actualizadas == len(claves) or all(delta < 0 for _, delta in cambios):
+            # Restar de una fila que no existe (por ejemplo en un borrado en cascada
+            # del grupo) no tiene sentido: la reconciliación la recalcula si hace falta
+            continue
+        existentes = set(modelo.objects.filter(_filtro(campos_clave, claves)).values_list(*campos_clave))
+        faltan = [clave for clave in claves if clave not in existentes]
+        if not faltan:
+            continue
+        # ignore_conflicts: si otra transacción la creó en paralelo, se suma sobre esa
+        modelo.objects.bulk_create(
+            [modelo(**dict(zip(campos_clave, clave))) for clave in faltan], ignore_conflicts=True
+        )
+        modelo.objects.filter(_filtro(campos_clave, faltan)).update(**actualizacion)
+
+
+def _filtro(campos_clave: Tuple[str, ...], claves) -> Q:
+    if len(campos_clave) == 1:
+        return Q(**{f"{campos_clave[0]}__in": [clave[0] for clave in claves]})
+    return reduce(or_, (Q(**dict(zip(campos_clave, clave))) for clave in claves))
+
+
+def reconciliar() -> Dict[str, int]:
+    """
+    Recalcula los contadores desde Tarea y Notificacion y corrige los que difieren.
+
+    Returns:
+        Cantidad de filas corregidas por modelo.
+    """
+    with transaction.atomic():
+        # Primero se bloquean los contadores: una escritura que llega mientras tanto
+        # espera, y su ajuste se aplica sobre el valor ya corregido
+        for modelo in (ResumenUsuario, ResumenGrupo, ResumenVencimiento):
+            list(modelo.objects.select_for_update().values_list('pk'))
+
+        no_leidas = {
+            (usuario_id,): {'notificaciones_no_leidas': cantidad}
+            for usuario_id, cantidad in Notificacion.objects.filter(leida=False)
+            .values('usuario_id').annotate(cantidad=Count('id')).values_list('usuario_id', 'cantidad')
+        }
+
+        por_grupo = defaultdict(lambda: {campo: 0 for campo in CAMPO_POR_ESTADO.values()})
+        for grupo_id, estado, cantidad in Tarea.objects.values('grupo_id', 'estado').annotate(
+            cantidad=Count('id')
+        ).values_list('grupo_id', 'estado', 'cantidad'):
+            if estado in CAMPO_POR_ESTADO:
+                por_grupo[(grupo_id,)][CAMPO_POR_ESTADO[estado]] = cantidad
+
+        por_vencimiento = {
+            (grupo_id, fecha): {'tareas': cantidad, 'monto': monto or Decimal('0')}
+            for grupo_id, fecha, cantidad, monto in Tarea.objects.filter(
+                estado__in=Tarea.ESTADOS_ABIERTOS, fecha_vencimiento__isnull=False
+            ).values('grupo_id', 'fecha_vencimiento').annotate(
+                cantidad=Count('id'), total=Sum('monto')
+            ).values_list('grupo_id', 'fecha_vencimiento', 'cantidad', 'total')
+        }
+
+        return {
+            'usuarios': _corregir(ResumenUsuario, ('user_id',), no_leidas),
+            'grupos': _corregir(ResumenGrupo, ('grupo_id',), por_grupo),
+            'vencimientos': _corregir(
+                ResumenVencimiento, ('grupo_id', 'fecha_vencimiento'), por_vencimiento, borrar_sobrantes=True
+            ),
+        }
+
+
+def _corregir(modelo, campos_clave: Tuple[str, ...], esperados: Dict[tuple, Dict[str, object]],
+              borrar_sobrantes: bool = False) -> int:
+    """
+    Deja las filas de `modelo` como `esperados`: upsert de las que difieren y las que
+    sobran en cero, o borradas con `borrar_sobrantes` (los días de vencimiento que ya
+    no tienen tareas abiertas).
+    """
+    campos = [campo.attname for campo in modelo._meta.concrete_fields if campo.attname not in campos_clave]
+    if modelo._meta.pk.attname not in campos_clave:
+        campos.remove(modelo._meta.pk.attname)
+
+    sobran, corregidas, vacias = [], [], []
+    for fila in modelo.objects.values(*campos_clave, 'pk', *campos):
+        clave = tuple(fila[campo] for campo in campos_clave)
+        esperado = esperados.pop(clave, None)
+        if esperado is None:
+            if any(fila[campo] for campo in campos):
+                sobran.append(fila['pk'])
+            elif borrar_sobrantes:
+                # Quedó en cero al cerrarse sus tareas: no es un desvío, solo se limpia
+                vacias.append(fila['pk'])
+        elif any(fila[campo] != esperado[campo] for campo in campos):
+            corregidas.append(modelo(**dict(zip(campos_clave, clave)), **esperado))
+    # Lo que queda no tenía fila
+    corregidas += [modelo(**dict(zip(campos_clave, clave)), **valores) for clave, valores in esperados.items()]
+
+    if borrar_sobrantes and (sobran or vacias):
+        modelo.objects.filter(pk__in=sobran + vacias).delete()
+    elif sobran:
+        modelo.objects.filter(pk__in=sobran).update(**{campo: 0 for campo in campos})
+    if corregidas:
+        modelo.objects.bulk_create(
+            corregidas, update_conflicts=True,
+            unique_fields=[campo.removesuffix('_id') for campo in campos_clave], update_fields=campos,
+        )
+    if sobran or corregidas:
+        logger.warning(f"{modelo.__name__}: {len(corregidas) + len(sobran)} filas con desvío corregidas")
+    return len(sobran) + len(corregidas)
@@ -1,9 +1,79 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import Grupo, PerfilUsuario, Documento, Tarea, Notificacion
+from django.db import transaction
+from .deduplicacion import bloquear_contenido
+from .models import Grupo, PerfilUsuario, Documento, Tarea, Notificacion, ContenidoBlob
 
 #convierte objetos Django a estructuras simples (diccionarios/JSON) para API y viceversa (decodificar JSON en datos Python para crear/actualizar modelos).
 
+def parametros_de_campos(request):
+    """
+    Lee ?fields=id,titulo (campos a devolver; vacío = todos) y ?expand=creado_por
+    (relaciones a devolver como objeto en lugar de id).
+    """
+    def lista(nombre):
+        valor = request.query_params.get(nombre, '') if request is not None else ''
+        return {campo.strip() for campo in valor.split(',') if campo.strip()}
+    return lista('fields'), lista('expand')
+
+
+class CamposDinamicosMixin:
+    """
+    Representación compacta: las relaciones de `expandibles` salen como id y solo se
+    anidan con ?expand=; ?fields= recorta los campos devueltos. Los viewsets usan los
+    campos resultantes para acotar el SELECT (ver api.py).
+    """
+    # nombre del campo -> serializer a usar cuando se pide expandirlo
+    expandibles = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        campos, expandir = parametros_de_campos(self.context.get('request'))
+        for nombre, serializer_class in self.expandibles.items():
+            if nombre in expandir and nombre in self.fields:
+                self.fields[nombre] = serializer_class(read_only=True)
+        if campos:
+            for nombre in set(self.fields) - campos:
+                self.fields.pop(nombre)
+
+
+class PrimaryKeyPrecargadoField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField que en un lote toma el objeto de los precargados por
+    ListaEnLoteSerializer: una consulta por campo en lugar de una por elemento.
+    """
+    def to_internal_value(self, data):
+        precargados = getattr(self.parent, '_precargados', {}).get(self.field_name, {})
+        if isinstance(data, int) and not isinstance(data, bool) and data in precargados:
+            return precargados[data]
+        return super().to_internal_value(data)
+
+
+class ListaEnLoteSerializer(serializers.ListSerializer):
+    """
+    many=True de los endpoints de lote (ver LoteMixin en api.py). Para modificar, la
+    vista pasa como instance un dict id -> instancia y cada elemento se valida contra
+    la suya. No escribe: la vista guarda con bulk_create/bulk_update.
+    """
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child._precargados = {
+                nombre: campo.get_queryset().in_bulk({
+                    elemento[nombre] for elemento in data
+                    if isinstance(elemento, dict) and type(elemento.get(nombre)) is int
+                })
+                for nombre, campo in self.child.fields.items()
+                if isinstance(campo, PrimaryKeyPrecargadoField) and not campo.read_only
+            }
+        return super().to_internal_value(data)
+
+    def run_child_validation(self, data):
+        if isinstance(self.instance, dict):
+            self.child.instance = self.instance.get(data.get('id'))
+            self.child.initial_data = data
+        return super().run_child_validation(data)
+
+
 # Serializer del usuario base (de Django)
 class UsuarioSerializer(serializers.ModelSerializer):
     class Meta:
@@ -31,27 +101,69 @@ class PerfilUsuarioSerializer(serializers.ModelSerializer):
 
 
 # Documento
-class DocumentoSerializer(serializers.ModelSerializer):
-    usuario = UsuarioSerializer(read_only=True)
+class DocumentoSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    usuario = serializers.PrimaryKeyRelatedField(read_only=True)
     grupo = serializers.PrimaryKeyRelatedField(queryset=Grupo.objects.all())
+    # Contenido deduplicado: se referencia por su hash en lugar de por URL
+    sha256 = serializers.SlugRelatedField(
+        source='contenido', slug_field='sha256', queryset=ContenidoBlob.objects.all(),
+        allow_null=True, required=False
+    )
+
+    expandibles = {'usuario': UsuarioSerializer}
 
     class Meta:
         model = Documento
         fields = [
-            'id', 'grupo', 'usuario', 'nombre_archivo', 'url_archivo',
-            'tipo_documento', 'fecha_subida', 'procesado'
+            'id', 'grupo', 'usuario', 'nombre_archivo', 'url_archivo', 'blob_name',
+            'sha256', 'tipo_documento', 'fecha_subida', 'procesado',
+            'url_miniatura', 'url_vista_previa'
         ]
-        read_only_fields = ['id', 'fecha_subida', 'procesado']
+        read_only_fields = [
+            'id', 'blob_name', 'fecha_subida', 'procesado', 'url_miniatura', 'url_vista_previa'
+        ]
+        extra_kwargs = {'url_archivo': {'required': False}}
+
+    def validate(self, attrs):
+        contenido = attrs.get('contenido')
+        if contenido is not None:
+            # La URL y el blob salen del contenido, no de lo que mande el cliente
+            attrs['url_archivo'] = contenido.url_archivo
+            attrs['blob_name'] = contenido.blob_name
+        elif not self.partial and not attrs.get('url_archivo') and not getattr(self.instance, 'url_archivo', None):
+            raise serializers.ValidationError({'url_archivo': 'Se requiere url_archivo o sha256.'})
+        return attrs
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            self._bloquear_contenido(validated_data)
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            self._bloquear_contenido(validated_data)
+            return super().update(instance, validated_data)
+
+    def _bloquear_contenido(self, validated_data):
+        # Entre validate() y el guardado otro Documento pudo soltar la última referencia:
+        # con la fila bloqueada, la referencia se suma (señal post_save) en esta transacción
+        contenido = validated_data.get('contenido')
+        if contenido is not None and bloquear_contenido(contenido.pk) is None:
+            raise serializers.ValidationError(
+                {'sha256': 'El contenido ya no está almacenado, hay que volver a subirlo.'}
+            )
 
 
 # Tarea
-class TareaSerializer(serializers.ModelSerializer):
-    creado_por = UsuarioSerializer(read_only=True)
-    asignado_a = UsuarioSerializer(read_only=True)
-    documento = serializers.PrimaryKeyRelatedField(
+class TareaSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    creado_por = serializers.PrimaryKeyRelatedField(read_only=True)
+    asignado_a = serializers.PrimaryKeyRelatedField(read_only=True)
+    documento = PrimaryKeyPrecargadoField(
         queryset=Documento.objects.all(), allow_null=True, required=False
     )
-    grupo = serializers.PrimaryKeyRelatedField(queryset=Grupo.objects.all())
+    grupo = PrimaryKeyPrecargadoField(queryset=Grupo.objects.all())
+
+    expandibles = {'creado_por': UsuarioSerializer, 'asignado_a': UsuarioSerializer}
 
     class Meta:
         model = Tarea
@@ -61,14 +173,18 @@ class TareaSerializer(serializers.ModelSerializer):
             'asignado_a', 'fecha_creacion'
         ]
         read_only_fields = ['id', 'fecha_creacion']
+        list_serializer_class = ListaEnLoteSerializer
 
 
 # Notificación
-class NotificacionSerializer(serializers.ModelSerializer):
-    usuario = UsuarioSerializer(read_only=True)
-    tarea = serializers.PrimaryKeyRelatedField(queryset=Tarea.objects.all())
+class NotificacionSerializer(CamposDinamicosMixin, serializers.ModelSerializer):
+    usuario = serializers.PrimaryKeyRelatedField(read_only=True)
+    tarea = PrimaryKeyPrecargadoField(queryset=Tarea.objects.all())
+
+    expandibles = {'usuario': UsuarioSerializer}
 
     class Meta:
         model = Notificacion
-        fields = ['id', 'usuario', 'tarea', 'mensaje', 'fecha_envio', 'leida']
-        read_only_fields = ['id', 'fecha_envio']
+        fields = ['id', 'usuario', 'tarea', 'mensaje', 'tipo', 'fecha_envio', 'leida']
+        read_only_fields = ['id', 'tipo', 'fecha_envio']
+        list_serializer_class = ListaEnLoteSerializer
@@ -0,0 +1,169 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .deduplicacion import restar_referencia, sumar_referencia
+from .derivados import borrar_derivados, programar_derivados
+from .eventos import evento_de_notificacion, evento_de_tarea, publicar_al_confirmar
+from .notificaciones import programar_notificaciones
+from .procesamiento import encolar_documento
+from .recordatorios import registrar_cambios_de_vencimiento
+from .resumenes import CAMPOS_NOTIFICACION, CAMPOS_TAREA, ajustar_notificaciones, ajustar_tareas, recordar_valores
+from .versiones import CLAVE_USUARIOS, clave_grupo, en_lote, incrementar_version
+from .models import Documento, Grupo, Notificacion, PerfilUsuario, Tarea
+
+# Señales del modelo: mantienen datos derivados (contadores, etc.) al guardar/borrar.
+
+
+# Documento -> contador de referencias de ContenidoBlob
+@receiver(post_init, sender=Documento)
+def recordar_contenido_original(sender, instance, **kwargs):
+    instance._contenido_id_original = instance.contenido_id
+
+
+@receiver(post_save, sender=Documento)
+def actualizar_referencias_contenido(sender, instance, created, **kwargs):
+    anterior = None if created else instance._contenido_id_original
+    if instance.contenido_id != anterior:
+        if instance.contenido_id:
+            sumar_referencia(instance.contenido_id)
+        if anterior:
+            restar_referencia(anterior)
+    instance._contenido_id_original = instance.contenido_id
+
+
+# Documento nuevo -> miniatura y vista previa en segundo plano
+@receiver(post_save, sender=Documento)
+def encolar_derivados(sender, instance, created, **kwargs):
+    if created and instance.blob_name:
+        programar_derivados(instance.pk)
+
+
+# Documento nuevo -> trabajo en la cola de procesamiento (extracción de monto/vencimiento)
+@receiver(post_save, sender=Documento)
+def encolar_procesamiento(sender, instance, created, **kwargs):
+    if created and instance.blob_name and not instance.procesado:
+        encolar_documento(instance.pk)
+
+
+@receiver(post_delete, sender=Documento)
+def liberar_contenido(sender, instance, **kwargs):
+    if instance.contenido_id:
+        # Los derivados del contenido compartido se borran junto con su blob
+        restar_referencia(instance.contenido_id)
+    elif instance.blob_name and not Documento.objects.filter(blob_name=instance.blob_name).exists():
+        # Sin deduplicación los derivados se generaron para este Documento
+        blob_name = instance.blob_name
+        transaction.on_commit(lambda: borrar_derivados(blob_name))
+
+
+
+# Cambios visibles en la API -> versión del grupo (ETag de los viewsets, ver versiones.py)
+def _grupo_de(instance):
+    if isinstance(instance, Grupo):
+        return instance.pk
+    if isinstance(instance, Notificacion):
+        return Tarea.objects.filter(pk=instance.tarea_id).values_list('grupo_id', flat=True).first()
+    return instance.grupo_id
+
+
+@receiver(post_init, sender=PerfilUsuario)
+@receiver(post_init, sender=Documento)
+@receiver(post_init, sender=Tarea)
+def recordar_grupo_original(sender, instance, **kwargs):
+    # __dict__ y no el atributo: con .only() el campo puede estar diferido
+    instance._grupo_id_original = instance.__dict__.get('grupo_id')
+
+
+@receiver(post_save, sender=Grupo)
+@receiver(post_save, sender=PerfilUsuario)
+@receiver(post_save, sender=Documento)
+@receiver(post_save, sender=Tarea)
+@receiver(post_save, sender=Notificacion)
+@receiver(post_delete, sender=Grupo)
+@receiver(post_delete, sender=PerfilUsuario)
+@receiver(post_delete, sender=Documento)
+@receiver(post_delete, sender=Tarea)
+@receiver(post_delete, sender=Notificacion)
+def incrementar_version_del_grupo(sender, instance, **kwargs):
+    if en_lote():
+        return
+    # Si cambió de grupo, cambian los datos de los dos
+    grupos = {_grupo_de(instance), getattr(instance, '_grupo_id_original', None)}
+    incrementar_version(*(clave_grupo(grupo_id) for grupo_id in grupos if grupo_id is not None))
+    if hasattr(instance, '_grupo_id_original'):
+        instance._grupo_id_original = instance.grupo_id
+
+
+# Tarea / Notificacion -> stream de eventos (/api/eventos/), al confirmarse la transacción
+@receiver(post_save, sender=Tarea)
+@receiver(post_delete, sender=Tarea)
+def publicar_evento_de_tarea(sender, instance, created=False, **kwargs):
+    accion = 'borrada' if kwargs['signal'] is post_delete else 'creada' if created else 'actualizada'
+    publicar_al_confirmar([evento_de_tarea(instance, accion)])
+
+
+@receiver(post_save, sender=Notificacion)
+@receiver(post_delete, sender=Notificacion)
+def publicar_evento_de_notificacion(sender, instance, created=False, **kwargs):
+    accion = 'borrada' if kwargs['signal'] is post_delete else 'creada' if created else 'actualizada'
+    publicar_al_confirmar([evento_de_notificacion(instance, accion)])
+
+
+# Tarea nueva o que cambia de estado -> notificaciones a los miembros del grupo
+@receiver(post_init, sender=Tarea)
+def recordar_estado_original(sender, instance, **kwargs):
+    instance._estado_original = instance.__dict__.get('estado')
+
+
+@receiver(post_save, sender=Tarea)
+def notificar_cambios_de_tarea(sender, instance, created, **kwargs):
+    programar_notificaciones([instance], creadas=created)
+
+
+# Tarea con otro vencimiento -> recordatorios (ver recordatorios.py)
+@receiver(post_init, sender=Tarea)
+def recordar_vencimiento_original(sender, instance, **kwargs):
+    instance._vencimiento_original = instance.__dict__.get('fecha_vencimiento')
+
+
+@receiver(post_save, sender=Tarea)
+def registrar_cambio_de_vencimiento(sender, instance, created, **kwargs):
+    # Al crearla, fecha_cambio_vencimiento ya es la del alta
+    if created:
+        instance._vencimiento_original = instance.fecha_vencimiento
+    else:
+        registrar_cambios_de_vencimiento([instance])
+
+
+# Tarea / Notificacion -> contadores del tablero (ver resumenes.py)
+@receiver(post_init, sender=Tarea)
+def recordar_resumen_de_tarea(sender, instance, **kwargs):
+    recordar_valores(instance, CAMPOS_TAREA)
+
+
+@receiver(post_init, sender=Notificacion)
+def recordar_resumen_de_notificacion(sender, instance, **kwargs):
+    recordar_valores(instance, CAMPOS_NOTIFICACION)
+
+
+@receiver(post_save, sender=Tarea)
+@receiver(post_delete, sender=Tarea)
+def ajustar_resumen_de_tarea(sender, instance, created=False, **kwargs):
+    ajustar_tareas([instance], creadas=created, borradas=kwargs['signal'] is post_delete)
+
+
+@receiver(post_save, sender=Notificacion)
+@receiver(post_delete, sender=Notificacion)
+def ajustar_resumen_de_notificacion(sender, instance, created=False, **kwargs):
+    ajustar_notificaciones([instance], creadas=created, borradas=kwargs['signal'] is post_delete)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def incrementar_version_de_usuarios(sender, instance, **kwargs):
+    # El login solo actualiza last_login, que la API no muestra
+    if kwargs.get('update_fields') == frozenset({'last_login'}):
+        return
+    incrementar_version(CLAVE_USUARIOS)
@@ -0,0 +1,122 @@
+import functools
+from typing import BinaryIO, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.module_loading import import_string
+
+# Backends de almacenamiento intercambiables.
+# settings.STORAGE_BACKEND elige la implementación ('azure', 'local' o la ruta a una
+# instancia) y el resto del código habla solo con esta interfaz mediante
+# get_storage_backend(), sin saber si los bytes van a Azure o al disco local.
+
+BACKEND_ALIASES = {
+    'azure': 'api_home_cloud.azure_storage.azure_storage',
+    'local': 'api_home_cloud.local_storage.local_storage',
+}
+
+
+class StorageBackend:
+    """
+    Interfaz común de los backends de almacenamiento.
+
+    Todas las operaciones devuelven None/False/[] ante un error (y lo registran en el log)
+    en lugar de lanzar excepciones, igual que el servicio original de Azure.
+    """
+    # Nombre corto para mostrar en /api/azure/status/
+    name = 'base'
+
+    @property
+    def is_configured(self) -> bool:
+        """True si el backend está listo para usarse."""
+        raise NotImplementedError
+
+    def upload_file(self, file_obj: BinaryIO, blob_name: str, content_type: str = None) -> Optional[str]:
+        """Guarda un stream bajo `blob_name` (reemplazando) y devuelve su URL."""
+        raise NotImplementedError
+
+    def stage_block(self, blob_name: str, block_id: str, data: bytes) -> bool:
+        """Guarda un bloque sin confirmar para `blob_name`."""
+        raise NotImplementedError
+
+    def commit_blocks(self, blob_name: str, block_ids: List[str], content_type: str = None) -> Optional[str]:
+        """Arma `blob_name` con los bloques indicados, en orden, y devuelve su URL."""
+        raise NotImplementedError
+
+    def get_file_properties(self, blob_name: str) -> Optional[dict]:
+        """Devuelve 'size', 'content_type', 'etag' y 'last_modified' del archivo."""
+        raise NotImplementedError
+
+    def stream_file(self, blob_name: str, offset: Optional[int] = None, length: Optional[int] = None) -> Optional[dict]:
+        """
+        Abre una descarga en streaming. Devuelve 'chunks' (iterable de bytes) y 'size';
+        puede incluir 'file' con un archivo real para servirlo con sendfile.
+        """
+        raise NotImplementedError
+
+    def download_file(self, blob_name: str) -> Optional[bytes]:
+        """Devuelve el contenido completo en memoria (solo para archivos chicos)."""
+        raise NotImplementedError
+
+    def delete_file(self, blob_name: str) -> bool:
+        raise NotImplementedError
+
+    def list_files(self, prefix: str = "") -> List[dict]:
+        raise NotImplementedError
+
+    def list_files_page(self, prefix: str = "", page_size: Optional[int] = None,
+                        continuation_token: Optional[str] = None) -> Optional[dict]:
+        """Devuelve 'files' y 'continuation_token' (None en la última página)."""
+        raise NotImplementedError
+
+    def get_file_url(self, blob_name: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def generate_upload_url(self, blob_name: str, expires_in: Optional[int] = None) -> Optional[dict]:
+        """URL firmada y temporal para subir `blob_name` sin pasar por las vistas de subida."""
+        raise NotImplementedError
+
+
+class SyncToAsyncBackend:
+    """
+    Adapta un backend síncrono a la interfaz de AsyncAzureStorageService, ejecutando
+    cada operación en un hilo. Lo usan las vistas async cuando el backend no es Azure.
+    """
+    def __init__(self, backend: StorageBackend):
+        self._backend = backend
+
+    @property
+    def is_configured(self) -> bool:
+        return self._backend.is_configured
+
+    def get_file_url(self, blob_name: str) -> Optional[str]:
+        return self._backend.get_file_url(blob_name)
+
+    def __getattr__(self, name):
+        return sync_to_async(getattr(self._backend, name))
+
+
+@functools.lru_cache(maxsize=None)
+def get_storage_backend() -> StorageBackend:
+    """
+    Devuelve la instancia del backend configurado en settings.STORAGE_BACKEND.
+    """
+    path = getattr(settings, 'STORAGE_BACKEND', 'azure')
+    return import_string(BACKEND_ALIASES.get(path, path))
+
+
+def get_async_storage_backend(request=None):
+    """
+    Backend para las vistas async: el cliente aio nativo si se usa Azure bajo ASGI; en
+    cualquier otro caso, el mismo backend síncrono ejecutado en hilos.
+
+    Con WSGI (o runserver) cada vista async corre en un event loop nuevo que se cierra
+    al terminar el request: un cliente aio por loop dejaría abierta una sesión aiohttp
+    por request, mientras que el servicio síncrono reutiliza su pool de conexiones.
+    """
+    backend = get_storage_backend()
+    if backend.name == 'azure' and isinstance(request, ASGIRequest):
+        from .azure_storage_aio import async_azure_storage
+        return async_azure_storage
+    return SyncToAsyncBackend(backend)
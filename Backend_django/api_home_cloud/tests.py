@@ -1,3 +1,671 @@
-from django.test import TestCase
+import base64
+import io
+import os
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta, timezone
+from unittest import mock
+from urllib.parse import parse_qs
 
-# Create your tests here.
+from django.core import signing
+from django.core.management import call_command
+from django.contrib.auth.models import User
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.exceptions import ValidationError
+
+from .azure_storage import sign_upload_sas
+from .deduplicacion import guardar_contenido, recolectar_huerfanos
+from .local_storage import UPLOAD_SIGNING_SALT, LocalStorageBackend, verify_upload_token
+from .models import ContadorVersion, ContenidoBlob, Documento, Grupo, Notificacion, PerfilUsuario, Tarea
+from .notificaciones import notificar
+from .recordatorios import enviar_recordatorios
+from .serializers import DocumentoSerializer
+from .storage_backends import get_storage_backend
+
+
+class AlmacenamientoLocalMixin:
+    """
+    Backend local sobre un directorio temporal propio de cada test: sin red ni Azure.
+    """
+    def setUp(self):
+        super().setUp()
+        self.raiz = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.raiz, ignore_errors=True)
+
+        ajustes = override_settings(
+            STORAGE_BACKEND='local', LOCAL_STORAGE_ROOT=self.raiz, LOCAL_STORAGE_BASE_URL='http://localhost:8000'
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        # La instancia del módulo leyó LOCAL_STORAGE_ROOT al importarse
+        self.storage = LocalStorageBackend()
+        reemplazo = mock.patch('api_home_cloud.local_storage.local_storage', self.storage)
+        reemplazo.start()
+        self.addCleanup(reemplazo.stop)
+        get_storage_backend.cache_clear()
+        self.addCleanup(get_storage_backend.cache_clear)
+
+    def guardar(self, blob_name, contenido):
+        with tempfile.TemporaryFile() as archivo:
+            archivo.write(contenido)
+            self.assertIsNotNone(self.storage.upload_file(archivo, blob_name))
+
+
+def _contenido(response):
+    try:
+        return b''.join(response.streaming_content)
+    finally:
+        response.close()
+
+
+class DescargaTests(AlmacenamientoLocalMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.guardar('docs/factura.txt', b'0123456789')
+        self.url = reverse('azure_download_file', args=['docs/factura.txt'])
+        self.propiedades = self.storage.get_file_properties('docs/factura.txt')
+
+    def test_completa_con_validadores(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_contenido(response), b'0123456789')
+        self.assertEqual(response['Content-Length'], '10')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['ETag'], self.propiedades['etag'])
+        self.assertEqual(response['Last-Modified'], http_date(self.propiedades['last_modified'].timestamp()))
+        self.assertFalse(response.has_header('Content-Range'))
+
+    def test_rango(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(_contenido(response), b'2345')
+        self.assertEqual(response['Content-Length'], '4')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(response['ETag'], self.propiedades['etag'])
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_rango_sufijo(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-3')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(_contenido(response), b'789')
+        self.assertEqual(response['Content-Range'], 'bytes 7-9/10')
+
+    def test_rango_no_satisfacible(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=20-')
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_rangos_multiples(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-1,4-5')
+
+        self.assertEqual(response.status_code, 416)
+
+    def test_if_range_con_etag_vigente(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE=self.propiedades['etag'])
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(_contenido(response), b'2345')
+
+    def test_if_range_con_etag_distinto(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"otro"')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_contenido(response), b'0123456789')
+        self.assertEqual(response['ETag'], self.propiedades['etag'])
+
+    def test_if_range_con_etag_debil(self):
+        response = self.client.get(
+            self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE=f"W/{self.propiedades['etag']}"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        _contenido(response)
+
+    def test_if_range_con_fecha(self):
+        fecha = http_date(self.propiedades['last_modified'].timestamp())
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE=fecha)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(_contenido(response), b'2345')
+
+        anterior = http_date(self.propiedades['last_modified'].timestamp() - 60)
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE=anterior)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_contenido(response), b'0123456789')
+
+    def test_inexistente(self):
+        response = self.client.get(reverse('azure_download_file', args=['docs/no-existe.txt']))
+
+        self.assertEqual(response.status_code, 404)
+
+
+class BorradoCsrfTests(AlmacenamientoLocalMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = Client(enforce_csrf_checks=True)
+        self.guardar('a.txt', b'a')
+
+    def test_sin_token_se_rechaza_en_las_dos_rutas(self):
+        for nombre in ('azure_delete_file', 'azure_async_delete_file'):
+            with self.subTest(ruta=nombre):
+                response = self.client.delete(reverse(nombre, args=['a.txt']))
+                self.assertEqual(response.status_code, 403)
+        self.assertIsNotNone(self.storage.get_file_properties('a.txt'))
+
+
+class LocalStorageBackendTests(AlmacenamientoLocalMixin, TestCase):
+    def test_subida_y_lectura(self):
+        self.guardar('carpeta/a.txt', b'hola')
+
+        self.assertEqual(self.storage.download_file('carpeta/a.txt'), b'hola')
+        propiedades = self.storage.get_file_properties('carpeta/a.txt')
+        self.assertEqual(propiedades['size'], 4)
+        self.assertEqual(propiedades['content_type'], 'text/plain')
+
+    def test_path_rechaza_nombres_fuera_de_la_raiz(self):
+        for nombre in ('../fuera.txt', 'a/../../fuera.txt', '/etc/passwd', ''):
+            with self.subTest(nombre=nombre):
+                with self.assertRaises(ValueError):
+                    self.storage._path(nombre)
+        self.assertIsNone(self.storage.upload_file(io.BytesIO(b'x'), '../fuera.txt'))
+        self.assertIsNone(self.storage.get_file_properties('../fuera.txt'))
+        self.assertFalse(os.path.exists(os.path.join(os.path.dirname(self.raiz), 'fuera.txt')))
+
+    def test_write_atomic_no_deja_restos_si_falla(self):
+        self.guardar('a.txt', b'original')
+
+        def bloques():
+            yield b'parcial'
+            raise OSError('disco lleno')
+
+        with self.assertRaises(OSError):
+            self.storage._write_atomic(self.storage._path('a.txt'), bloques())
+
+        # El archivo anterior sigue entero y no queda ningún temporal
+        self.assertEqual(self.storage.download_file('a.txt'), b'original')
+        self.assertEqual(os.listdir(self.raiz), ['a.txt'])
+
+    def test_range_file_no_pasa_del_tramo(self):
+        self.guardar('a.txt', b'0123456789')
+        descarga = self.storage.stream_file('a.txt', offset=3, length=4)
+        archivo = descarga['file']
+        try:
+            self.assertEqual(descarga['size'], 4)
+            self.assertEqual(archivo.read(2), b'34')
+            self.assertEqual(archivo.read(100), b'56')
+            self.assertEqual(archivo.read(), b'')
+        finally:
+            archivo.close()
+
+    def test_range_file_iterado_en_bloques(self):
+        self.guardar('a.txt', b'0123456789')
+        self.storage.chunk_size = 3
+        descarga = self.storage.stream_file('a.txt', offset=2)
+        try:
+            self.assertEqual(list(descarga['chunks']), [b'234', b'567', b'89'])
+        finally:
+            descarga['file'].close()
+
+    def test_range_file_largo_mayor_que_el_archivo(self):
+        self.guardar('a.txt', b'0123456789')
+        descarga = self.storage.stream_file('a.txt', offset=8, length=50)
+        try:
+            self.assertEqual(descarga['size'], 2)
+            self.assertEqual(b''.join(descarga['chunks']), b'89')
+        finally:
+            descarga['file'].close()
+
+    def test_bloques_en_orden_de_confirmacion(self):
+        self.assertTrue(self.storage.stage_block('grande.bin', 'Yg==', b'BB'))
+        self.assertTrue(self.storage.stage_block('grande.bin', 'YQ+/', b'AA'))
+        # Reenviar un bloque lo reemplaza
+        self.assertTrue(self.storage.stage_block('grande.bin', 'Yg==', b'bb'))
+        # Los bloques sin confirmar no aparecen en el listado
+        self.assertEqual(self.storage.list_files(), [])
+
+        url = self.storage.commit_blocks('grande.bin', ['YQ+/', 'Yg=='])
+
+        self.assertTrue(url.endswith('/grande.bin/download/'))
+        self.assertEqual(self.storage.download_file('grande.bin'), b'AAbb')
+        self.assertFalse(self.storage._blocks_dir('grande.bin').exists())
+        self.assertEqual([f['name'] for f in self.storage.list_files()], ['grande.bin'])
+
+    def test_confirmar_con_un_bloque_faltante_falla(self):
+        self.storage.stage_block('grande.bin', 'YQ==', b'AA')
+
+        self.assertIsNone(self.storage.commit_blocks('grande.bin', ['YQ==', 'Yg==']))
+        self.assertIsNone(self.storage.get_file_properties('grande.bin'))
+
+    def test_listado_paginado(self):
+        for nombre in ('b.txt', 'a.txt', 'c/d.txt'):
+            self.guardar(nombre, b'x')
+
+        pagina = self.storage.list_files_page(page_size=2)
+        self.assertEqual([f['name'] for f in pagina['files']], ['a.txt', 'b.txt'])
+        pagina = self.storage.list_files_page(page_size=2, continuation_token=pagina['continuation_token'])
+        self.assertEqual([f['name'] for f in pagina['files']], ['c/d.txt'])
+        self.assertIsNone(pagina['continuation_token'])
+
+    def test_borrado(self):
+        self.guardar('a.txt', b'x')
+
+        self.assertTrue(self.storage.delete_file('a.txt'))
+        self.assertFalse(self.storage.delete_file('a.txt'))
+        self.assertIsNone(self.storage.stream_file('a.txt'))
+
+
+
+class FirmaDeSubidaTests(AlmacenamientoLocalMixin, TestCase):
+    def _token(self, url):
+        return url.rstrip('/').rsplit('/', 1)[-1]
+
+    def test_url_firmada_valida(self):
+        antes = datetime.now(timezone.utc)
+        firmada = self.storage.generate_upload_url('docs/a.pdf', expires_in=60)
+
+        self.assertTrue(firmada['url'].startswith('http://localhost:8000/api/azure/direct-uploads/local/'))
+        self.assertAlmostEqual((firmada['expires_at'] - antes).total_seconds(), 60, delta=5)
+        self.assertEqual(verify_upload_token(self._token(firmada['url'])), 'docs/a.pdf')
+
+    def test_token_vencido(self):
+        vencido = int((datetime.now(timezone.utc) - timedelta(seconds=1)).timestamp())
+        token = signing.dumps({'blob_name': 'docs/a.pdf', 'exp': vencido}, salt=UPLOAD_SIGNING_SALT)
+
+        self.assertIsNone(verify_upload_token(token))
+
+    def test_token_vence_despues_de_expires_in(self):
+        token = self._token(self.storage.generate_upload_url('docs/a.pdf', expires_in=60)['url'])
+        despues = datetime.now(timezone.utc) + timedelta(seconds=120)
+
+        with mock.patch('api_home_cloud.local_storage.datetime') as reloj:
+            reloj.now.return_value = despues
+            self.assertIsNone(verify_upload_token(token))
+
+    def test_token_alterado(self):
+        token = self._token(self.storage.generate_upload_url('docs/a.pdf')['url'])
+        alterado = token[:-1] + ('A' if token[-1] != 'A' else 'B')
+
+        self.assertIsNone(verify_upload_token(alterado))
+        self.assertIsNone(verify_upload_token('no-es-un-token'))
+
+    def test_no_sirve_para_otro_blob(self):
+        # Cambiar el blob_name del contenido invalida la firma
+        token = self._token(self.storage.generate_upload_url('docs/a.pdf')['url'])
+        firma = token.rsplit(':', 1)[-1]
+        otro = signing.dumps({'blob_name': 'docs/otro.pdf', 'exp': 2**40}, salt=UPLOAD_SIGNING_SALT)
+        falsificado = f"{otro.rsplit(':', 1)[0]}:{firma}"
+
+        self.assertIsNone(verify_upload_token(falsificado))
+
+    def test_firma_con_otro_salt_no_sirve(self):
+        token = signing.dumps({'blob_name': 'docs/a.pdf', 'exp': 2**40})
+
+        self.assertIsNone(verify_upload_token(token))
+
+
+class SasDeSubidaTests(TestCase):
+    CLAVE = base64.b64encode(b'clave-de-prueba').decode()
+
+    def _sas(self, blob_name='docs/a.pdf', clave=None, vence=None):
+        vence = vence or datetime(2030, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        return parse_qs(sign_upload_sas('cuenta', clave or self.CLAVE, 'files', blob_name, vence))
+
+    def test_parametros(self):
+        sas = self._sas()
+
+        self.assertEqual(sas['sp'], ['cw'])
+        self.assertEqual(sas['sr'], ['b'])
+        self.assertEqual(sas['se'], ['2030-01-02T03:04:05Z'])
+        self.assertIn('sig', sas)
+
+    def test_firma_determinista_y_ligada_al_blob_y_la_clave(self):
+        self.assertEqual(self._sas()['sig'], self._sas()['sig'])
+        self.assertNotEqual(self._sas()['sig'], self._sas(blob_name='docs/otro.pdf')['sig'])
+        self.assertNotEqual(
+            self._sas()['sig'], self._sas(clave=base64.b64encode(b'otra-clave').decode())['sig']
+        )
+        self.assertNotEqual(
+            self._sas()['sig'], self._sas(vence=datetime(2031, 1, 1, tzinfo=timezone.utc))['sig']
+        )
+
+
+
+class VistasConAlmacenamientoLocalTests(AlmacenamientoLocalMixin, TestCase):
+    def _subir(self, blob_name, contenido, ruta='azure_upload_file'):
+        archivo = io.BytesIO(contenido)
+        archivo.name = os.path.basename(blob_name)
+        return self.client.post(reverse(ruta), {'file': archivo, 'blob_name': blob_name})
+
+    def test_estado(self):
+        datos = self.client.get(reverse('azure_status')).json()
+
+        self.assertEqual(datos['backend'], 'local')
+        self.assertTrue(datos['storage_configured'])
+        self.assertFalse(datos['azure_storage_configured'])
+
+    def test_nombres_con_barras_en_las_rutas(self):
+        response = self._subir('2024/facturas/luz.txt', b'kWh')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['blob_name'], '2024/facturas/luz.txt')
+
+        url = self.client.get(reverse('azure_get_file_url', args=['2024/facturas/luz.txt'])).json()['url']
+        self.assertEqual(url, 'http://localhost:8000/api/azure/files/2024/facturas/luz.txt/download/')
+
+        response = self.client.get('/api/azure/files/2024/facturas/luz.txt/download/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(_contenido(response), b'kWh')
+
+        response = self.client.delete('/api/azure/files/2024/facturas/luz.txt/delete/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/azure/files/2024/facturas/luz.txt/download/').status_code, 404)
+
+    def test_borrar_archivo_borra_sus_derivados(self):
+        for nombre in ('foto.jpg', 'foto.jpg.miniatura.webp', 'foto.jpg.vista_previa.webp', 'otra.jpg'):
+            self.guardar(nombre, b'x')
+
+        self.assertEqual(self.client.delete(reverse('azure_delete_file', args=['foto.jpg'])).status_code, 200)
+
+        self.assertEqual([f['name'] for f in self.storage.list_files()], ['otra.jpg'])
+
+    def test_borrar_documento_sin_deduplicar_borra_sus_derivados(self):
+        for nombre in ('foto.jpg', 'foto.jpg.miniatura.webp', 'foto.jpg.vista_previa.webp'):
+            self.guardar(nombre, b'x')
+        grupo = Grupo.objects.create(nombre='casa')
+        documento = Documento.objects.create(
+            grupo=grupo, nombre_archivo='foto.jpg', url_archivo='http://localhost:8000/foto.jpg', blob_name='foto.jpg'
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            documento.delete()
+
+        self.assertEqual([f['name'] for f in self.storage.list_files()], ['foto.jpg'])
+
+    def test_listado_con_prefijo_y_cursor(self):
+        for nombre in ('a/1.txt', 'a/2.txt', 'a/3.txt', 'b/1.txt'):
+            self.guardar(nombre, b'x')
+
+        primera = self.client.get(reverse('azure_list_files'), {'prefix': 'a/', 'page_size': 2}).json()
+        self.assertEqual([f['name'] for f in primera['files']], ['a/1.txt', 'a/2.txt'])
+        segunda = self.client.get(
+            reverse('azure_list_files'), {'prefix': 'a/', 'page_size': 2, 'cursor': primera['next_cursor']}
+        ).json()
+        self.assertEqual([f['name'] for f in segunda['files']], ['a/3.txt'])
+        self.assertIsNone(segunda['next_cursor'])
+
+        self.assertEqual(self.client.get(reverse('azure_list_files'), {'cursor': '%%%'}).status_code, 400)
+
+    def test_subida_reanudable(self):
+        response = self.client.post(
+            reverse('azure_upload_session_create'),
+            {'blob_name': 'videos/clip.bin', 'total_size': 5, 'chunk_size': 2},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        sesion = response.json()
+        self.assertEqual(sesion['missing_chunks'], [0, 1, 2])
+
+        for numero, parte in ((2, b'e'), (0, b'ab'), (1, b'cd')):
+            response = self.client.put(
+                reverse('azure_upload_chunk', args=[sesion['upload_id'], numero]), parte,
+                content_type='application/octet-stream',
+            )
+            self.assertEqual(response.status_code, 200)
+
+        # Una parte con otro tamaño se rechaza
+        response = self.client.put(
+            reverse('azure_upload_chunk', args=[sesion['upload_id'], 0]), b'abc',
+            content_type='application/octet-stream',
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(reverse('azure_upload_session_complete', args=[sesion['upload_id']]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['estado'], 'completada')
+        self.assertEqual(self.storage.download_file('videos/clip.bin'), b'abcde')
+
+    def test_subida_directa(self):
+        grupo = Grupo.objects.create(nombre='casa')
+        response = self.client.post(
+            reverse('azure_direct_upload_create'), {'blob_name': 'docs/garantia.pdf'}, content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        upload_url = response.json()['upload_url'].removeprefix('http://localhost:8000')
+
+        # Sin subir todavía, no se puede confirmar
+        response = self.client.post(
+            reverse('azure_direct_upload_complete'),
+            {'blob_name': 'docs/garantia.pdf', 'grupo': grupo.pk}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.put(upload_url, b'%PDF-1.4', content_type='application/pdf')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.storage.download_file('docs/garantia.pdf'), b'%PDF-1.4')
+
+        response = self.client.post(
+            reverse('azure_direct_upload_complete'),
+            {'blob_name': 'docs/garantia.pdf', 'grupo': grupo.pk}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        documento = Documento.objects.get()
+        self.assertEqual(documento.blob_name, 'docs/garantia.pdf')
+        self.assertEqual(documento.nombre_archivo, 'garantia.pdf')
+
+    def test_subida_directa_con_token_invalido(self):
+        response = self.client.put(
+            reverse('local_direct_upload', args=['no-es-un-token']), b'x', content_type='application/pdf'
+        )
+
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.storage.list_files(), [])
+
+    def test_vistas_async(self):
+        response = self._subir('async/a.txt', b'0123456789', ruta='azure_async_upload_file')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(
+            reverse('azure_async_download_file', args=['async/a.txt']), HTTP_RANGE='bytes=1-3'
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(_contenido(response), b'123')
+        self.assertTrue(response.has_header('ETag'))
+
+        archivos = self.client.get(reverse('azure_async_list_files')).json()['files']
+        self.assertEqual([f['name'] for f in archivos], ['async/a.txt'])
+
+        self.assertEqual(self.client.delete(reverse('azure_async_delete_file', args=['async/a.txt'])).status_code, 200)
+        self.assertEqual(self.storage.list_files(), [])
+
+
+class BenchmarkTests(TestCase):
+    def test_benchmark_serializacion(self):
+        salida = io.StringIO()
+        call_command('benchmark_serializacion', filas=20, repeticiones=1, stdout=salida)
+
+        self.assertIn('tareas', salida.getvalue())
+        # Corre en una transacción que se revierte
+        self.assertFalse(Tarea.objects.exists())
+
+    def test_benchmark_indices(self):
+        salida = io.StringIO()
+        call_command('benchmark_indices', filas=200, repeticiones=1, stdout=salida)
+
+        self.assertIn('con índices', salida.getvalue())
+        self.assertFalse(Tarea.objects.exists())
+
+
+
+class DeduplicacionTests(AlmacenamientoLocalMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.grupo = Grupo.objects.create(nombre='casa')
+        self.contenido, nuevo = guardar_contenido(io.BytesIO(b'recibo'), 'text/plain')
+        self.assertTrue(nuevo)
+
+    def _documento(self):
+        serializer = DocumentoSerializer(data={
+            'grupo': self.grupo.pk, 'nombre_archivo': 'recibo.txt', 'sha256': self.contenido.sha256,
+        })
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        return serializer
+
+    def test_referencias(self):
+        documento = self._documento().save()
+        self.contenido.refresh_from_db()
+        self.assertEqual(self.contenido.referencias, 1)
+        self.assertEqual(documento.blob_name, self.contenido.blob_name)
+
+        # Recién subido: al soltar la última referencia queda para el recolector
+        documento.delete()
+        self.contenido.refresh_from_db()
+        self.assertEqual(self.contenido.referencias, 0)
+
+    def test_ultima_referencia_fuera_de_la_gracia_borra_el_blob(self):
+        documento = self._documento().save()
+        ContenidoBlob.objects.update(fecha_ultimo_uso=datetime.now(timezone.utc) - timedelta(days=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            documento.delete()
+
+        self.assertFalse(ContenidoBlob.objects.exists())
+        self.assertIsNone(self.storage.get_file_properties(self.contenido.blob_name))
+
+    def test_contenido_borrado_antes_de_guardar(self):
+        serializer = self._documento()
+        self.contenido.delete()
+
+        with self.assertRaises(ValidationError) as error:
+            serializer.save()
+        self.assertIn('sha256', error.exception.detail)
+        self.assertFalse(Documento.objects.exists())
+
+    def test_reutilizar_renueva_el_ultimo_uso(self):
+        ContenidoBlob.objects.update(fecha_ultimo_uso=datetime.now(timezone.utc) - timedelta(days=1))
+
+        contenido, nuevo = guardar_contenido(io.BytesIO(b'recibo'), 'text/plain')
+
+        self.assertFalse(nuevo)
+        self.assertEqual(contenido.pk, self.contenido.pk)
+        self.assertEqual(recolectar_huerfanos(), 0)
+
+    def test_recolectar_huerfanos(self):
+        en_uso, _ = guardar_contenido(io.BytesIO(b'otro'), 'text/plain')
+        self.contenido = en_uso
+        self._documento().save()
+        ContenidoBlob.objects.update(fecha_ultimo_uso=datetime.now(timezone.utc) - timedelta(days=1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            salida = io.StringIO()
+            call_command('recolectar_contenido_huerfano', stdout=salida)
+
+        self.assertIn('1 contenidos', salida.getvalue())
+        self.assertEqual(list(ContenidoBlob.objects.values_list('pk', flat=True)), [en_uso.pk])
+        self.assertEqual([f['name'] for f in self.storage.list_files()], [en_uso.blob_name])
+
+
+
+class GetCondicionalTests(TestCase):
+    def setUp(self):
+        self.grupo = Grupo.objects.create(nombre='casa')
+
+    def _envejecer(self, segundos):
+        ContadorVersion.objects.update(fecha_modificacion=datetime.now(timezone.utc) - timedelta(seconds=segundos))
+
+    def test_cambio_reciente_sin_last_modified(self):
+        response = self.client.get('/api/grupos/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_if_modified_since(self):
+        self._envejecer(10)
+        ultima = self.client.get('/api/grupos/')['Last-Modified']
+
+        self.assertEqual(self.client.get('/api/grupos/', HTTP_IF_MODIFIED_SINCE=ultima).status_code, 304)
+
+        # Un cambio posterior, aunque caiga en el mismo segundo, no da un 304 viejo
+        self.grupo.nombre = 'casa nueva'
+        self.grupo.save()
+        response = self.client.get('/api/grupos/', HTTP_IF_MODIFIED_SINCE=ultima)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['nombre'], 'casa nueva')
+
+    def test_if_none_match(self):
+        etag = self.client.get('/api/grupos/')['ETag']
+
+        self.assertEqual(self.client.get('/api/grupos/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+
+class NotificacionesTests(TestCase):
+    def setUp(self):
+        grupo = Grupo.objects.create(nombre='casa')
+        for nombre in ('ana', 'beto'):
+            PerfilUsuario.objects.create(user=User.objects.create(username=nombre), grupo=grupo)
+        self.tarea = Tarea.objects.create(grupo=grupo, titulo='luz')
+        self.aviso = (self.tarea.pk, grupo.pk)
+
+    def _mensajes(self, tipo):
+        return set(Notificacion.objects.filter(tipo=tipo).values_list('mensaje', flat=True))
+
+    def test_se_juntan_los_avisos_del_mismo_tipo(self):
+        self.assertEqual(notificar([(*self.aviso, 'pasó a En progreso', None)]), 2)
+        self.assertEqual(notificar([(*self.aviso, 'pasó a Completada', None)]), 0)
+
+        self.assertEqual(self._mensajes('tarea'), {'pasó a Completada'})
+        self.assertEqual(Notificacion.objects.count(), 2)
+
+    def test_un_cambio_de_estado_no_pisa_el_recordatorio(self):
+        notificar([(*self.aviso, 'vence mañana', None)], agrupar=False, tipo='recordatorio')
+
+        self.assertEqual(notificar([(*self.aviso, 'pasó a En progreso', None)]), 2)
+
+        self.assertEqual(self._mensajes('recordatorio'), {'vence mañana'})
+        self.assertEqual(self._mensajes('tarea'), {'pasó a En progreso'})
+
+
+
+@override_settings(RECORDATORIOS_DIAS='7,1,0')
+class RecordatoriosTests(TestCase):
+    hoy = date(2026, 3, 2)
+
+    def setUp(self):
+        self.grupo = Grupo.objects.create(nombre='casa')
+        PerfilUsuario.objects.create(user=User.objects.create(username='ana'), grupo=self.grupo)
+        self.tarea = Tarea.objects.create(grupo=self.grupo, titulo='luz', fecha_vencimiento=self.hoy + timedelta(days=20))
+        enviar_recordatorios(self.hoy)
+
+    def _avisadas(self):
+        return list(Notificacion.objects.filter(tipo='recordatorio').values_list('tarea_id', flat=True))
+
+    def test_vencimiento_movido_a_un_tramo_ya_recorrido(self):
+        self.tarea.fecha_vencimiento = self.hoy + timedelta(days=3)
+        self.tarea.save()
+
+        self.assertEqual(enviar_recordatorios(self.hoy), 1)
+        self.assertEqual(self._avisadas(), [self.tarea.pk])
+        # La siguiente corrida no repite el aviso
+        self.assertEqual(enviar_recordatorios(self.hoy), 0)
+
+    def test_vencimiento_movido_en_lote(self):
+        response = self.client.patch(
+            '/api/tareas/lote/', [{'id': self.tarea.pk, 'fecha_vencimiento': str(self.hoy)}],
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(enviar_recordatorios(self.hoy), 1)
+
+    def test_otros_cambios_no_avisan(self):
+        self.tarea.titulo = 'luz y gas'
+        self.tarea.save()
+
+        self.assertEqual(enviar_recordatorios(self.hoy), 0)
@@ -7,15 +7,31 @@ from .api import (
     DocumentoViewSet,
     TareaViewSet,
     NotificacionViewSet,
+    TableroViewSet,
 )
 from .views import (
     azure_storage_status,
+    api_cache_status,
     list_files,
     upload_file,
     download_file,
     delete_file,
     get_file_url,
     test_azure_storage,
+    create_upload_session,
+    upload_session,
+    upload_chunk,
+    complete_upload_session,
+    create_direct_upload,
+    complete_direct_upload,
+    check_file_hash,
+    async_list_files,
+    async_upload_file,
+    async_download_file,
+    async_delete_file,
+    async_get_file_url,
+    local_direct_upload,
+    eventos,
 )
 
 # Creamos el router de DRF
@@ -28,17 +44,44 @@ router.register('api/perfiles', PerfilUsuarioViewSet, basename='perfiles')
 router.register('api/documentos', DocumentoViewSet, basename='documentos')
 router.register('api/tareas', TareaViewSet, basename='tareas')
 router.register('api/notificaciones', NotificacionViewSet, basename='notificaciones')
+router.register('api/tablero', TableroViewSet, basename='tablero')
 
 # Incluimos todas las rutas generadas automáticamente
 urlpatterns = router.urls
 
+# Eventos en tiempo real (SSE, requiere ASGI)
+urlpatterns += [
+    path('api/eventos/', eventos, name='eventos'),
+]
+
+# Estadísticas de la caché de respuestas de la API
+urlpatterns += [
+    path('api/cache/status/', api_cache_status, name='api_cache_status'),
+]
+
 # URLs para Azure Storage
 urlpatterns += [
     path('api/azure/status/', azure_storage_status, name='azure_status'),
     path('api/azure/test/', test_azure_storage, name='azure_test'),
     path('api/azure/files/', list_files, name='azure_list_files'),
     path('api/azure/files/upload/', upload_file, name='azure_upload_file'),
-    path('api/azure/files/<str:blob_name>/download/', download_file, name='azure_download_file'),
-    path('api/azure/files/<str:blob_name>/delete/', delete_file, name='azure_delete_file'),
-    path('api/azure/files/<str:blob_name>/url/', get_file_url, name='azure_get_file_url'),
+    path('api/azure/dedup/<str:digest>/', check_file_hash, name='azure_check_file_hash'),
+    path('api/azure/files/<path:blob_name>/download/', download_file, name='azure_download_file'),
+    path('api/azure/files/<path:blob_name>/delete/', delete_file, name='azure_delete_file'),
+    path('api/azure/files/<path:blob_name>/url/', get_file_url, name='azure_get_file_url'),
+    # Versiones asíncronas (pensadas para correr bajo ASGI)
+    path('api/azure/async/files/', async_list_files, name='azure_async_list_files'),
+    path('api/azure/async/files/upload/', async_upload_file, name='azure_async_upload_file'),
+    path('api/azure/async/files/<path:blob_name>/download/', async_download_file, name='azure_async_download_file'),
+    path('api/azure/async/files/<path:blob_name>/delete/', async_delete_file, name='azure_async_delete_file'),
+    path('api/azure/async/files/<path:blob_name>/url/', async_get_file_url, name='azure_async_get_file_url'),
+    # Subidas reanudables por partes
+    path('api/azure/uploads/', create_upload_session, name='azure_upload_session_create'),
+    path('api/azure/uploads/<uuid:upload_id>/', upload_session, name='azure_upload_session'),
+    path('api/azure/uploads/<uuid:upload_id>/chunks/<int:numero>/', upload_chunk, name='azure_upload_chunk'),
+    path('api/azure/uploads/<uuid:upload_id>/complete/', complete_upload_session, name='azure_upload_session_complete'),
+    # Subidas directas del cliente a Azure con URL SAS
+    path('api/azure/direct-uploads/', create_direct_upload, name='azure_direct_upload_create'),
+    path('api/azure/direct-uploads/complete/', complete_direct_upload, name='azure_direct_upload_complete'),
+    path('api/azure/direct-uploads/local/<str:token>/', local_direct_upload, name='local_direct_upload'),
 ]
\ No newline at end of file
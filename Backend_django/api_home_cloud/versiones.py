@@ -0,0 +1,79 @@
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from django.db.models import F, Max, Sum
+from django.utils import timezone
+
+from .models import ContadorVersion
+
+# Contadores de versión para los GET condicionales de la API (ETag / Last-Modified).
+# Las señales (signals.py) incrementan el contador del grupo en cada alta, cambio o
+# baja de sus datos; los viewsets arman el ETag con ese número y pueden responder 304
+# con una consulta de una fila, sin ejecutar el listado ni serializar nada.
+# Las escrituras con queryset.update()/bulk_create() no disparan señales: quien las
+# haga tiene que llamar a incrementar_version() a mano (o usar versiones_en_lote()).
+
+CLAVE_USUARIOS = 'usuarios'
+
+_estado = threading.local()
+
+
+def clave_grupo(grupo_id: int) -> str:
+    return f"grupo:{grupo_id}"
+
+
+def incrementar_version(*claves: str):
+    """
+    Incrementa los contadores de `claves` (creándolos si no existen). Corre en la
+    transacción del cambio: un lector nunca ve la versión nueva con los datos viejos.
+    """
+    ahora = timezone.now()
+    for clave in claves:
+        actualizados = ContadorVersion.objects.filter(clave=clave).update(
+            version=F('version') + 1, fecha_modificacion=ahora
+        )
+        if actualizados:
+            continue
+        _, creado = ContadorVersion.objects.get_or_create(
+            clave=clave, defaults={'version': 1, 'fecha_modificacion': ahora}
+        )
+        if not creado:
+            # Lo creó otra transacción en paralelo
+            ContadorVersion.objects.filter(clave=clave).update(
+                version=F('version') + 1, fecha_modificacion=ahora
+            )
+
+
+def en_lote() -> bool:
+    return getattr(_estado, 'en_lote', False)
+
+
+@contextmanager
+def versiones_en_lote(claves: Iterable[str]):
+    """
+    Para escrituras masivas: dentro del bloque las señales no incrementan versiones
+    (sería un UPDATE por fila, por ejemplo en un borrado en cascada) y al terminar sin
+    errores se incrementa una vez cada clave de `claves`, que tiene que cubrir todo lo
+    que se modifica.
+    """
+    _estado.en_lote = True
+    try:
+        yield
+    finally:
+        _estado.en_lote = False
+    incrementar_version(*claves)
+
+
+def version_actual(claves: Optional[Iterable[str]] = None) -> Tuple[int, Optional[datetime]]:
+    """
+    Versión y fecha de último cambio de `claves` (None = de todos los contadores, para
+    quien ve todos los grupos). Los contadores solo crecen, así que la suma cambia
+    siempre que cambia alguno.
+    """
+    contadores = ContadorVersion.objects.all()
+    if claves is not None:
+        contadores = contadores.filter(clave__in=list(claves))
+    resultado = contadores.aggregate(version=Sum('version'), fecha=Max('fecha_modificacion'))
+    return resultado['version'] or 0, resultado['fecha']
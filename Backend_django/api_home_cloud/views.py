@@ -1,44 +1,127 @@
 from django.shortcuts import render
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
+from django.conf import settings
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.http import http_date, parse_http_date_safe
+import asyncio
+import base64
+import binascii
 import json
 import os
-from .azure_storage import azure_storage
+from asgiref.sync import sync_to_async
+from .azure_storage import make_block_id, invalidate_listing_cache
+from .azure_transport import metrics as transport_metrics
+from .cache_respuestas import estado_cache
+from .local_storage import verify_upload_token
+from .storage_backends import get_storage_backend, get_async_storage_backend
+from .eventos import bus, canal_grupo, canal_usuario, eventos_habilitados
+from .models import SesionSubida, ChunkSubida, ContenidoBlob, PerfilUsuario
+from .deduplicacion import guardar_contenido
+from .derivados import borrar_derivados
+from .serializers import DocumentoSerializer
 
 # Create your views here.
 
 @require_http_methods(["GET"])
 def azure_storage_status(request):
     """
-    Verifica el estado de la conexión con Azure Storage
+    Verifica el estado del backend de almacenamiento (Azure o disco local)
     """
-    is_configured = azure_storage.blob_service_client is not None
+    storage = get_storage_backend()
+    is_configured = storage.is_configured
 
     return JsonResponse({
-        'azure_storage_configured': is_configured,
-        'container_name': azure_storage.container_name if is_configured else None,
-        'account_name': azure_storage.account_name if is_configured else None,
+        'backend': storage.name,
+        'azure_storage_configured': is_configured and storage.name == 'azure',
+        'storage_configured': is_configured,
+        'container_name': getattr(storage, 'container_name', None) if is_configured else None,
+        'account_name': getattr(storage, 'account_name', None) if is_configured else None,
+        # Peticiones y conexiones nuevas por operación en este worker (reuso del pool)
+        'transport': transport_metrics.snapshot() if storage.name == 'azure' else None,
+    })
+
+@require_http_methods(["GET"])
+def api_cache_status(request):
+    """
+    Estado de la caché de respuestas de la API: aciertos, fallos y desalojos de este
+    worker (y los del servidor si es Redis), para dimensionarla
+    """
+    return JsonResponse(estado_cache())
+
+def _listing_params(request):
+    """
+    Lee prefix, page_size y cursor del query string. El cursor es el continuation
+    token del backend en base64 url-safe, opaco para el cliente.
+
+    Raises:
+        ValueError: si page_size o cursor no son válidos.
+    """
+    prefix = request.GET.get('prefix', '')
+    page_size = request.GET.get('page_size')
+    page_size = int(page_size) if page_size else None
+    if page_size is not None and page_size <= 0:
+        raise ValueError('page_size debe ser mayor que 0')
+
+    cursor = request.GET.get('cursor')
+    try:
+        continuation_token = base64.b64decode(cursor, altchars=b'-_', validate=True).decode() if cursor else None
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError('cursor inválido')
+
+    return prefix, page_size, continuation_token
+
+def _listing_response(page):
+    token = page['continuation_token']
+    return JsonResponse({
+        'files': page['files'],
+        'total': len(page['files']),
+        'next_cursor': base64.urlsafe_b64encode(token.encode()).decode() if token else None
     })
 
 @require_http_methods(["GET"])
 def list_files(request):
     """
-    Lista archivos en Azure Storage
+    Lista archivos en Azure Storage, paginado (?page_size=&cursor=)
     """
-    if not azure_storage.blob_service_client:
+    storage = get_storage_backend()
+    if not storage.is_configured:
         return JsonResponse({
-            'error': 'Azure Storage no está configurado'
+            'error': 'El almacenamiento no está configurado'
         }, status=500)
 
-    prefix = request.GET.get('prefix', '')
-    files = azure_storage.list_files(prefix)
+    try:
+        prefix, page_size, continuation_token = _listing_params(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    page = storage.list_files_page(prefix, page_size, continuation_token)
+
+    if page is None:
+        return JsonResponse({
+            'error': 'Error al listar los archivos'
+        }, status=500)
+
+    return _listing_response(page)
+
+def _dedup_upload_response(file_obj, content_type):
+    contenido, nuevo = guardar_contenido(file_obj, content_type)
+    if contenido is None:
+        return JsonResponse({
+            'error': 'Error al subir el archivo'
+        }, status=500)
 
     return JsonResponse({
-        'files': files,
-        'total': len(files)
+        'message': 'Archivo subido exitosamente' if nuevo else 'El archivo ya existía',
+        'blob_name': contenido.blob_name,
+        'sha256': contenido.sha256,
+        'deduplicated': not nuevo,
+        'url': contenido.url_archivo,
+        'content_type': contenido.content_type
     })
 
 @csrf_exempt
@@ -47,9 +130,10 @@ def upload_file(request):
     """
     Sube un archivo a Azure Storage
     """
-    if not azure_storage.blob_service_client:
+    storage = get_storage_backend()
+    if not storage.is_configured:
         return JsonResponse({
-            'error': 'Azure Storage no está configurado'
+            'error': 'El almacenamiento no está configurado'
         }, status=500)
 
     if 'file' not in request.FILES:
@@ -63,8 +147,12 @@ def upload_file(request):
     # Determinar el tipo de contenido
     content_type = file_obj.content_type or 'application/octet-stream'
 
+    if settings.AZURE_STORAGE_DEDUP_ENABLED:
+        # Modo deduplicado: el blob se nombra por su hash y blob_name se ignora
+        return _dedup_upload_response(file_obj, content_type)
+
     # Subir el archivo
-    url = azure_storage.upload_file(file_obj, blob_name, content_type)
+    url = storage.upload_file(file_obj, blob_name, content_type)
 
     if url:
         return JsonResponse({
@@ -78,42 +166,190 @@ def upload_file(request):
             'error': 'Error al subir el archivo'
         }, status=500)
 
+def _resolve_range(request, properties):
+    """
+    Aplica `Range`/`If-Range` de la petición sobre las propiedades del blob.
+
+    Returns:
+        Tupla (offset, length, content_range), con None cuando se sirve el archivo completo.
+
+    Raises:
+        ValueError: si el rango no es satisfacible o pide varios rangos (416).
+    """
+    range_header = request.headers.get('Range')
+    # If-Range: si el archivo cambió desde que el cliente empezó, se envía completo
+    if_range = request.headers.get('If-Range')
+    if if_range and not _if_range_vigente(if_range, properties):
+        range_header = None
+
+    byte_range = _parse_range_header(range_header, properties['size'])
+    if byte_range is None:
+        return None, None, None
+
+    first, last = byte_range
+    return first, last - first + 1, f"bytes {first}-{last}/{properties['size']}"
+
+def _if_range_vigente(if_range, properties):
+    """
+    True si el validador de `If-Range` (ETag o fecha HTTP) coincide con el archivo actual.
+    """
+    if if_range.startswith(('"', 'W/')):
+        # Comparación fuerte (RFC 9110): un ETag débil nunca habilita un rango
+        return not if_range.startswith('W/') and if_range == properties['etag']
+
+    fecha = parse_http_date_safe(if_range)
+    last_modified = properties.get('last_modified')
+    return fecha is not None and last_modified is not None and fecha == int(last_modified.timestamp())
+
+def _range_not_satisfiable(error, size):
+    response = JsonResponse({'error': str(error)}, status=416)
+    response['Content-Range'] = f'bytes */{size}'
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+def _download_response(download, blob_name, properties, content_range):
+    if download.get('file') is not None:
+        # Backend local: FileResponse entrega el archivo real al wsgi.file_wrapper,
+        # que lo envía con os.sendfile sin copiar los bytes a Python
+        response = FileResponse(
+            download['file'],
+            content_type='application/octet-stream',
+            status=206 if content_range else 200
+        )
+    else:
+        # Respuesta en streaming: los bloques se envían a medida que llegan del almacenamiento
+        response = StreamingHttpResponse(
+            download['chunks'],
+            content_type='application/octet-stream',
+            status=206 if content_range else 200
+        )
+    response['Content-Length'] = str(download['size'])
+    response['Accept-Ranges'] = 'bytes'
+    # Validadores para reanudar la descarga con Range + If-Range
+    if properties.get('etag'):
+        response['ETag'] = properties['etag']
+    if properties.get('last_modified'):
+        response['Last-Modified'] = http_date(properties['last_modified'].timestamp())
+    if content_range:
+        response['Content-Range'] = content_range
+    response['Content-Disposition'] = f'attachment; filename="{blob_name}"'
+    return response
+
+def _parse_range_header(range_header, size):
+    """
+    Interpreta un header `Range` de un único rango de bytes (RFC 9110).
+
+    Returns:
+        Tupla (inicio, fin) inclusiva, o None si no hay header o su sintaxis no es
+        válida (en ese caso se ignora y se sirve el archivo completo).
+
+    Raises:
+        ValueError: si se piden varios rangos o el rango no es satisfacible (416).
+    """
+    if not range_header:
+        return None
+
+    unit, _, ranges = range_header.partition('=')
+    if unit.strip().lower() != 'bytes' or not ranges.strip():
+        return None
+
+    # No soportamos multipart/byteranges: varios rangos en una misma petición se rechazan
+    if ',' in ranges:
+        raise ValueError('No se admiten rangos múltiples')
+
+    start, sep, end = ranges.strip().partition('-')
+    start, end = start.strip(), end.strip()
+    if not sep or not (start or end) or not (start + end).isdigit():
+        return None
+
+    if not start:
+        # Sufijo "bytes=-N": los últimos N bytes
+        suffix = int(end)
+        if suffix == 0 or size == 0:
+            raise ValueError('Rango no satisfacible')
+        return max(size - suffix, 0), size - 1
+
+    first = int(start)
+    last = int(end) if end else size - 1
+    if end and last < first:
+        return None
+    if first >= size:
+        raise ValueError('Rango no satisfacible')
+
+    return first, min(last, size - 1)
+
 @require_http_methods(["GET"])
 def download_file(request, blob_name):
     """
-    Descarga un archivo desde Azure Storage
+    Descarga un archivo desde Azure Storage (admite `Range` para descargas parciales)
     """
-    if not azure_storage.blob_service_client:
+    storage = get_storage_backend()
+    if not storage.is_configured:
         return JsonResponse({
-            'error': 'Azure Storage no está configurado'
+            'error': 'El almacenamiento no está configurado'
         }, status=500)
 
-    data = azure_storage.download_file(blob_name)
+    # ETag y Last-Modified van en toda respuesta, y el tamaño total hace falta para
+    # resolver el rango antes de pedir los bytes
+    properties = storage.get_file_properties(blob_name)
+    if properties is None:
+        return JsonResponse({
+            'error': 'Archivo no encontrado'
+        }, status=404)
 
-    if data is None:
+    try:
+        offset, length, content_range = _resolve_range(request, properties)
+    except ValueError as e:
+        return _range_not_satisfiable(e, properties['size'])
+
+    download = storage.stream_file(blob_name, offset=offset, length=length)
+
+    if download is None:
         return JsonResponse({
             'error': 'Archivo no encontrado'
         }, status=404)
 
-    # Crear respuesta con el archivo
-    response = HttpResponse(data, content_type='application/octet-stream')
-    response['Content-Disposition'] = f'attachment; filename="{blob_name}"'
+    return _download_response(download, blob_name, properties, content_range)
 
-    return response
+@require_http_methods(["GET"])
+def check_file_hash(request, digest):
+    """
+    Consulta si un contenido (SHA-256) ya está almacenado, para que el cliente
+    pueda omitir la subida y crear el Documento directamente con `sha256`.
+    """
+    contenido = ContenidoBlob.objects.filter(sha256=digest.lower()).first()
+
+    if contenido is None:
+        return JsonResponse({
+            'sha256': digest,
+            'exists': False
+        }, status=404)
+
+    return JsonResponse({
+        'sha256': contenido.sha256,
+        'exists': True,
+        'blob_name': contenido.blob_name,
+        'url': contenido.url_archivo,
+        'size': contenido.tamano,
+        'content_type': contenido.content_type
+    })
 
 @require_http_methods(["DELETE"])
 def delete_file(request, blob_name):
     """
     Elimina un archivo de Azure Storage
     """
-    if not azure_storage.blob_service_client:
+    storage = get_storage_backend()
+    if not storage.is_configured:
         return JsonResponse({
-            'error': 'Azure Storage no está configurado'
+            'error': 'El almacenamiento no está configurado'
         }, status=500)
 
-    success = azure_storage.delete_file(blob_name)
+    success = storage.delete_file(blob_name)
 
     if success:
+        # Sin el original, su miniatura y vista previa quedarían huérfanas
+        borrar_derivados(blob_name)
         return JsonResponse({
             'message': f'Archivo {blob_name} eliminado exitosamente'
         })
@@ -127,12 +363,453 @@ def get_file_url(request, blob_name):
     """
     Obtiene la URL de un archivo en Azure Storage
     """
-    if not azure_storage.blob_service_client:
+    storage = get_storage_backend()
+    if not storage.is_configured:
+        return JsonResponse({
+            'error': 'El almacenamiento no está configurado'
+        }, status=500)
+
+    url = storage.get_file_url(blob_name)
+
+    if url:
+        return JsonResponse({
+            'blob_name': blob_name,
+            'url': url
+        })
+    else:
+        return JsonResponse({
+            'error': 'Archivo no encontrado'
+        }, status=404)
+
+def _chunk_block_id(sesion, numero):
+    """
+    Id de bloque de una parte. Lleva un prefijo de la sesión para que dos sesiones
+    sobre el mismo blob no pisen sus bloques sin confirmar.
+    """
+    return make_block_id(numero, prefix=sesion.id.hex[:8])
+
+def _upload_session_status(sesion):
+    received = list(sesion.chunks.order_by('numero').values_list('numero', flat=True))
+    received_set = set(received)
+
+    return {
+        'upload_id': str(sesion.id),
+        'blob_name': sesion.blob_name,
+        'estado': sesion.estado,
+        'total_size': sesion.tamano_total,
+        'chunk_size': sesion.tamano_chunk,
+        'total_chunks': sesion.total_chunks,
+        'received_chunks': received,
+        'missing_chunks': [n for n in range(sesion.total_chunks) if n not in received_set],
+        'url': sesion.url_archivo or None,
+    }
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def create_upload_session(request):
+    """
+    Crea una sesión de subida reanudable.
+    Body JSON: blob_name, total_size, chunk_size (opcional), content_type (opcional)
+    """
+    storage = get_storage_backend()
+    if not storage.is_configured:
+        return JsonResponse({
+            'error': 'El almacenamiento no está configurado'
+        }, status=500)
+
+    try:
+        data = json.loads(request.body or b'{}')
+        blob_name = data['blob_name']
+        total_size = int(data['total_size'])
+        chunk_size = int(data.get('chunk_size') or settings.RESUMABLE_UPLOAD_CHUNK_SIZE)
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({
+            'error': 'Se requieren blob_name y total_size'
+        }, status=400)
+
+    if total_size < 0 or not 0 < chunk_size <= settings.RESUMABLE_UPLOAD_MAX_CHUNK_SIZE:
+        return JsonResponse({
+            'error': f'chunk_size debe estar entre 1 y {settings.RESUMABLE_UPLOAD_MAX_CHUNK_SIZE} bytes'
+        }, status=400)
+
+    sesion = SesionSubida.objects.create(
+        usuario=request.user if request.user.is_authenticated else None,
+        blob_name=blob_name,
+        content_type=data.get('content_type') or 'application/octet-stream',
+        tamano_total=total_size,
+        tamano_chunk=chunk_size,
+    )
+
+    return JsonResponse(_upload_session_status(sesion), status=201)
+
+@csrf_exempt
+@require_http_methods(["GET", "DELETE"])
+def upload_session(request, upload_id):
+    """
+    GET: estado de la sesión (qué partes llegaron y cuáles faltan).
+    DELETE: cancela la sesión; Azure descarta solo los bloques sin confirmar.
+    """
+    sesion = SesionSubida.objects.filter(pk=upload_id).first()
+    if sesion is None:
+        return JsonResponse({
+            'error': 'Sesión de subida no encontrada'
+        }, status=404)
+
+    if request.method == 'DELETE' and sesion.estado == 'abierta':
+        sesion.estado = 'cancelada'
+        sesion.save(update_fields=['estado', 'fecha_actualizacion'])
+
+    return JsonResponse(_upload_session_status(sesion))
+
+@csrf_exempt
+@require_http_methods(["PUT"])
+def upload_chunk(request, upload_id, numero):
+    """
+    Recibe la parte `numero` (cuerpo binario) y la guarda como bloque sin confirmar.
+    Reenviar una parte ya recibida la reemplaza.
+    """
+    storage = get_storage_backend()
+    if not storage.is_configured:
+        return JsonResponse({
+            'error': 'El almacenamiento no está configurado'
+        }, status=500)
+
+    sesion = SesionSubida.objects.filter(pk=upload_id).first()
+    if sesion is None:
+        return JsonResponse({
+            'error': 'Sesión de subida no encontrada'
+        }, status=404)
+
+    if sesion.estado != 'abierta':
+        return JsonResponse({
+            'error': f'La sesión está {sesion.estado}'
+        }, status=409)
+
+    if numero >= sesion.total_chunks:
+        return JsonResponse({
+            'error': f'La sesión tiene {sesion.total_chunks} partes (0 a {sesion.total_chunks - 1})'
+        }, status=400)
+
+    # Se lee del stream con límite en vez de request.body para no depender de
+    # DATA_UPLOAD_MAX_MEMORY_SIZE y no aceptar más bytes de los esperados.
+    expected = sesion.tamano_esperado(numero)
+    data = request.read(expected + 1)
+    if len(data) != expected:
+        return JsonResponse({
+            'error': f'La parte {numero} debe tener {expected} bytes (llegaron {len(data)})'
+        }, status=400)
+
+    if not storage.stage_block(sesion.blob_name, _chunk_block_id(sesion, numero), data):
+        return JsonResponse({
+            'error': f'Error al guardar la parte {numero}'
+        }, status=500)
+
+    ChunkSubida.objects.update_or_create(sesion=sesion, numero=numero, defaults={'tamano': expected})
+
+    return JsonResponse({
+        'upload_id': str(sesion.id),
+        'chunk': numero,
+        'received_chunks': sesion.chunks.count(),
+        'total_chunks': sesion.total_chunks,
+    })
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def complete_upload_session(request, upload_id):
+    """
+    Confirma la lista de bloques en orden y cierra la sesión.
+    """
+    storage = get_storage_backend()
+    if not storage.is_configured:
+        return JsonResponse({
+            'error': 'El almacenamiento no está configurado'
+        }, status=500)
+
+    with transaction.atomic():
+        # Bloqueo de la fila: dos finalizaciones concurrentes no confirman dos veces
+        sesion = SesionSubida.objects.select_for_update().filter(pk=upload_id).first()
+        if sesion is None:
+            return JsonResponse({
+                'error': 'Sesión de subida no encontrada'
+            }, status=404)
+
+        if sesion.estado == 'completada':
+            return JsonResponse(_upload_session_status(sesion))
+        if sesion.estado != 'abierta':
+            return JsonResponse({
+                'error': f'La sesión está {sesion.estado}'
+            }, status=409)
+
+        status = _upload_session_status(sesion)
+        if status['missing_chunks']:
+            return JsonResponse({
+                'error': 'Faltan partes por subir',
+                'missing_chunks': status['missing_chunks'],
+            }, status=409)
+
+        block_ids = [_chunk_block_id(sesion, numero) for numero in range(sesion.total_chunks)]
+        url = storage.commit_blocks(sesion.blob_name, block_ids, sesion.content_type)
+        if not url:
+            return JsonResponse({
+                'error': 'Error al confirmar el archivo'
+            }, status=500)
+
+        sesion.estado = 'completada'
+        sesion.url_archivo = url
+        sesion.save(update_fields=['estado', 'url_archivo', 'fecha_actualizacion'])
+
+    return JsonResponse(_upload_session_status(sesion))
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def create_direct_upload(request):
+    """
+    Entrega una URL temporal de escritura para subir un blob directo al almacenamiento
+    (SAS de Azure, o URL firmada hacia `local_direct_upload` con el backend local).
+    Body JSON: blob_name, expires_in (opcional, segundos)
+    """
+    storage = get_storage_backend()
+    if not storage.is_configured:
         return JsonResponse({
-            'error': 'Azure Storage no está configurado'
+            'error': 'El almacenamiento no está configurado'
         }, status=500)
 
-    url = azure_storage.get_file_url(blob_name)
+    try:
+        data = json.loads(request.body or b'{}')
+        blob_name = data['blob_name']
+        expires_in = min(int(data.get('expires_in') or settings.AZURE_STORAGE_SAS_EXPIRY_SECONDS),
+                         settings.AZURE_STORAGE_SAS_EXPIRY_SECONDS)
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({
+            'error': 'Se requiere blob_name'
+        }, status=400)
+
+    sas = storage.generate_upload_url(blob_name, expires_in)
+
+    if sas is None:
+        return JsonResponse({
+            'error': 'No se pudo generar la URL de subida'
+        }, status=500)
+
+    return JsonResponse({
+        'blob_name': blob_name,
+        'upload_url': sas['url'],
+        'method': 'PUT',
+        'headers': {'x-ms-blob-type': 'BlockBlob'},
+        'expires_at': sas['expires_at'].isoformat(),
+    })
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def complete_direct_upload(request):
+    """
+    Confirma una subida directa: verifica que el blob exista y crea el Documento.
+    Body JSON: blob_name, grupo, nombre_archivo (opcional), tipo_documento (opcional)
+    """
+    storage = get_storage_backend()
+    if not storage.is_configured:
+        return JsonResponse({
+            'error': 'El almacenamiento no está configurado'
+        }, status=500)
+
+    try:
+        data = json.loads(request.body or b'{}')
+        blob_name = data['blob_name']
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({
+            'error': 'Se requiere blob_name'
+        }, status=400)
+
+    # Solo se registran blobs que realmente llegaron al almacenamiento
+    if storage.get_file_properties(blob_name) is None:
+        return JsonResponse({
+            'error': 'El archivo no existe en el almacenamiento'
+        }, status=404)
+
+    # El blob se subió sin pasar por el servicio: los listados cacheados quedaron viejos
+    invalidate_listing_cache()
+
+    serializer = DocumentoSerializer(data={
+        'grupo': data.get('grupo'),
+        'nombre_archivo': data.get('nombre_archivo') or os.path.basename(blob_name),
+        'url_archivo': storage.get_file_url(blob_name),
+        'tipo_documento': data.get('tipo_documento') or 'otro',
+    })
+    if not serializer.is_valid():
+        return JsonResponse({'errors': serializer.errors}, status=400)
+
+    serializer.save(
+        blob_name=blob_name,
+        usuario=request.user if request.user.is_authenticated else None,
+    )
+
+    return JsonResponse(serializer.data, status=201)
+
+@csrf_exempt
+@require_http_methods(["PUT"])
+def local_direct_upload(request, token):
+    """
+    Destino de las URLs de subida firmadas del backend local (equivalente a un PUT con SAS).
+    El cuerpo de la petición es el contenido del archivo.
+    """
+    storage = get_storage_backend()
+    if storage.name != 'local':
+        return JsonResponse({
+            'error': 'Subida directa local no disponible'
+        }, status=404)
+
+    blob_name = verify_upload_token(token)
+    if blob_name is None:
+        return JsonResponse({
+            'error': 'URL de subida inválida o vencida'
+        }, status=403)
+
+    url = storage.upload_file(request, blob_name, request.content_type)
+
+    if url:
+        return JsonResponse({
+            'blob_name': blob_name,
+            'url': url
+        }, status=201)
+    else:
+        return JsonResponse({
+            'error': 'Error al subir el archivo'
+        }, status=500)
+
+# Vistas asíncronas (ASGI): mismas respuestas que las síncronas, usando AsyncAzureStorageService
+# (o el backend síncrono ejecutado en hilos cuando no se usa Azure o no hay servidor ASGI).
+# Con un servidor ASGI (uvicorn/daphne) una transferencia lenta no ocupa un hilo mientras espera.
+
+@require_http_methods(["GET"])
+async def async_list_files(request):
+    """
+    Lista archivos en Azure Storage, paginado (async)
+    """
+    storage = get_async_storage_backend(request)
+    if not storage.is_configured:
+        return JsonResponse({
+            'error': 'El almacenamiento no está configurado'
+        }, status=500)
+
+    try:
+        prefix, page_size, continuation_token = _listing_params(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    page = await storage.list_files_page(prefix, page_size, continuation_token)
+
+    if page is None:
+        return JsonResponse({
+            'error': 'Error al listar los archivos'
+        }, status=500)
+
+    return _listing_response(page)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def async_upload_file(request):
+    """
+    Sube un archivo a Azure Storage (async)
+    """
+    storage = get_async_storage_backend(request)
+    if not storage.is_configured:
+        return JsonResponse({
+            'error': 'El almacenamiento no está configurado'
+        }, status=500)
+
+    if 'file' not in request.FILES:
+        return JsonResponse({
+            'error': 'No se encontró el archivo en la solicitud'
+        }, status=400)
+
+    file_obj = request.FILES['file']
+    blob_name = request.POST.get('blob_name', file_obj.name)
+    content_type = file_obj.content_type or 'application/octet-stream'
+
+    if settings.AZURE_STORAGE_DEDUP_ENABLED:
+        # La deduplicación usa el ORM y el servicio síncrono: se delega a un hilo
+        return await sync_to_async(_dedup_upload_response)(file_obj, content_type)
+
+    url = await storage.upload_file(file_obj, blob_name, content_type)
+
+    if url:
+        return JsonResponse({
+            'message': 'Archivo subido exitosamente',
+            'blob_name': blob_name,
+            'url': url,
+            'content_type': content_type
+        })
+    else:
+        return JsonResponse({
+            'error': 'Error al subir el archivo'
+        }, status=500)
+
+@require_http_methods(["GET"])
+async def async_download_file(request, blob_name):
+    """
+    Descarga un archivo desde Azure Storage (async, admite `Range`)
+    """
+    storage = get_async_storage_backend(request)
+    if not storage.is_configured:
+        return JsonResponse({
+            'error': 'El almacenamiento no está configurado'
+        }, status=500)
+
+    properties = await storage.get_file_properties(blob_name)
+    if properties is None:
+        return JsonResponse({
+            'error': 'Archivo no encontrado'
+        }, status=404)
+
+    try:
+        offset, length, content_range = _resolve_range(request, properties)
+    except ValueError as e:
+        return _range_not_satisfiable(e, properties['size'])
+
+    download = await storage.stream_file(blob_name, offset=offset, length=length)
+
+    if download is None:
+        return JsonResponse({
+            'error': 'Archivo no encontrado'
+        }, status=404)
+
+    return _download_response(download, blob_name, properties, content_range)
+
+@require_http_methods(["DELETE"])
+async def async_delete_file(request, blob_name):
+    """
+    Elimina un archivo de Azure Storage (async)
+    """
+    storage = get_async_storage_backend(request)
+    if not storage.is_configured:
+        return JsonResponse({
+            'error': 'El almacenamiento no está configurado'
+        }, status=500)
+
+    success = await storage.delete_file(blob_name)
+
+    if success:
+        await sync_to_async(borrar_derivados)(blob_name)
+        return JsonResponse({
+            'message': f'Archivo {blob_name} eliminado exitosamente'
+        })
+    else:
+        return JsonResponse({
+            'error': f'Error al eliminar el archivo {blob_name}'
+        }, status=500)
+
+@require_http_methods(["GET"])
+async def async_get_file_url(request, blob_name):
+    """
+    Obtiene la URL de un archivo en Azure Storage (async)
+    """
+    storage = get_async_storage_backend(request)
+    if not storage.is_configured:
+        return JsonResponse({
+            'error': 'El almacenamiento no está configurado'
+        }, status=500)
+
+    url = storage.get_file_url(blob_name)
 
     if url:
         return JsonResponse({
@@ -150,7 +827,8 @@ def test_azure_storage(request):
     """
     Prueba básica de Azure Storage - crea un archivo de prueba
     """
-    if not azure_storage.blob_service_client:
+    storage = get_storage_backend()
+    if not storage.is_configured:
         return JsonResponse({
             'error': 'Azure Storage no está configurado. Verifica tus variables de entorno.'
         }, status=500)
@@ -163,11 +841,11 @@ def test_azure_storage(request):
     from io import BytesIO
     test_file = BytesIO(test_content)
 
-    url = azure_storage.upload_file(test_file, test_blob_name, "text/plain")
+    url = storage.upload_file(test_file, test_blob_name, "text/plain")
 
     if url:
         # Verificar que podemos descargar el archivo
-        downloaded_content = azure_storage.download_file(test_blob_name)
+        downloaded_content = storage.download_file(test_blob_name)
 
         success = downloaded_content == test_content
 
@@ -177,10 +855,63 @@ def test_azure_storage(request):
             'upload_success': True,
             'download_success': success,
             'content_matches': success,
-            'container_name': azure_storage.container_name
+            'container_name': getattr(storage, 'container_name', None)
         })
     else:
         return JsonResponse({
             'error': 'Error en la prueba de subida',
             'upload_success': False
         }, status=500)
+
+@require_http_methods(["GET"])
+async def eventos(request):
+    """
+    Stream SSE (text/event-stream) con los cambios de las tareas del grupo del usuario y
+    de sus notificaciones. Solo bajo ASGI: con WSGI cada conexión ocuparía un hilo.
+    """
+    if not eventos_habilitados():
+        return JsonResponse({
+            'error': 'Los eventos en tiempo real están deshabilitados'
+        }, status=404)
+
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({
+            'error': 'Los eventos en tiempo real requieren un servidor ASGI (uvicorn/daphne)'
+        }, status=501)
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({
+            'error': 'Se requiere un usuario autenticado'
+        }, status=401)
+
+    canales = [canal_usuario(user.pk)]
+    grupo_id = await PerfilUsuario.objects.filter(user=user).values_list('grupo_id', flat=True).afirst()
+    if grupo_id is not None:
+        canales.append(canal_grupo(grupo_id))
+
+    response = StreamingHttpResponse(_stream_de_eventos(canales), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Que nginx no acumule el stream en su buffer
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+async def _stream_de_eventos(canales):
+    suscripcion = bus.suscribir(canales)
+    latido = getattr(settings, 'EVENTOS_HEARTBEAT_SEGUNDOS', 15)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                evento = await asyncio.wait_for(suscripcion.cola.get(), timeout=latido)
+            except asyncio.TimeoutError:
+                # Comentario SSE: mantiene viva la conexión a través de proxies
+                yield ": ping\n\n"
+                continue
+            if suscripcion.desbordada:
+                # El cliente no leía: se perdieron eventos, que vuelva a pedir los datos
+                yield "event: resync\ndata: {}\n\n"
+                return
+            yield f"event: {evento['tipo']}\ndata: {json.dumps(evento)}\n\n"
+    finally:
+        bus.desuscribir(suscripcion)
\ No newline at end of file
@@ -3,6 +3,9 @@ ASGI config for home_cloud project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+/api/eventos/ (stream SSE) and the async storage views need this entry point
+(uvicorn home_cloud.asgi:application, daphne, ...).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -159,6 +159,68 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# --- API REST ---
+# Todos los listados van paginados por cursor (ver api_home_cloud/pagination.py):
+# API_PAGE_SIZE por defecto, ?page_size= hasta API_MAX_PAGE_SIZE
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', 200))
+# Listados desde .values() sin instanciar modelos (api_home_cloud/lectura_rapida.py)
+API_LISTADO_RAPIDO = os.getenv('API_LISTADO_RAPIDO', 'True') == 'True'
+# Máximo de elementos por request en los endpoints /lote/
+API_LOTE_MAX_ELEMENTOS = int(os.getenv('API_LOTE_MAX_ELEMENTOS', 500))
+REST_FRAMEWORK = {
+    'DEFAULT_PAGINATION_CLASS': 'api_home_cloud.pagination.CursorPaginacion',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', 50)),
+    # JSON con orjson si está instalado (misma salida que el JSONRenderer de DRF)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api_home_cloud.lectura_rapida.JSONRapidoRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+}
+
+# Caché de respuestas de los viewsets (api_home_cloud/cache_respuestas.py), invalidada
+# por los contadores de versión de cada grupo. 'memoria': LRU en cada proceso, de hasta
+# API_CACHE_MAX_ENTRADAS respuestas. 'redis': compartida entre workers (requiere el
+# paquete redis; sirve cualquier servidor compatible con Redis).
+API_CACHE_ENABLED = os.getenv('API_CACHE_ENABLED', 'True') == 'True'
+API_CACHE_BACKEND = os.getenv('API_CACHE_BACKEND', 'memoria')
+API_CACHE_REDIS_URL = os.getenv('API_CACHE_REDIS_URL', 'redis://localhost:6379/1')
+API_CACHE_MAX_ENTRADAS = int(os.getenv('API_CACHE_MAX_ENTRADAS', 1000))
+API_CACHE_TTL_SEGUNDOS = int(os.getenv('API_CACHE_TTL_SEGUNDOS', 300))
+# Cuánto espera un request a que otro termine de calcular la misma respuesta
+API_CACHE_ESPERA_SEGUNDOS = float(os.getenv('API_CACHE_ESPERA_SEGUNDOS', 5))
+
+if API_CACHE_BACKEND == 'redis':
+    _CACHE_API = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': API_CACHE_REDIS_URL,
+    }
+else:
+    _CACHE_API = {
+        'BACKEND': 'api_home_cloud.cache_respuestas.CacheLRU',
+        'LOCATION': 'api',
+        'OPTIONS': {'MAX_ENTRIES': API_CACHE_MAX_ENTRADAS},
+    }
+
+CACHES = {
+    # La misma que usa Django si no se configura (una por proceso)
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'api': {
+        **_CACHE_API,
+        'TIMEOUT': API_CACHE_TTL_SEGUNDOS,
+        'KEY_PREFIX': 'home_cloud_api',
+    },
+}
+
+# --- BACKEND DE ALMACENAMIENTO ---
+# 'azure' (Azure Blob Storage) o 'local' (disco, sin red; útil para self-hosted, tests y benchmarks).
+# También acepta la ruta a una instancia propia, ej: 'mi_app.storage.mi_backend'.
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'azure')
+# Carpeta raíz y URL pública del servidor para el backend local
+LOCAL_STORAGE_ROOT = os.getenv('LOCAL_STORAGE_ROOT', str(BASE_DIR / 'storage'))
+LOCAL_STORAGE_BASE_URL = os.getenv('LOCAL_STORAGE_BASE_URL', 'http://localhost:8000')
+
 # --- PASO 1: LEER LAS CREDENCIALES ---
 # Si la variable no existe, os.getenv devuelve None.
 AZURE_STORAGE_ACCOUNT_NAME = os.getenv('AZURE_STORAGE_ACCOUNT_NAME')
@@ -166,6 +228,80 @@ AZURE_STORAGE_ACCOUNT_KEY = os.getenv('AZURE_STORAGE_ACCOUNT_KEY')
 AZURE_STORAGE_CONNECTION_STRING = os.getenv('AZURE_STORAGE_CONNECTION_STRING')
 AZURE_STORAGE_CONTAINER_NAME = os.getenv('AZURE_STORAGE_CONTAINER_NAME', 'files') 
 AZURE_STORAGE_CUSTOM_DOMAIN = os.getenv('AZURE_STORAGE_CUSTOM_DOMAIN')
+# Tamaño (bytes) de cada bloque en las descargas en streaming. Por defecto 4 MB.
+AZURE_STORAGE_DOWNLOAD_CHUNK_SIZE = int(os.getenv('AZURE_STORAGE_DOWNLOAD_CHUNK_SIZE', 4 * 1024 * 1024))
+# Subidas grandes: por encima del umbral el archivo se envía en bloques de
+# AZURE_STORAGE_UPLOAD_BLOCK_SIZE bytes con hasta AZURE_STORAGE_UPLOAD_MAX_CONCURRENCY hilos.
+AZURE_STORAGE_UPLOAD_BLOCK_SIZE = int(os.getenv('AZURE_STORAGE_UPLOAD_BLOCK_SIZE', 8 * 1024 * 1024))
+AZURE_STORAGE_UPLOAD_MAX_CONCURRENCY = int(os.getenv('AZURE_STORAGE_UPLOAD_MAX_CONCURRENCY', 4))
+AZURE_STORAGE_UPLOAD_SINGLE_SHOT_THRESHOLD = int(os.getenv('AZURE_STORAGE_UPLOAD_SINGLE_SHOT_THRESHOLD', 64 * 1024 * 1024))
+# Subidas reanudables (api/azure/uploads/): tamaño de parte por defecto y máximo aceptado
+RESUMABLE_UPLOAD_CHUNK_SIZE = int(os.getenv('RESUMABLE_UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024))
+RESUMABLE_UPLOAD_MAX_CHUNK_SIZE = int(os.getenv('RESUMABLE_UPLOAD_MAX_CHUNK_SIZE', 32 * 1024 * 1024))
+# Vigencia máxima (segundos) de las URLs SAS para subidas directas a Azure
+AZURE_STORAGE_SAS_EXPIRY_SECONDS = int(os.getenv('AZURE_STORAGE_SAS_EXPIRY_SECONDS', 15 * 60))
+# Listado de archivos: tamaño de página por defecto/máximo y segundos de caché de cada página
+AZURE_STORAGE_LIST_PAGE_SIZE = int(os.getenv('AZURE_STORAGE_LIST_PAGE_SIZE', 100))
+AZURE_STORAGE_LIST_MAX_PAGE_SIZE = int(os.getenv('AZURE_STORAGE_LIST_MAX_PAGE_SIZE', 1000))
+AZURE_STORAGE_LIST_CACHE_TTL = int(os.getenv('AZURE_STORAGE_LIST_CACHE_TTL', 30))
+# Alias de CACHES para esa caché (y la verificación del contenedor). 'default' es una por
+# proceso: subir o borrar solo invalida los listados del worker que lo atendió, así que
+# con varios workers sirve solo con API_CACHE_BACKEND=redis, que usa por defecto 'api'.
+AZURE_STORAGE_CACHE_ALIAS = os.getenv(
+    'AZURE_STORAGE_CACHE_ALIAS', 'api' if API_CACHE_BACKEND == 'redis' else 'default'
+)
+# Transporte HTTP compartido por proceso: conexiones keep-alive en el pool, timeouts
+# (segundos) y reintentos exponenciales con jitter (espera ~backoff + base^intento ± jitter)
+AZURE_STORAGE_POOL_MAXSIZE = int(os.getenv('AZURE_STORAGE_POOL_MAXSIZE', 32))
+AZURE_STORAGE_CONNECT_TIMEOUT = int(os.getenv('AZURE_STORAGE_CONNECT_TIMEOUT', 10))
+AZURE_STORAGE_READ_TIMEOUT = int(os.getenv('AZURE_STORAGE_READ_TIMEOUT', 60))
+AZURE_STORAGE_RETRY_TOTAL = int(os.getenv('AZURE_STORAGE_RETRY_TOTAL', 3))
+AZURE_STORAGE_RETRY_INITIAL_BACKOFF = int(os.getenv('AZURE_STORAGE_RETRY_INITIAL_BACKOFF', 1))
+AZURE_STORAGE_RETRY_INCREMENT_BASE = int(os.getenv('AZURE_STORAGE_RETRY_INCREMENT_BASE', 2))
+AZURE_STORAGE_RETRY_JITTER = int(os.getenv('AZURE_STORAGE_RETRY_JITTER', 1))
+# Deduplicación: las subidas se guardan una sola vez bajo su SHA-256 (cas/xx/<hash>)
+AZURE_STORAGE_DEDUP_ENABLED = os.getenv('AZURE_STORAGE_DEDUP_ENABLED', 'False') == 'True'
+# Segundos que un contenido sin referencias se conserva desde su última subida, para que
+# el cliente cree el Documento; después lo borra el comando recolectar_contenido_huerfano
+AZURE_STORAGE_DEDUP_GRACIA_SEGUNDOS = int(os.getenv('AZURE_STORAGE_DEDUP_GRACIA_SEGUNDOS', 3600))
+# Miniaturas/vistas previas WebP de los documentos (requiere Pillow; PDF con pypdfium2)
+MINIATURAS_ENABLED = os.getenv('MINIATURAS_ENABLED', 'True') == 'True'
+MINIATURAS_MAX_WORKERS = int(os.getenv('MINIATURAS_MAX_WORKERS', 2))
+MINIATURAS_MAX_SOURCE_BYTES = int(os.getenv('MINIATURAS_MAX_SOURCE_BYTES', 50 * 1024 * 1024))
+MINIATURAS_WEBP_QUALITY = int(os.getenv('MINIATURAS_WEBP_QUALITY', 80))
+MINIATURA_TAMANO = int(os.getenv('MINIATURA_TAMANO', 256))
+VISTA_PREVIA_TAMANO = int(os.getenv('VISTA_PREVIA_TAMANO', 1024))
+# Cola de procesamiento de documentos (comando procesar_documentos): procesos en paralelo
+# (vacío = cantidad de CPUs), reintentos, espera base entre reintentos (se duplica en cada
+# intento) y segundos que un trabajo queda reservado antes de que otro worker lo retome
+PROCESAMIENTO_CONCURRENCIA = int(os.getenv('PROCESAMIENTO_CONCURRENCIA', 0)) or None
+PROCESAMIENTO_MAX_INTENTOS = int(os.getenv('PROCESAMIENTO_MAX_INTENTOS', 3))
+PROCESAMIENTO_REINTENTO_SEGUNDOS = int(os.getenv('PROCESAMIENTO_REINTENTO_SEGUNDOS', 30))
+PROCESAMIENTO_VISIBILIDAD_SEGUNDOS = int(os.getenv('PROCESAMIENTO_VISIBILIDAD_SEGUNDOS', 300))
+PROCESAMIENTO_INTERVALO_SEGUNDOS = float(os.getenv('PROCESAMIENTO_INTERVALO_SEGUNDOS', 2))
+PROCESAMIENTO_MAX_BYTES = int(os.getenv('PROCESAMIENTO_MAX_BYTES', 25 * 1024 * 1024))
+PROCESAMIENTO_OCR_IDIOMA = os.getenv('PROCESAMIENTO_OCR_IDIOMA', 'spa')
+# Notificaciones a los miembros del grupo al crear una tarea o cambiar su estado:
+# eventos de la misma tarea dentro de la ventana se juntan en las mismas filas
+NOTIFICACIONES_ENABLED = os.getenv('NOTIFICACIONES_ENABLED', 'True') == 'True'
+NOTIFICACIONES_VENTANA_SEGUNDOS = int(os.getenv('NOTIFICACIONES_VENTANA_SEGUNDOS', 300))
+NOTIFICACIONES_LOTE = int(os.getenv('NOTIFICACIONES_LOTE', 500))
+# Recordatorios de vencimiento (comando enviar_recordatorios): días antes del
+# vencimiento en los que se avisa (además de las vencidas), intervalo entre corridas y
+# tareas por tanda de notificaciones
+RECORDATORIOS_DIAS = os.getenv('RECORDATORIOS_DIAS', '7,1,0')
+RECORDATORIOS_INTERVALO_SEGUNDOS = int(os.getenv('RECORDATORIOS_INTERVALO_SEGUNDOS', 3600))
+RECORDATORIOS_LOTE = int(os.getenv('RECORDATORIOS_LOTE', 500))
+
+# Eventos en tiempo real por SSE en /api/eventos/ (requiere ASGI, ver eventos.py).
+# Sin EVENTOS_BROKER el reparto es en memoria y solo llega a las conexiones del mismo
+# proceso; con varios workers usar EVENTOS_BROKER='redis' (requiere el paquete redis).
+EVENTOS_ENABLED = os.getenv('EVENTOS_ENABLED', 'True') == 'True'
+EVENTOS_BROKER = os.getenv('EVENTOS_BROKER', '')
+EVENTOS_REDIS_URL = os.getenv('EVENTOS_REDIS_URL', 'redis://localhost:6379/0')
+EVENTOS_REDIS_CANAL = os.getenv('EVENTOS_REDIS_CANAL', 'home_cloud:eventos')
+EVENTOS_COLA_MAX = int(os.getenv('EVENTOS_COLA_MAX', 100))
+EVENTOS_HEARTBEAT_SEGUNDOS = int(os.getenv('EVENTOS_HEARTBEAT_SEGUNDOS', 15))
 
 # --- PASO 2: LA VÁLVULA DE SEGURIDAD (El IF) ---
 if AZURE_STORAGE_ACCOUNT_NAME and AZURE_STORAGE_ACCOUNT_KEY: